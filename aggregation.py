@@ -0,0 +1,174 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+PHOENIX = 'Phoenix'
+PAYOFF_KEY = 'TradeTerminationPayoff'
+NOTIONAL_KEY = 'NotionalPrincipal'
+TOTAL_PAYOFF = '总了结收益'
+TOTAL_NOTIONAL = '总名义本金'
+# 预先求和的 couponsPaid 列（见 trade_frame.normalize_trades）
+COUPON_TOTAL = 'couponsPaidTotal'
+
+# 英文列名 -> 中文列名
+COLUMN_LABELS = {
+    'Trinary Snowball TradeTerminationPayoff': '三元雪球了结收益',
+    'Trinary Snowball NotionalPrincipal':     '三元雪球名义本金',
+    'Autocallable Airbag TradeTerminationPayoff': '锁盈缓冲了结收益',
+    'Autocallable Airbag NotionalPrincipal':     '锁盈缓冲名义本金',
+    'Autocall Binary TradeTerminationPayoff':    '自动赎回二元了结收益',
+    'Autocall Binary NotionalPrincipal':         '自动赎回二元名义本金',
+    'Phoenix TradeTerminationPayoff':            '凤凰了结收益',
+    'Phoenix NotionalPrincipal':                 '凤凰名义本金',
+    'Total TradeTerminationPayoff':              TOTAL_PAYOFF,
+    'Total NotionalPrincipal':                   TOTAL_NOTIONAL,
+    'Snowball TradeTerminationPayoff':           '雪球了结收益',
+    'Snowball NotionalPrincipal':                '雪球名义本金',
+    'Binary TradeTerminationPayoff':             '二元了结收益',
+    'Binary NotionalPrincipal':                  '二元名义本金',
+    'Vanilla TradeTerminationPayoff':            '香草了结收益',
+    'Vanilla NotionalPrincipal':                 '香草名义本金',
+    'Shark Fin TradeTerminationPayoff':          '鲨鱼鳍了结收益',
+    'Shark Fin NotionalPrincipal':               '鲨鱼鳍名义本金'
+}
+_REPLACE_ORDER = sorted(COLUMN_LABELS, key=len, reverse=True)
+
+
+@lru_cache(maxsize=None)
+def translate_column(col: str) -> str:
+    """
+    英文列名翻译为中文。已知列名直接查表，未知列名按长度优先做子串替换。
+    """
+    if col in COLUMN_LABELS:
+        return COLUMN_LABELS[col]
+    for k in _REPLACE_ORDER:
+        col = col.replace(k, COLUMN_LABELS[k])
+    return col
+
+
+def _column(df: pd.DataFrame, name: str, default) -> pd.Series:
+    if name in df.columns:
+        return df[name]
+    return pd.Series([default] * len(df), index=df.index, dtype=object)
+
+
+def _codes(values: pd.Series) -> tuple[np.ndarray, list]:
+    """
+    按首次出现顺序编码，缺失值单独成组（与逐行 dict 累加的分组一致）
+    """
+    codes, uniques = pd.factorize(values)
+    keys = list(uniques)
+    if (codes < 0).any():
+        codes = np.where(codes < 0, len(keys), codes)
+        keys.append(values[codes == len(keys)].iloc[0])
+    # factorize 会把缺失值排到最后，这里按首次出现位置重排
+    first = np.full(len(keys), len(codes), dtype=np.int64)
+    np.minimum.at(first, codes, np.arange(len(codes)))
+    order = np.argsort(first, kind='stable')
+    remap = np.empty_like(order)
+    remap[order] = np.arange(len(order))
+    return remap[codes], [keys[i] for i in order]
+
+
+def _is_int(values: np.ndarray) -> bool:
+    return values.dtype.kind in 'iub'
+
+
+def _bincount(codes: np.ndarray, weights: np.ndarray, size: int, as_int: bool) -> np.ndarray:
+    if as_int:
+        out = np.zeros(size, dtype=np.int64)
+        np.add.at(out, codes, weights.astype(np.int64))
+        return out
+    # bincount 按行顺序逐个累加，结果与逐行相加完全一致
+    return np.bincount(codes, weights=weights.astype(np.float64), minlength=size)
+
+
+def coupon_sums(coupons: pd.Series) -> tuple[np.ndarray, bool]:
+    """
+    Phoenix 已付票息列表批量展开求和，返回 (每笔合计, 是否全部为整数)
+    """
+    coupons = coupons.reset_index(drop=True)
+    lengths = coupons.map(lambda c: len(c) if isinstance(c, (list, tuple, np.ndarray)) else 0)
+    exploded = coupons.explode()
+    exploded = exploded[np.repeat(lengths.to_numpy() > 0, np.maximum(lengths.to_numpy(), 1))]
+    values = pd.to_numeric(exploded)
+    if values.empty:
+        return np.zeros(len(coupons), dtype=np.int64), True
+    as_int = _is_int(values.to_numpy())
+    rows = values.index.to_numpy()
+    return _bincount(rows, values.to_numpy(), len(coupons), as_int), as_int
+
+
+def aggregate_counterparty(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    按交易对手方 × 产品类型汇总了结收益与名义本金。
+    Phoenix 的了结收益取 couponsPaid 之和（有 couponsPaidTotal 列时直接使用）；返回以交易对手方为索引、
+    列为中文列名（总了结收益、总名义本金在前）的汇总表。
+    """
+    cp_codes, cp_keys = _codes(_column(df, 'counterparty', ''))
+    pt_raw_codes, pt_raw_keys = _codes(_column(df, 'productType', ''))
+
+    # 产品类型以格式化后的字符串为列键
+    labels = []
+    label_index = {}
+    for key in pt_raw_keys:
+        label_index.setdefault(f"{key}", len(labels))
+        if len(labels) < len(label_index):
+            labels.append(f"{key}")
+    raw_to_label = np.array([label_index[f"{key}"] for key in pt_raw_keys], dtype=np.int64)
+    pt_codes = raw_to_label[pt_raw_codes]
+    phoenix_raw = np.array([key == PHOENIX for key in pt_raw_keys], dtype=bool)
+    is_phoenix = phoenix_raw[pt_raw_codes]
+
+    payoff = pd.to_numeric(_column(df, 'tradeTerminationPayoff', 0)).to_numpy()
+    notional = pd.to_numeric(_column(df, 'notionalPrincipal', 0)).to_numpy()
+    if is_phoenix.any():
+        if COUPON_TOTAL in df.columns:
+            coupons = df[COUPON_TOTAL].to_numpy()[is_phoenix]
+            coupons_int = _is_int(coupons)
+        else:
+            coupons, coupons_int = coupon_sums(_column(df, 'couponsPaid', [])[is_phoenix])
+        effective = payoff.astype(np.result_type(payoff, coupons), copy=True)
+        effective[is_phoenix] = coupons
+    else:
+        coupons_int = True
+        effective = payoff
+
+    n_cp, n_pt = len(cp_keys), len(labels)
+    pair = cp_codes * n_pt + pt_codes
+    present = np.bincount(pair, minlength=n_cp * n_pt).reshape(n_cp, n_pt) > 0
+    as_int = (
+        bool(present.all())
+        and _is_int(notional)
+        and (is_phoenix.all() or _is_int(payoff))
+        and coupons_int
+    )
+
+    payoff_cells = _bincount(pair, effective, n_cp * n_pt, as_int).reshape(n_cp, n_pt)
+    notional_cells = _bincount(pair, notional, n_cp * n_pt, as_int).reshape(n_cp, n_pt)
+    total_payoff = _bincount(cp_codes, effective, n_cp, as_int)
+    total_notional = _bincount(cp_codes, notional, n_cp, as_int)
+
+    # 列顺序：按交易对手方首次出现顺序，各自产品按首次出现顺序
+    first = np.full(n_cp * n_pt, len(pair), dtype=np.int64)
+    np.minimum.at(first, pair, np.arange(len(pair)))
+    seen = np.flatnonzero(first < len(pair))
+    seen = seen[np.lexsort((first[seen], seen // n_pt))]
+    order = list(dict.fromkeys((seen % n_pt).tolist()))
+
+    columns = [TOTAL_PAYOFF, TOTAL_NOTIONAL]
+    blocks = [total_payoff[:, None], total_notional[:, None]]
+    for j in order:
+        columns.append(translate_column(f"{labels[j]} {PAYOFF_KEY}"))
+        columns.append(translate_column(f"{labels[j]} {NOTIONAL_KEY}"))
+        blocks.append(payoff_cells[:, j:j + 1])
+        blocks.append(notional_cells[:, j:j + 1])
+    values = np.hstack(blocks)
+    if not as_int:
+        values = np.where(np.isnan(values), 0.0, values)
+        mask = np.ones_like(values, dtype=bool)
+        mask[:, 2::2] = present[:, order]
+        mask[:, 3::2] = present[:, order]
+        values[~mask] = 0.0
+    return pd.DataFrame(values, index=pd.Index(cp_keys), columns=pd.Index(columns))
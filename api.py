@@ -1,46 +1,348 @@
-import requests
+import datetime
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
 import streamlit as st
+import config
+from http_client import get_client
+from instrumentation import cached_call, instrument, mark_built, timed
+from market_cache import MarketCache
+from memo import memoize
+from offline import OfflineDataset
+from prefetch import Prefetcher
+from classification import apply_classification, mapping_stamp
+from compute_pool import SharedTrades, get_pool
+from trade_frame import normalize_trades
+from trade_query import TradeQuery, facets
+from trade_store import TradeStore
+from trend_cube import TrendCube
 
-@st.cache_data
-def get_trade_data(expr: str = ""):
-    """从交易数据接口获取交易数据列表"""
-    url = "http://192.168.1.103:60000/api/query-trades"
+@instrument("api.fetch_trades")
+def fetch_trades(expr: str = "") -> list:
+    """从交易数据接口拉取交易数据列表（不缓存，失败抛出异常）"""
     params = {"repo_name": "all", "expr": expr}
-    try:
-        resp = requests.post(url, json=params, timeout=10)
-        resp.raise_for_status()
-        return resp.json().get("result", [])
-    except Exception as e:
-        st.error(f"交易数据获取失败: {e}")
-        return []
+    return get_client().post_json("/api/query-trades", params).get("result", [])
 
-@st.cache_data
-def get_bs_params(underlying_code: str, start_date: str, end_date: str):
-    """从对冲参数接口获取BS参数"""
-    url = "http://192.168.1.103:60000/api/datahub/query-bs-params?date-in-iso=1"
+@st.cache_resource
+def get_trade_store() -> TradeStore:
+    """本地交易库（进程内共享）"""
+    return TradeStore(
+        os.path.join(config.DATA_DIR, "trades.sqlite3"),
+        fetch_trades,
+        id_field=config.TRADE_ID_FIELD,
+        modified_field=config.TRADE_MODIFIED_FIELD
+    )
+
+def load_trades() -> list:
+    """
+    从本地交易库读取全部交易。后台预取已有快照时不在页面内联网，
+    否则超过刷新间隔时先增量同步
+    """
+    store = get_trade_store()
+    if not (config.PREFETCH_ENABLED and get_prefetcher().snapshot() is not None):
+        try:
+            store.refresh_if_stale(config.TRADE_REFRESH_SECONDS)
+        except Exception as e:
+            st.error(f"交易数据获取失败: {e}")
+    return store.records()
+
+@st.cache_resource
+def _offline_dataset(path: str) -> OfflineDataset:
+    return OfflineDataset(path)
+
+def get_offline():
+    """config.OFFLINE_DIR 指定的离线数据集（每个目录只加载一次）；未配置时为 None"""
+    return _offline_dataset(config.OFFLINE_DIR) if config.OFFLINE_DIR else None
+
+def trade_source() -> str:
+    """页面实际使用的交易数据来源：配置了离线数据集时为 offline，否则为 config.TRADE_SOURCE"""
+    return "offline" if config.OFFLINE_DIR else config.TRADE_SOURCE
+
+def _trade_version():
+    """
+    本地交易表的数据版本：离线数据集为导出时的交易库版本；有预取快照时为快照的交易库版本
+    （与页面实际读到的交易表一致），否则为本地交易库版本
+    """
+    offline = get_offline()
+    if offline is not None:
+        return ("offline", offline.manifest.get("trade_version"), offline.manifest["created"])
+    snap = _current_snapshot()
+    if snap is not None:
+        return snap.data["trade_version"]
+    return get_trade_store().version
+
+@st.cache_resource(max_entries=1)
+def _offline_frame(path: str, classification: int):
+    """离线数据集的交易表；分类映射在导出后有变化时重新分类"""
+    mark_built()
+    offline = get_offline()
+    frame = offline.trades
+    if classification != offline.manifest.get("classification") and 'counterparty' in frame.columns:
+        frame = apply_classification(frame)
+    return frame
+
+@st.cache_resource(max_entries=1)
+def _trade_frame(version: int, classification: int):
+    mark_built()
+    return normalize_trades(get_trade_store().records())
+
+def _current_snapshot():
+    """
+    与分类映射版本一致的最近一次预取快照（仅 store 模式）；没有时为 None。
+    有快照后交易库只由预取线程刷新（见 load_trades），刷新后新快照构建完成前继续使用上一份快照，
+    页面不内联重建交易表与立方体
+    """
+    if not config.PREFETCH_ENABLED or trade_source() != "store":
+        return None
+    snap = get_prefetcher().snapshot()
+    if snap is None:
+        return None
+    if snap.data["classification"] != mapping_stamp():
+        return None
+    return snap
+
+def load_trade_frame():
+    """
+    带类型的交易 DataFrame，每个数据版本只构建一次，各页面共享同一对象（只读）
+    """
+    if trade_source() == "offline":
+        return cached_call("api.load_trade_frame", _offline_frame, config.OFFLINE_DIR, mapping_stamp())
+    snap = _current_snapshot()
+    if snap is not None:
+        with timed("api.load_trade_frame", rows=len(snap.data["trades"]), cache="snapshot"):
+            return snap.data["trades"]
+    load_trades()
+    return cached_call("api.load_trade_frame", _trade_frame, get_trade_store().version, mapping_stamp())
+
+@st.cache_resource(max_entries=1)
+def _trend_cube(version: int, classification: int) -> TrendCube:
+    mark_built()
+    return TrendCube(load_trade_frame())
+
+@st.cache_resource(ttl=config.TRADE_REFRESH_SECONDS, max_entries=config.TRADE_QUERY_CACHE_SIZE)
+def _query_frame(expr: str, classification: int):
+    mark_built()
+    return normalize_trades(fetch_trades(expr))
+
+@st.cache_resource(ttl=config.TRADE_REFRESH_SECONDS, max_entries=config.TRADE_QUERY_CACHE_SIZE)
+def _query_cube(expr: str, classification: int) -> TrendCube:
+    mark_built()
+    return TrendCube(_query_frame(expr, classification))
+
+def new_trade_query() -> TradeQuery:
+    return TradeQuery(max_in=config.TRADE_EXPR_MAX_IN)
+
+def load_trend_cube(query: TradeQuery = None):
+    """
+    客户产品趋势的预聚合立方体。store 模式下为全量交易的立方体，每个数据版本只构建一次；
+    api 模式下由 query 可下推部分的查询结果构建，按表达式缓存（维度条件仍由切片时的 filters 执行），
+    获取失败时提示错误并返回 None
+    """
+    if trade_source() == "api":
+        expr = query.expr() if query is not None else ""
+        try:
+            return cached_call("api.load_trend_cube", _query_cube, expr, mapping_stamp())
+        except Exception as e:
+            st.error(f"交易数据获取失败: {e}")
+            return None
+    snap = _current_snapshot()
+    if snap is not None:
+        with timed("api.load_trend_cube", cache="snapshot"):
+            return snap.data["trend_cube"]
+    if trade_source() == "store":
+        load_trades()
+    return cached_call("api.load_trend_cube", _trend_cube, _trade_version(), mapping_stamp())
+
+def data_version() -> tuple:
+    """
+    交易数据版本，作为页面计算结果（compute.py）缓存键的一部分：store 模式为交易库版本，
+    api 模式为查询结果缓存的刷新周期序号，离线数据集为导出时的版本；均含分类映射版本
+    """
+    source = trade_source()
+    if source == "api":
+        return ("api", int(time.time() // config.TRADE_REFRESH_SECONDS), mapping_stamp())
+    return (source, _trade_version(), mapping_stamp())
+
+def market_version() -> int:
+    """行情与对冲参数缓存的数据版本（上游拉取次数，拉取新数据后变化）"""
+    return get_market_cache().fetches
+
+@memoize("api.filter_view", maxsize=config.VIEW_CACHE_SIZE, rows=len)
+def _filter_view(_frame, _query: TradeQuery, version: tuple, query_key: tuple):
+    return _query.apply(_frame)
+
+def load_trade_view(query: TradeQuery):
+    """
+    按查询条件筛选后的交易表（只读）。store 模式下在本地交易表上筛选；
+    api 模式下可下推的条件作为 expr 交给接口，结果按规范化表达式缓存，其余条件在客户端补充。
+    筛选结果按（数据版本, 查询条件）缓存最近 VIEW_CACHE_SIZE 个
+    """
+    version = data_version()
+    if trade_source() == "api":
+        try:
+            frame = cached_call("api.query_frame", _query_frame, query.expr(), mapping_stamp())
+        except Exception as e:
+            st.error(f"交易数据获取失败: {e}")
+            return pd.DataFrame()
+    else:
+        frame = load_trade_frame()
+    return _filter_view(frame, query, version, query.key())
+
+@st.cache_resource(max_entries=1)
+def _shared_trades(version, classification: int) -> SharedTrades:
+    mark_built()
+    return get_pool().publish(load_trade_frame())
+
+def shared_trades():
+    """
+    池化执行（COMPUTE_EXECUTOR=pool）时发布到共享内存、供计算进程读取的交易表，每个数据版本发布一次；
+    进程内执行、api 模式或没有交易数据时为 None
+    """
+    if config.COMPUTE_EXECUTOR != "pool" or trade_source() == "api":
+        return None
+    if load_trade_frame().empty:
+        return None
+    return cached_call("api.shared_trades", _shared_trades, _trade_version(), mapping_stamp())
+
+@st.cache_resource(max_entries=1)
+def _trade_facets(version: int, classification: int):
+    return facets(load_trade_frame())
+
+@st.cache_resource(ttl=config.TRADE_FACETS_TTL_SECONDS)
+def _remote_facets(classification: int):
+    return facets(normalize_trades(fetch_trades("")))
+
+def load_trade_facets():
+    """
+    各维度取值的去重组合，供页面生成筛选项。api 模式下按 TRADE_FACETS_TTL_SECONDS 全量拉取一次
+    """
+    if trade_source() == "api":
+        try:
+            return _remote_facets(mapping_stamp())
+        except Exception as e:
+            st.error(f"交易数据获取失败: {e}")
+            return pd.DataFrame()
+    frame = load_trade_frame()
+    if frame.empty:
+        return facets(frame)
+    return _trade_facets(_trade_version(), mapping_stamp())
+
+@instrument("api.fetch_bs_params")
+def fetch_bs_params(underlying_codes: list, start_date: str, end_date: str) -> list:
+    """从对冲参数接口拉取BS参数（不缓存，失败抛出异常）"""
     params = {
-        "underlyingCode": [underlying_code],
+        "underlyingCode": list(underlying_codes),
         "parameterGroup": ["hedge"],
         "adjustmentDateStart": start_date,
         "adjustmentDateEnd": end_date
     }
+    resp = get_client().post_json("/api/datahub/query-bs-params?date-in-iso=1", params)
+    return resp.get("result", [])
+
+@instrument("api.fetch_price_data", rows=lambda result: sum(map(len, result.values())))
+def fetch_price_data(codes: list, start_date: str, end_date: str) -> dict:
+    """从行情接口拉取标的历史价格（不缓存，失败抛出异常）"""
+    payload = {"codes": list(codes), "startDate": start_date, "endDate": end_date}
+    return get_client().post_json("/api/mkt-accessor-v2/get-price", payload).get("result", {})
+
+@st.cache_resource
+def _market_cache() -> MarketCache:
+    return MarketCache(
+        os.path.join(config.DATA_DIR, "market.sqlite3"),
+        fetch_price_data,
+        fetch_bs_params,
+        live_ttl=config.MARKET_LIVE_TTL_SECONDS,
+        batch_bs_params=config.BS_PARAMS_BATCH,
+        max_workers=config.MARKET_FETCH_WORKERS
+    )
+
+def get_market_cache():
+    """
+    行情与对冲参数的本地缓存（进程内共享，跨重启持久化）；
+    配置了离线数据集时为只读的 OfflineMarket，不访问接口
+    """
+    offline = get_offline()
+    return offline.market if offline is not None else _market_cache()
+
+def get_bs_params(underlying_code: str, start_date: str, end_date: str):
+    """获取BS参数（按标的、日期缓存，只拉取缺失区间）"""
+    cache = get_market_cache()
     try:
-        resp = requests.post(url, json=params, timeout=10)
-        resp.raise_for_status()
-        return resp.json().get("result", [])
+        with timed("api.get_bs_params", code=underlying_code) as span:
+            fetches = cache.fetches
+            result = cache.bs_params(underlying_code, start_date, end_date)
+            span.rows, span.cache = len(result), "hit" if cache.fetches == fetches else "miss"
+        return result
     except Exception as e:
         st.error(f"对冲参数数据获取失败: {e}")
         return []
 
-@st.cache_data
+def get_hedge_data(codes: list, start_date: str, end_date: str) -> tuple[dict, dict]:
+    """
+    多个标的的 (BS参数 {code: [...]}, 行情 {code: [...]})，两类数据并发拉取：
+    对冲参数缺失区间相同的标的合并为一次请求（其余批次并发），行情一次请求
+    """
+    cache = get_market_cache()
+    try:
+        with timed("api.get_hedge_data", codes=len(codes)) as span:
+            fetches = cache.fetches
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                params = pool.submit(cache.bs_params_many, codes, start_date, end_date)
+                prices = pool.submit(cache.prices, codes, start_date, end_date)
+                result = params.result(), prices.result()
+            span.rows = sum(map(len, result[0].values()))
+            span.cache = "hit" if cache.fetches == fetches else "miss"
+        return result
+    except Exception as e:
+        st.error(f"对冲参数或价格数据获取失败: {e}")
+        return {}, {}
+
 def get_price_data(codes: list, start_date: str, end_date: str):
-    """获取标的历史价格数据"""
-    url = "http://192.168.1.103:60000/api/mkt-accessor-v2/get-price"
-    payload = {"codes": codes, "startDate": start_date, "endDate": end_date}
+    """获取标的历史价格数据（按标的、日期缓存，只拉取缺失区间）"""
+    cache = get_market_cache()
     try:
-        resp = requests.post(url, json=payload, timeout=10)
-        resp.raise_for_status()
-        return resp.json().get("result", {})
+        with timed("api.get_price_data", codes=len(codes)) as span:
+            fetches = cache.fetches
+            result = cache.prices(codes, start_date, end_date)
+            span.rows = sum(map(len, result.values()))
+            span.cache = "hit" if cache.fetches == fetches else "miss"
+        return result
     except Exception as e:
         st.error(f"价格数据获取失败: {e}")
         return {}
+
+def warm_up(previous=None) -> dict:
+    """
+    预取交易库（含趋势立方体，仅 store 模式）与四个指数默认窗口的行情、对冲参数（由后台线程调用，失败抛出异常）。
+    交易库版本与分类映射版本都未变化时沿用上一次快照 previous 中的交易表与立方体，不重新构建
+    """
+    version = trades = trend_cube = None
+    classification = mapping_stamp()
+    if config.TRADE_SOURCE == "store":
+        store = get_trade_store()
+        store.refresh()
+        version = store.version
+        prev = previous.data if previous is not None else {}
+        if prev.get("trades") is not None and (prev["trade_version"], prev["classification"]) == (version, classification):
+            trades, trend_cube = prev["trades"], prev["trend_cube"]
+        else:
+            trades = normalize_trades(store.records())
+            trend_cube = TrendCube(trades)
+    end = datetime.date.today()
+    start = end - datetime.timedelta(days=config.HEDGE_DEFAULT_DAYS)
+    cache = get_market_cache()
+    prices = cache.prices(config.UNDERLYING_CODES, start, end)
+    bs_params = cache.bs_params_many(config.UNDERLYING_CODES, start, end)
+    return {
+        "trade_version": version, "classification": classification,
+        "trades": trades, "trend_cube": trend_cube,
+        "prices": prices, "bs_params": bs_params
+    }
+
+@st.cache_resource
+def get_prefetcher() -> Prefetcher:
+    """进程内唯一的后台预取线程（首次调用时启动）"""
+    prefetcher = Prefetcher(lambda: warm_up(prefetcher.snapshot()), interval=config.PREFETCH_INTERVAL_SECONDS)
+    prefetcher.start()
+    return prefetcher
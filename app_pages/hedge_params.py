@@ -1,17 +1,97 @@
 import streamlit as st
 import datetime
-import pandas as pd
-import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from api import get_bs_params, get_price_data
+import config
+from charts import line_trace, show_chart
+from compute import hedge_comparison, hedge_derived, hedge_series
+from hedge_analytics import WINDOWS, lookback_days
+from tables import paged_table
+from api import get_bs_params, get_hedge_data, get_price_data, get_market_cache, market_version
+
+
+def render_analytics(codes: list[str], start_date: datetime.date, end_str: str):
+    """衍生分析面板：滚动已实现波动率与参数波动率、二者之差、b值变化与收益率的滚动相关系数"""
+    st.subheader("衍生分析")
+    window = st.radio("滚动窗口（交易日）", WINDOWS, horizontal=True, key="hedge_window")
+    # 行情与对冲参数均按最大窗口向前多取，区间起点即有完整窗口；更换窗口时复用缓存的收益率
+    start_str = start_date.strftime("%Y-%m-%d")
+    history_start = (start_date - datetime.timedelta(days=lookback_days(max(WINDOWS)))).strftime("%Y-%m-%d")
+    params_history, price_history = get_hedge_data(codes, history_start, end_str)
+    derived = hedge_derived(params_history, price_history, market_version(), codes, start_str, end_str, window)
+    if not derived:
+        st.write("行情或对冲参数数据不足，无法计算衍生分析。")
+        return
+
+    panels = [
+        (f"{window}日已实现波动率与参数波动率", [('realized', '已实现波动率'), ('param_vol', '参数波动率')]),
+        ("已实现波动率 - 参数波动率", [('spread', '波动率差')]),
+        (f"b值变化与收益率的{window}日滚动相关系数", [('corr', '相关系数')]),
+    ]
+    fig = make_subplots(
+        rows=len(panels), cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.08,
+        subplot_titles=[title for title, _ in panels]
+    )
+    for row, (_, series) in enumerate(panels, start=1):
+        for name, label in series:
+            frame = derived[name]
+            for code in frame.columns:
+                values = frame[code].dropna()
+                fig.add_trace(line_trace(values.index, values, f"{code} {label}", legendgroup=code), row=row, col=1)
+    fig.update_layout(title="对冲参数衍生分析", legend_title='图例', height=900)
+    show_chart(fig, "hedge_analytics", use_container_width=True)
+
+
+def render_comparison(codes: list[str], start_date: datetime.date, end_str: str):
+    """多标的对比：对冲参数与行情并发拉取，按日期对齐后叠加绘制 -b值 与波动率"""
+    if not codes:
+        st.warning("请至少选择一个标的！")
+        return
+    start_str = start_date.strftime("%Y-%m-%d")
+    params_by_code, price_result = get_hedge_data(codes, start_str, end_str)
+    if not any(params_by_code.values()):
+        st.write("未获取到任何对冲参数数据。")
+        return
+    df = hedge_comparison(params_by_code, price_result, market_version(), codes, start_str, end_str)
+    if df.empty:
+        st.write("所选标的在该日期范围内没有同时具备对冲参数与收盘价的日期。")
+        return
+    missing = [code for code in codes if not params_by_code.get(code) or not price_result.get(code)]
+    if missing:
+        st.caption(f"以下标的缺少对冲参数或收盘价数据：{'、'.join(missing)}")
+
+    indicators = ['-b值', '波动率']
+    fig = make_subplots(
+        rows=len(indicators), cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.08,
+        subplot_titles=[f"各标的{name}" for name in indicators]
+    )
+    for row, name in enumerate(indicators, start=1):
+        for code in df[name].columns:
+            series = df[name][code].dropna()
+            fig.add_trace(line_trace(series.index, series, f"{code} {name}", legendgroup=code), row=row, col=1)
+        fig.update_yaxes(title_text=name, row=row, col=1)
+    fig.update_layout(title="多标的对冲参数对比", legend_title='图例')
+    show_chart(fig, "hedge_compare", use_container_width=True)
+
+    st.subheader("对冲参数对比明细")
+    table = df.set_axis([f"{code} {name}" for name, code in df.columns], axis=1).reset_index()
+    paged_table(table, key="hedge_compare_detail", file_name="对冲参数对比")
+    render_analytics(codes, start_date, end_str)
 
 
 def render():
     st.header("对冲参数分析")
-    underlying_codes = ['000016.SH','000300.SH','000905.SH','000852.SH']
-    underlying_code = st.selectbox("标的代码", options=underlying_codes, index=3)
+    underlying_codes = config.UNDERLYING_CODES
+    compare = st.toggle("多标的对比")
+    if compare:
+        selected_codes = st.multiselect("对比标的", options=underlying_codes, default=underlying_codes)
+    else:
+        underlying_code = st.selectbox("标的代码", options=underlying_codes, index=3)
     today = datetime.date.today()
-    default_start = today - datetime.timedelta(days=90)
+    default_start = today - datetime.timedelta(days=config.HEDGE_DEFAULT_DAYS)
     date_range = st.date_input("调整日期范围", [default_start, today])
     if len(date_range) != 2:
         st.error("请选择起始和结束日期")
@@ -19,32 +99,23 @@ def render():
     start_date, end_date = date_range
     start_str = start_date.strftime("%Y-%m-%d")
     end_str = end_date.strftime("%Y-%m-%d")
+    if compare:
+        render_comparison(selected_codes, start_date, end_str)
+        return
     params_data = get_bs_params(underlying_code, start_str, end_str)
     if not params_data:
         st.write("未获取到任何对冲参数数据。")
         return
 
-    # DataFrame
-    params_data.sort(key=lambda x: x['adjustment_date'])
-    df_params = pd.DataFrame({
-        '日期': pd.to_datetime([item['adjustment_date'] for item in params_data]),
-        '波动率': [item.get('vol', 0) for item in params_data],
-        'b值': [item.get('b', 0) for item in params_data],
-        '-b值': [-(item.get('b', 0)) for item in params_data]
-    })
-
     # Get price data
-    price_result = get_price_data(underlying_codes, start_str, end_str)
+    price_result = get_price_data([underlying_code], start_str, end_str)
     price_list = price_result.get(underlying_code, [])
     if not price_list:
         st.write(f"未获取到标的 {underlying_code} 的历史价格数据。")
         return
-    df_price = pd.DataFrame(price_list)
-    df_price['日期'] = pd.to_datetime(df_price['date'])
-    df_price = df_price[['日期', 'close']].rename(columns={'close': '标的收盘'})
 
-    # 合并并绘图
-    df_merged = pd.merge(df_params, df_price, on='日期', how='inner')
+    # 合并并绘图（按行情缓存版本、标的与日期范围缓存合并结果）
+    df_merged = hedge_series(params_data, price_list, market_version(), underlying_code, start_str, end_str)
     fig = make_subplots(
         rows=2, cols=1,
         shared_xaxes=True,
@@ -56,23 +127,26 @@ def render():
         ]
     )
     fig.add_trace(
-        go.Scatter(x=df_merged['日期'], y=df_merged['标的收盘'], mode='lines+markers', name='标的收盘'),
+        line_trace(df_merged['日期'], df_merged['标的收盘'], '标的收盘'),
         row=1, col=1
     )
     fig.update_yaxes(title_text='标的收盘', row=1, col=1)
     fig.add_trace(
-        go.Scatter(x=df_merged['日期'], y=df_merged['-b值'], mode='lines+markers', name='-b值'),
+        line_trace(df_merged['日期'], df_merged['-b值'], '-b值'),
         row=2, col=1, secondary_y=False
     )
     fig.add_trace(
-        go.Scatter(x=df_merged['日期'], y=df_merged['波动率'], mode='lines+markers', name='波动率'),
+        line_trace(df_merged['日期'], df_merged['波动率'], '波动率'),
         row=2, col=1, secondary_y=True
     )
     fig.update_yaxes(title_text='-b值', row=2, col=1, secondary_y=False)
     fig.update_yaxes(title_text='波动率', row=2, col=1, secondary_y=True)
     fig.update_layout(title=f"{underlying_code} 对冲参数与标的收盘价格时间序列", legend_title='图例')
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig, "hedge", use_container_width=True)
 
     # Show data
     st.subheader("对冲参数数据明细")
-    st.dataframe(df_merged)
\ No newline at end of file
+    paged_table(df_merged, key="hedge_detail", file_name=f"{underlying_code}_对冲参数")
+    render_analytics([underlying_code], start_date, end_str)
+    stats = get_market_cache().stats()
+    st.caption(f"本地缓存命中率 {stats['hit_rate']:.0%}（{stats['hits']}/{stats['requests']} 次请求，上游拉取 {stats['fetches']} 次）")
\ No newline at end of file
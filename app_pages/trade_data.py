@@ -1,22 +1,25 @@
 import streamlit as st
-import pandas as pd
-from collections import defaultdict
 import plotly.express as px
-from api import get_trade_data
-from classification import apply_classification, classification_options
+from api import data_version, load_trade_facets, load_trade_view, new_trade_query, shared_trades
+from classification import classification_options, unmapped_counterparties
+from charts import show_chart
+from compute import counterparty_chart, counterparty_summary
+from tables import paged_table
 
 def render():
     st.header("交易数据分析")
 
-    # 1) 获取原始交易数据
-    data = get_trade_data()
-    if not data:
+    # 1) 各维度取值（用于生成筛选项）
+    facets = load_trade_facets()
+    if facets.empty:
         st.write("无法获取交易数据，或暂无数据。")
         return
-    df = pd.DataFrame(data)
 
-    # 2) 应用对手方分类
-    df = apply_classification(df)
+    # 2) 对手方分类（交易表已带 '分类' 列；映射文件中没有的对手方归为 '其它'）
+    unmapped = unmapped_counterparties(facets)
+    if unmapped:
+        with st.sidebar.expander(f"未配置分类的交易对手方（{len(unmapped)}）"):
+            st.write("、".join(map(str, unmapped)))
     class_opts = classification_options()
     # 全选分类按钮
     all_class = st.checkbox("全选对手方分类", value=True)
@@ -24,13 +27,13 @@ def render():
     selected_classes = st.multiselect(
         "对手方分类", options=class_opts, default=default_classes
     )
-    df = df[df['分类'].isin(selected_classes)]
+    facets = facets[facets['分类'].isin(selected_classes)]
 
     # 3) 侧边栏：状态、类型、产品、对手方 筛选
-    status_opts = df['tradeStatus'].dropna().unique().tolist() if 'tradeStatus' in df.columns else []
-    type_opts   = df['tradeType'].dropna().unique().tolist()   if 'tradeType' in df.columns else []
-    prod_opts   = df['productType'].dropna().unique().tolist() if 'productType' in df.columns else []
-    cpty_opts   = df['counterparty'].dropna().unique().tolist() if 'counterparty' in df.columns else []
+    status_opts = facets['tradeStatus'].dropna().unique().tolist() if 'tradeStatus' in facets.columns else []
+    type_opts   = facets['tradeType'].dropna().unique().tolist()   if 'tradeType' in facets.columns else []
+    prod_opts   = facets['productType'].dropna().unique().tolist() if 'productType' in facets.columns else []
+    cpty_opts   = facets['counterparty'].dropna().unique().tolist() if 'counterparty' in facets.columns else []
     for opts in [status_opts, type_opts, prod_opts, cpty_opts]:
         opts.sort()
 
@@ -40,89 +43,40 @@ def render():
     selected_prods  = st.sidebar.multiselect("产品类型", options=prod_opts, default=prod_opts)
     selected_cptys  = st.sidebar.multiselect("交易对手方", options=cpty_opts, default=cpty_opts)
 
-    # 4) 应用侧边栏筛选
-    df_f = df.copy()
+    # 4) 按筛选条件取交易（可下推的条件交给接口，其余在本地筛选；共享交易表本身不被修改）
+    query = new_trade_query().isin('分类', selected_classes)
     if selected_status:
-        df_f = df_f[df_f['tradeStatus'].isin(selected_status)]
+        query.isin('tradeStatus', selected_status)
     if selected_types:
-        df_f = df_f[df_f['tradeType'].isin(selected_types)]
+        query.isin('tradeType', selected_types)
     if selected_prods:
-        df_f = df_f[df_f['productType'].isin(selected_prods)]
+        query.isin('productType', selected_prods)
     if selected_cptys:
-        df_f = df_f[df_f['counterparty'].isin(selected_cptys)]
+        query.isin('counterparty', selected_cptys)
+    version = data_version()
+    # 池化执行时筛选与汇总都在计算进程中进行，本进程只在展开明细时筛选
+    shared = shared_trades()
+    df_f = load_trade_view(query) if shared is None else None
 
-    if df_f.empty:
+    # 5) 聚合计算（对手方 × 产品向量化汇总，列名已翻译，总计列在前；按数据版本与筛选条件缓存，
+    #    池化执行时在计算进程中进行）
+    df_res = counterparty_summary(df_f, version, query.key(), query, shared)
+    if df_res.empty:
         st.warning("没有满足筛选条件的交易数据。")
         return
 
-    # 5) 聚合计算
-    res = defaultdict(lambda: defaultdict(int))
-    for trade in df_f.to_dict(orient='records'):
-        pt = trade.get('productType','')
-        cp = trade.get('counterparty','')
-        payoff = trade.get('tradeTerminationPayoff',0)
-        notional = trade.get('notionalPrincipal',0)
-        if pt != 'Phoenix':
-            res[cp][f"{pt} TradeTerminationPayoff"]   += payoff
-            res[cp][f"{pt} NotionalPrincipal"]         += notional
-            res[cp]['Total TradeTerminationPayoff']     += payoff
-        else:
-            coupons = trade.get('couponsPaid',[])
-            res[cp]['Phoenix TradeTerminationPayoff']  += sum(coupons)
-            res[cp][f"{pt} NotionalPrincipal"]         += notional
-            res[cp]['Total TradeTerminationPayoff']     += sum(coupons)
-        res[cp]['Total NotionalPrincipal']            += notional
-
-    # 6) 列名翻译
-    def translate_column(col: str) -> str:
-        mapping = {
-            'Trinary Snowball TradeTerminationPayoff': '三元雪球了结收益',
-            'Trinary Snowball NotionalPrincipal':     '三元雪球名义本金',
-            'Autocallable Airbag TradeTerminationPayoff': '锁盈缓冲了结收益',
-            'Autocallable Airbag NotionalPrincipal':     '锁盈缓冲名义本金',
-            'Autocall Binary TradeTerminationPayoff':    '自动赎回二元了结收益',
-            'Autocall Binary NotionalPrincipal':         '自动赎回二元名义本金',
-            'Phoenix TradeTerminationPayoff':            '凤凰了结收益',
-            'Phoenix NotionalPrincipal':                 '凤凰名义本金',
-            'Total TradeTerminationPayoff':              '总了结收益',
-            'Total NotionalPrincipal':                   '总名义本金',
-            'Snowball TradeTerminationPayoff':           '雪球了结收益',
-            'Snowball NotionalPrincipal':                '雪球名义本金',
-            'Binary TradeTerminationPayoff':             '二元了结收益',
-            'Binary NotionalPrincipal':                  '二元名义本金',
-            'Vanilla TradeTerminationPayoff':            '香草了结收益',
-            'Vanilla NotionalPrincipal':                 '香草名义本金',
-            'Shark Fin TradeTerminationPayoff':          '鲨鱼鳍了结收益',
-            'Shark Fin NotionalPrincipal':               '鲨鱼鳍名义本金'
-        }
-        for k in sorted(mapping.keys(), key=len, reverse=True):
-            col = col.replace(k, mapping[k])
-        return col
-
-    df_res = pd.DataFrame(res).T.fillna(0)
-    df_res.columns = [translate_column(c) for c in df_res.columns]
-    priority = ['总了结收益','总名义本金']
-    others   = [c for c in df_res.columns if c not in priority]
-    df_res = df_res[priority + others]
-
-    # 7) 展示表格
+    # 6) 展示表格
     st.subheader("交易数据展示")
     df_copy = df_res.reset_index()
     df_copy.insert(0, "序号", range(1, len(df_copy)+1))
     df_copy.rename(columns={"index":"交易对手方"}, inplace=True)
-    st.data_editor(df_copy, num_rows="dynamic")
+    paged_table(df_copy, key="trade_summary", file_name="交易对手方汇总")
 
-    # 8) 主区指标选择
+    # 7) 主区指标选择
     selected_metric = st.radio("选择指标", options=["名义本金","了结收益"], index=0)
 
-    # 9) 准备并绘图
-    df_plot = df_res.reset_index().rename(columns={"index":"交易对手方"})
-    melted = df_plot.melt(
-        id_vars=["交易对手方"],
-        var_name="产品",
-        value_name="数值"
-    )
-    melted = melted[melted["产品"].str.contains(selected_metric)]
+    # 8) 准备并绘图（切换指标只从缓存的汇总结果中取数）
+    melted, order, pie_df = counterparty_chart(df_f, version, query.key(), selected_metric, query, shared)
 
     st.subheader("皇家堆叠直方图")
     fig_stack = px.bar(
@@ -132,17 +86,19 @@ def render():
         labels={"交易对手方":"交易对手方","数值":"数值","产品":"产品"},
         title="各交易对手方在不同产品下的堆叠直方图"
     )
-    order = (
-        melted.groupby("交易对手方", as_index=False)["数值"]
-        .sum().sort_values("数值")["交易对手方"].tolist()
-    )
     fig_stack.update_yaxes(categoryorder="array", categoryarray=order)
-    st.plotly_chart(fig_stack, use_container_width=True)
+    show_chart(fig_stack, "counterparty_stack", use_container_width=True)
 
     st.subheader("皇家饼图")
-    pie_df = melted.groupby("交易对手方", as_index=False)["数值"].sum()
     fig_pie = px.pie(
         pie_df, names="交易对手方", values="数值",
         title="各交易对手方在所有产品下的占比"
     )
-    st.plotly_chart(fig_pie, use_container_width=True)
+    show_chart(fig_pie, "counterparty_pie", use_container_width=True)
+
+    # 9) 交易明细（服务端分页，只发送当前页）
+    with st.expander("交易明细"):
+        if df_f is None and st.toggle("加载交易明细", key="trade_detail_load"):
+            df_f = load_trade_view(query)
+        if df_f is not None:
+            paged_table(df_f, key="trade_detail", file_name="交易明细")
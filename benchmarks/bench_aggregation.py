@@ -0,0 +1,67 @@
+"""
+对比 trade_data 原逐行聚合与 aggregation.aggregate_counterparty 的耗时，并校验结果一致。
+
+    python -m benchmarks.bench_aggregation [规模 ...]
+"""
+import sys
+import time
+from collections import defaultdict
+
+import pandas as pd
+
+from aggregation import aggregate_counterparty
+from benchmarks.synthetic import make_trade_frame
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def legacy_aggregate(df_f: pd.DataFrame) -> pd.DataFrame:
+    """原 trade_data.render 第 5、6 步的逐行实现"""
+    res = defaultdict(lambda: defaultdict(int))
+    for trade in df_f.to_dict(orient='records'):
+        pt = trade.get('productType','')
+        cp = trade.get('counterparty','')
+        payoff = trade.get('tradeTerminationPayoff',0)
+        notional = trade.get('notionalPrincipal',0)
+        if pt != 'Phoenix':
+            res[cp][f"{pt} TradeTerminationPayoff"]   += payoff
+            res[cp][f"{pt} NotionalPrincipal"]         += notional
+            res[cp]['Total TradeTerminationPayoff']     += payoff
+        else:
+            coupons = trade.get('couponsPaid',[])
+            res[cp]['Phoenix TradeTerminationPayoff']  += sum(coupons)
+            res[cp][f"{pt} NotionalPrincipal"]         += notional
+            res[cp]['Total TradeTerminationPayoff']     += sum(coupons)
+        res[cp]['Total NotionalPrincipal']            += notional
+
+    def translate_column(col: str) -> str:
+        from aggregation import COLUMN_LABELS as mapping
+        for k in sorted(mapping.keys(), key=len, reverse=True):
+            col = col.replace(k, mapping[k])
+        return col
+
+    df_res = pd.DataFrame(res).T.fillna(0)
+    df_res.columns = [translate_column(c) for c in df_res.columns]
+    priority = ['总了结收益','总名义本金']
+    others   = [c for c in df_res.columns if c not in priority]
+    return df_res[priority + others]
+
+
+def timed(func, *args):
+    t0 = time.perf_counter()
+    out = func(*args)
+    return out, time.perf_counter() - t0
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'规模':>10} {'逐行(s)':>10} {'向量化(s)':>10} {'加速比':>8}")
+    for n in sizes:
+        df = make_trade_frame(n)
+        expected, t_old = timed(legacy_aggregate, df)
+        actual, t_new = timed(aggregate_counterparty, df)
+        pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+        print(f"{n:>10} {t_old:>10.3f} {t_new:>10.3f} {t_old / t_new:>8.1f}")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or SIZES)
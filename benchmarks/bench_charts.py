@@ -0,0 +1,73 @@
+"""
+图表负载对比：原始全量 trace/分类 与 charts 降采样、前 N 名合并后的 figure JSON 大小与构建耗时。
+浏览器端渲染耗时与 JSON 大小、trace 数近似成正比，这里以序列化结果衡量。
+
+    python -m benchmarks.bench_charts
+"""
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from charts import line_trace, top_n
+
+SERIES_LENGTHS = [2_000, 20_000, 200_000]
+
+
+def measure(build) -> tuple[int, float, int]:
+    """(JSON 字节数, 构建 + 序列化耗时秒, trace 数)"""
+    t0 = time.perf_counter()
+    fig = build()
+    size = len(fig.to_json().encode('utf-8'))
+    return size, time.perf_counter() - t0, len(fig.data)
+
+
+def report(name: str, before, after) -> None:
+    print(f"{name:<28} {before[0] / 1e3:>10.0f} {after[0] / 1e3:>10.0f} "
+          f"{before[1] * 1e3:>10.0f} {after[1] * 1e3:>10.0f} {before[2]:>7} {after[2]:>7}")
+
+
+def series_case(n: int):
+    rng = np.random.default_rng(0)
+    x = pd.Series(pd.date_range('2000-01-01', periods=n, freq='h'))
+    y = pd.Series(3000 + np.cumsum(rng.normal(size=n)))
+
+    def before():
+        return go.Figure([go.Scatter(x=x, y=y, mode='lines+markers', name='标的收盘')])
+
+    def after():
+        return go.Figure([line_trace(x, y, '标的收盘')])
+
+    return before, after
+
+
+def stacked_case(n_cp: int, n_periods: int):
+    rng = np.random.default_rng(1)
+    agg = pd.DataFrame({
+        '周期': np.repeat(pd.date_range('2020-01-05', periods=n_periods, freq='W-SUN'), n_cp),
+        'counterparty': np.tile([f"CP{i:04d}" for i in range(n_cp)], n_periods),
+        '名义本金': rng.pareto(1.5, n_cp * n_periods) * 1e6,
+    })
+
+    def before():
+        return px.bar(agg, x='周期', y='名义本金', color='counterparty', barmode='stack')
+
+    def after():
+        return px.bar(top_n(agg, 'counterparty', '名义本金', by=['周期']),
+                      x='周期', y='名义本金', color='counterparty', barmode='stack')
+
+    return before, after
+
+
+def main() -> None:
+    print(f"{'图表':<28} {'原KB':>10} {'新KB':>10} {'原ms':>10} {'新ms':>10} {'原trace':>7} {'新trace':>7}")
+    for n in SERIES_LENGTHS:
+        report(f"折线 {n} 点", *map(measure, series_case(n)))
+    for n_cp, n_periods in [(200, 52), (800, 156)]:
+        report(f"堆叠柱 {n_cp} 对手方 x {n_periods} 周", *map(measure, stacked_case(n_cp, n_periods)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+交易对手方分类：原 Series.map(dict).fillna 与 classification.ClassificationIndex 按编码映射的对比，
+并演示映射文件修改后自动重新加载。
+
+    python -m benchmarks.bench_classification [规模 ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.bench_trade_frame import write_mapping
+from benchmarks.synthetic import make_trade_frame
+from classification import OTHER, get_index
+
+SIZES = [100_000, 1_000_000]
+
+
+def legacy_map(df: pd.DataFrame, mapping_path: str) -> pd.Series:
+    """原 load_classification_map + apply_classification"""
+    table = pd.read_csv(mapping_path)
+    mapping = {}
+    for col in table.columns:
+        for name in table[col].dropna():
+            mapping[name] = col
+    return df['counterparty'].map(mapping).fillna(OTHER)
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def main(sizes: list[int]) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'mapping.csv')
+        write_mapping(path)
+        print(f"{'行数':>9} {'原(ms)':>9} {'对象列(ms)':>11} {'category列(ms)':>15}")
+        for n in sizes:
+            df = make_trade_frame(n)
+            typed = df['counterparty'].astype('category')
+            expected, t_old = timed(lambda: legacy_map(df, path))
+            index = get_index(path)
+            got_obj, t_obj = timed(lambda: index.classify(df['counterparty']))
+            got_cat, t_cat = timed(lambda: index.classify(typed))
+            assert (got_obj.astype(object) == expected.astype(object)).all()
+            assert (got_cat.astype(object) == expected.astype(object)).all()
+            print(f"{n:>9} {t_old * 1e3:>9.1f} {t_obj * 1e3:>11.1f} {t_cat * 1e3:>15.1f}")
+
+        # 映射文件修改后，下一次 get_index 自动重新加载
+        before = get_index(path)
+        write_mapping(path, n_counterparties=1000)
+        os.utime(path, ns=(before.stamp + 1_000_000, before.stamp + 1_000_000))
+        after = get_index(path)
+        unmapped = after.unmapped(make_trade_frame(10_000)['counterparty'])
+        print(f"重新加载: {before is not after}，映射 {len(before.names)} -> {len(after.names)} 个对手方，"
+              f"未映射 {len(unmapped)} 个")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or SIZES)
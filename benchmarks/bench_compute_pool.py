@@ -0,0 +1,105 @@
+"""
+多进程计算池：1、4、16 个模拟会话并发请求交易数据分析页的筛选汇总与趋势页的长区间期末存续切片，
+对比会话线程内执行（inline）与交给计算池（pool）的吞吐量与平均延迟，并校验两种方式结果一致。
+每个请求的筛选条件互不相同（不命中 compute.py 的记忆化）。
+
+    python -m benchmarks.bench_compute_pool [交易笔数] [计算进程数]
+"""
+import datetime
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import compute
+import config
+import compute_pool
+from benchmarks.bench_trade_frame import write_mapping
+from benchmarks.synthetic import make_trades
+from trade_frame import normalize_trades
+from trade_query import TradeQuery
+from trend_cube import TrendCube
+
+SESSIONS = [1, 4, 16]
+REQUESTS_PER_SESSION = 4
+TREND_START = datetime.date(2020, 1, 1)
+TREND_END = datetime.date(2024, 12, 31)
+
+
+def make_requests(df: pd.DataFrame, n: int, seed: int) -> list[tuple]:
+    """n 个互不相同的请求：(页面, 筛选条件)，两页交替；对手方各随机保留一半"""
+    rng = np.random.default_rng(seed)
+    cptys = np.array(sorted(df['counterparty'].unique()))
+    dims = {dim: sorted(df[dim].dropna().unique()) for dim in ['分类', 'tradeType', 'productType']}
+    out = []
+    for i in range(n):
+        filters = dict(dims, counterparty=sorted(cptys[rng.random(len(cptys)) < 0.5]))
+        out.append(('trade_data' if i % 2 == 0 else 'product_trend', filters))
+    return out
+
+
+def serve(request: tuple, frame, cube, version, shared):
+    """一个请求的重计算部分：inline 时在本线程筛选与汇总/切片，pool 时交给计算池"""
+    page, filters = request
+    if page == 'trade_data':
+        query = TradeQuery()
+        for dim, values in filters.items():
+            query.isin(dim, values)
+        view = query.apply(frame) if shared is None else None
+        return compute.counterparty_summary(view, version, query.key(), query, shared)
+    return compute.trend_slice(cube, version, '期末存续', 'W', TREND_START, TREND_END, filters, shared)
+
+
+def run_sessions(requests: list[tuple], sessions: int, *args) -> tuple[float, float, list]:
+    """sessions 个线程各自依次处理自己的请求，返回 (总耗时, 平均延迟, 结果)"""
+    per = [requests[i::sessions] for i in range(sessions)]
+    latencies = []
+
+    def session(reqs):
+        out = []
+        for req in reqs:
+            t0 = time.perf_counter()
+            out.append(serve(req, *args))
+            latencies.append(time.perf_counter() - t0)
+        return out
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        results = list(pool.map(session, per))
+    return time.perf_counter() - t0, float(np.mean(latencies)), results
+
+
+def main(n: int, workers: int) -> None:
+    config.COMPUTE_POOL_WORKERS = workers
+    with tempfile.TemporaryDirectory() as tmp:
+        mapping_path = os.path.join(tmp, 'mapping.csv')
+        write_mapping(mapping_path)
+        frame = normalize_trades(make_trades(n), mapping_path)
+    cube = TrendCube(frame)
+    pool = compute_pool.get_pool()
+    shared = pool.publish(frame)
+    # 预热：各计算进程载入共享交易表并构建立方体
+    warm = make_requests(frame, 2 * workers, seed=-1 % 2 ** 32)
+    run_sessions(warm, workers, frame, cube, 'warm', shared)
+
+    print(f"{n} 笔交易，{workers} 个计算进程（本机 {os.cpu_count()} 核），每个会话 {REQUESTS_PER_SESSION} 个请求")
+    print(f"{'会话':>4} {'方式':<7} {'吞吐(请求/s)':>12} {'平均延迟(s)':>11}")
+    for sessions in SESSIONS:
+        requests = make_requests(frame, sessions * REQUESTS_PER_SESSION, seed=sessions)
+        outputs = {}
+        for mode, use in [('inline', None), ('pool', shared)]:
+            elapsed, latency, outputs[mode] = run_sessions(requests, sessions, frame, cube, (mode, sessions), use)
+            print(f"{sessions:>4} {mode:<7} {len(requests) / elapsed:>12.2f} {latency:>11.3f}", flush=True)
+        for inline, pooled in zip(sum(outputs['inline'], []), sum(outputs['pool'], [])):
+            pd.testing.assert_frame_equal(inline, pooled, check_categorical=False)
+    print(pool.stats())
+    pool.shutdown()
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 200_000, int(args[1]) if len(args) > 1 else (os.cpu_count() or 1))
@@ -0,0 +1,60 @@
+"""
+对冲参数衍生分析：十年、四个指数的滚动已实现波动率、波动率价差与 b 值相关系数。
+对比从原始行情完整计算与复用缓存收益率（只改滚动窗口）的耗时，并用逐日循环校验结果。
+
+    python -m benchmarks.bench_hedge_analytics [年数]
+"""
+import datetime
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import compute
+import config
+from benchmarks.synthetic import make_bs_params, make_prices
+from hedge_analytics import TRADING_DAYS, WINDOWS
+
+END = datetime.date(2024, 12, 31)
+
+
+def loop_realized_vol(close: pd.Series, window: int) -> pd.Series:
+    """逐日循环的参考实现"""
+    returns = np.log(close.to_numpy(dtype=float))
+    returns = returns[1:] - returns[:-1]
+    out = np.full(len(close), np.nan)
+    for i in range(window, len(close)):
+        out[i] = returns[i - window:i].std(ddof=1) * np.sqrt(TRADING_DAYS)
+    return pd.Series(out, index=close.index)
+
+
+def main(years: int) -> None:
+    codes = config.UNDERLYING_CODES
+    start = END - datetime.timedelta(days=365 * years)
+    start_str, end_str = start.isoformat(), END.isoformat()
+    params = {code: make_bs_params([code], start_str, end_str) for code in codes}
+    prices = make_prices(codes, start_str, end_str)
+    print(f"{len(codes)} 个标的，{years} 年，每个标的 {len(prices[codes[0]])} 个交易日")
+
+    def derived(version: int, window: int) -> tuple[dict, float]:
+        t0 = time.perf_counter()
+        out = compute.hedge_derived(params, prices, version, codes, start_str, end_str, window)
+        return out, time.perf_counter() - t0
+
+    print(f"{'窗口':>6} {'完整计算(ms)':>12} {'复用收益率(ms)':>14}")
+    for i, window in enumerate(WINDOWS):
+        # 每个窗口用新的数据版本从原始行情算一次，再在缓存了收益率的版本上换窗口计算
+        _, t_full = derived(-1 - i, window)
+        compute.hedge_derived(params, prices, 0, codes, start_str, end_str, WINDOWS[i - 1])
+        out, t_reuse = derived(0, window)
+        print(f"{window:>6} {t_full * 1e3:>12.1f} {t_reuse * 1e3:>14.1f}")
+
+        close = pd.Series({pd.Timestamp(bar['date']): bar['close'] for bar in prices[codes[0]]})
+        expected = loop_realized_vol(close, window)
+        pd.testing.assert_series_equal(out['realized'][codes[0]], expected.loc[start_str:end_str],
+                                       check_names=False, check_freq=False, rtol=1e-9)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
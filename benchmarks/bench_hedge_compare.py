@@ -0,0 +1,77 @@
+"""
+多标的对冲参数对比：逐个标的串行拉取（相当于依次打开四次页面）与合并请求、并发拉取的延迟对比，
+并校验按日期对齐的宽表与逐个标的合并结果一致。
+
+    python -m benchmarks.bench_hedge_compare [接口延迟秒] [窗口天数]
+"""
+import datetime
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import api
+import config
+from benchmarks.stub_server import StubAPI, base_url, serve
+from hedge_frame import comparison_frame, hedge_frame
+from market_cache import MarketCache
+
+END = datetime.date(2024, 12, 31)
+
+
+def main(latency: float, days: int) -> None:
+    stub = StubAPI([], latency=latency)
+    server = serve(stub)
+    config.API_BASE_URL = base_url(server)
+    codes = config.UNDERLYING_CODES
+    start = END - datetime.timedelta(days=days)
+
+    def cache(tmp: str, name: str, **kwargs) -> MarketCache:
+        return MarketCache(os.path.join(tmp, f'{name}.sqlite3'), api.fetch_price_data, api.fetch_bs_params, **kwargs)
+
+    def sequential(c: MarketCache) -> tuple[dict, dict]:
+        params, prices = {}, {}
+        for code in codes:
+            params[code] = c.bs_params(code, start, END)
+            prices.update(c.prices([code], start, END))
+        return params, prices
+
+    def together(c: MarketCache) -> tuple[dict, dict]:
+        """与 api.get_hedge_data 相同：对冲参数与行情并发拉取"""
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            params = pool.submit(c.bs_params_many, codes, start, END)
+            prices = pool.submit(c.prices, codes, start, END)
+            return params.result(), prices.result()
+
+    print(f"{len(codes)} 个标的，{days} 天，接口延迟 {latency * 1e3:.0f} ms")
+    print(f"{'方式':<14} {'上游请求':>8} {'耗时(s)':>8}")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, kwargs, fetch in [
+            ('逐个串行', {}, sequential),
+            ('合并请求', {'batch_bs_params': True}, together),
+            ('逐个并发', {'batch_bs_params': False, 'max_workers': len(codes)}, together),
+        ]:
+            stub.reset_stats()
+            t0 = time.perf_counter()
+            results[name] = fetch(cache(tmp, name, **kwargs))
+            elapsed = time.perf_counter() - t0
+            print(f"{name:<14} {sum(stub.calls.values()):>8} {elapsed:>8.2f}")
+    server.shutdown()
+
+    params, prices = results['逐个串行']
+    for name, (p, pr) in results.items():
+        assert p == params and pr == prices, name
+    wide = comparison_frame(params, prices)
+    for code in codes:
+        single = hedge_frame(params[code], prices[code]).set_index('日期')
+        pd.testing.assert_series_equal(wide[('波动率', code)].dropna(), single['波动率'],
+                                       check_names=False, check_freq=False)
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(float(args[0]) if args else 0.2, int(args[1]) if len(args) > 1 else 365)
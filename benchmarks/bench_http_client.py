@@ -0,0 +1,69 @@
+"""
+多个会话同时打开页面时，逐次 requests.post 与共享 ApiClient（连接池 + 合并相同请求）的对比。
+
+    python -m benchmarks.bench_http_client [并发会话数] [模拟延迟秒]
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.stub_server import StubAPI, base_url, serve
+from benchmarks.synthetic import make_trades
+from http_client import ApiClient
+
+PATH = '/api/mkt-accessor-v2/get-price'
+CODES = ['000016.SH', '000300.SH', '000905.SH', '000852.SH']
+
+
+def session_requests(base: str, day: int) -> None:
+    """一个会话打开对冲参数页：行情 + 对冲参数"""
+    payload = {'codes': CODES, 'startDate': '2024-01-01', 'endDate': f'2024-06-{day:02d}'}
+    requests.post(base + PATH, json=payload, timeout=10).raise_for_status()
+    bs = {'underlyingCode': ['000852.SH'], 'parameterGroup': ['hedge'],
+          'adjustmentDateStart': '2024-01-01', 'adjustmentDateEnd': f'2024-06-{day:02d}'}
+    requests.post(base + '/api/datahub/query-bs-params?date-in-iso=1', json=bs, timeout=10).raise_for_status()
+
+
+def session_client(client: ApiClient, day: int) -> None:
+    payload = {'codes': CODES, 'startDate': '2024-01-01', 'endDate': f'2024-06-{day:02d}'}
+    client.post_json(PATH, payload)
+    bs = {'underlyingCode': ['000852.SH'], 'parameterGroup': ['hedge'],
+          'adjustmentDateStart': '2024-01-01', 'adjustmentDateEnd': f'2024-06-{day:02d}'}
+    client.post_json('/api/datahub/query-bs-params?date-in-iso=1', bs)
+
+
+def run(stub: StubAPI, sessions: int, distinct: int, func) -> tuple[float, dict]:
+    stub.reset_stats()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(sessions) as pool:
+        list(pool.map(func, [1 + i % distinct for i in range(sessions)]))
+    return time.perf_counter() - t0, {'calls': sum(stub.calls.values()), 'connections': stub.connections}
+
+
+def main(sessions: int, latency: float) -> None:
+    stub = StubAPI(make_trades(10), latency=latency)
+    server = serve(stub)
+    base = base_url(server)
+    print(f"{sessions} 个会话并发，接口延迟 {latency}s")
+    print(f"{'方式':<22} {'不同查询':>8} {'耗时(s)':>8} {'上游请求':>8} {'TCP连接':>8}")
+    for distinct in [1, 4]:
+        t, stats = run(stub, sessions, distinct, lambda d: session_requests(base, d))
+        print(f"{'requests.post':<22} {distinct:>8} {t:>8.2f} {stats['calls']:>8} {stats['connections']:>8}")
+        client = ApiClient(base, pool_size=sessions)
+        t, stats = run(stub, sessions, distinct, lambda d: session_client(client, d))
+        print(f"{'ApiClient':<22} {distinct:>8} {t:>8.2f} {stats['calls']:>8} {stats['connections']:>8}")
+        client.close()
+
+    # 瞬时故障：前两次 503 后成功
+    client = ApiClient(base, backoff=0.05)
+    stub.fail_next = 2
+    client.post_json(PATH, {'codes': CODES[:1], 'startDate': '2024-01-01', 'endDate': '2024-01-31'})
+    print(f"瞬时 503 重试后成功，上游请求 {client.upstream_calls} 次")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 32, float(args[1]) if len(args) > 1 else 0.2)
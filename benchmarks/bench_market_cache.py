@@ -0,0 +1,105 @@
+"""
+模拟对冲参数页的交互式日期调整：精确键缓存（原 st.cache_data 行为）与按 (标的, 日期) 区间缓存的对比。
+
+    python -m benchmarks.bench_market_cache [交互次数]
+"""
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+import api
+import config
+from benchmarks.stub_server import StubAPI, base_url, serve
+from benchmarks.synthetic import make_bs_params, make_prices
+from market_cache import MarketCache
+
+CODE = '000852.SH'
+TODAY = datetime.date(2024, 12, 31)
+
+
+def windows(n: int, seed: int = 0) -> list[tuple[str, str]]:
+    """默认 90 天窗口附近的随机起止日调整"""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        end = TODAY - datetime.timedelta(days=rng.randint(0, 30))
+        start = end - datetime.timedelta(days=rng.randint(60, 200))
+        out.append((start.isoformat(), end.isoformat()))
+    return out
+
+
+def check_gaps() -> None:
+    """已缓存区间两侧各有一个缺口时分别拉取两个缺口，不重复拉取中间已缓存的日期"""
+    calls = []
+
+    def fetch_prices(codes, start, end):
+        calls.append((start, end))
+        return make_prices(codes, start, end)
+
+    def fetch_bs_params(codes, start, end):
+        calls.append((start, end))
+        return make_bs_params(codes, start, end)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = MarketCache(os.path.join(tmp, 'market.sqlite3'), fetch_prices, fetch_bs_params, today=lambda: TODAY)
+        cache.prices([CODE], '2024-03-01', '2024-03-31')
+        cache.bs_params(CODE, '2024-03-01', '2024-03-31')
+        calls.clear()
+        prices = cache.prices([CODE], '2024-01-01', '2024-05-31')
+        params = cache.bs_params(CODE, '2024-01-01', '2024-05-31')
+    gaps = [('2024-01-01', '2024-02-29'), ('2024-04-01', '2024-05-31')]
+    assert calls == gaps * 2, calls
+    assert prices == make_prices([CODE], '2024-01-01', '2024-05-31')
+    assert params == make_bs_params([CODE], '2024-01-01', '2024-05-31')
+
+
+def main(n: int) -> None:
+    check_gaps()
+    stub = StubAPI([])
+    server = serve(stub)
+    config.API_BASE_URL = base_url(server)
+    steps = windows(n)
+
+    exact = {}
+    stub.reset_stats()
+    t0 = time.perf_counter()
+    for start, end in steps:
+        key = (start, end)
+        if key not in exact:
+            exact[key] = (api.fetch_bs_params([CODE], start, end), api.fetch_price_data([CODE], start, end))
+    t_exact, calls_exact, bytes_exact = time.perf_counter() - t0, sum(stub.calls.values()), stub.bytes_sent
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'market.sqlite3')
+        cache = MarketCache(path, api.fetch_price_data, api.fetch_bs_params, today=lambda: TODAY)
+        stub.reset_stats()
+        t0 = time.perf_counter()
+        for start, end in steps:
+            params = cache.bs_params(CODE, start, end)
+            prices = cache.prices([CODE], start, end)
+            ref_params, ref_prices = exact[(start, end)]
+            assert params == ref_params and prices == ref_prices
+        t_range, calls_range, bytes_range = time.perf_counter() - t0, sum(stub.calls.values()), stub.bytes_sent
+        stats = cache.stats()
+
+        # 重启后（新实例、同一文件）全部命中
+        stub.reset_stats()
+        restarted = MarketCache(path, api.fetch_price_data, api.fetch_bs_params, today=lambda: TODAY)
+        for start, end in steps:
+            restarted.bs_params(CODE, start, end)
+            restarted.prices([CODE], start, end)
+        restart_calls = sum(stub.calls.values())
+
+    server.shutdown()
+    print(f"{n} 次日期调整")
+    print(f"{'方式':<10} {'上游请求':>8} {'传输(KB)':>10} {'耗时(s)':>8}")
+    print(f"{'精确键':<10} {calls_exact:>8} {bytes_exact / 1024:>10.1f} {t_exact:>8.2f}")
+    print(f"{'区间缓存':<10} {calls_range:>8} {bytes_range / 1024:>10.1f} {t_range:>8.2f}")
+    print(f"区间缓存命中率 {stats['hit_rate']:.0%}；重启后上游请求 {restart_calls} 次")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
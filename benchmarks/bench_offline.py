@@ -0,0 +1,56 @@
+"""
+离线数据集：接口 JSON 载荷（json.loads + normalize_trades）与离线数据集（内存映射 Arrow 读取）
+的体积与加载耗时对比，另列出 Parquet 压缩后的交易表体积供参考；校验读回的交易表与规范化结果一致。
+
+    python -m benchmarks.bench_offline [交易笔数 ...]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+import offline
+from benchmarks.bench_trade_frame import write_mapping
+from benchmarks.synthetic import make_bs_params, make_prices, make_trades
+from trade_frame import normalize_trades
+
+CODES = ['000016.SH', '000300.SH', '000852.SH', '000905.SH']
+START, END = '2015-01-01', '2024-12-31'
+
+
+def best(fn, repeat: int = 3) -> tuple:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return out, min(times)
+
+
+def main(sizes: list[int]) -> None:
+    params = {code: make_bs_params([code], START, END) for code in CODES}
+    prices = make_prices(CODES, START, END)
+    print(f"{'交易笔数':>8} {'JSON(MB)':>9} {'Arrow(MB)':>10} {'Parquet(MB)':>12} "
+          f"{'JSON加载(s)':>11} {'离线加载(s)':>11}")
+    for n in sizes:
+        payload = json.dumps(make_trades(n), ensure_ascii=False).encode('utf-8')
+        with tempfile.TemporaryDirectory() as tmp:
+            mapping_path = os.path.join(tmp, 'mapping.csv')
+            write_mapping(mapping_path)
+            expected, t_json = best(lambda: normalize_trades(json.loads(payload), mapping_path))
+            manifest = offline.write_dataset(tmp, expected, params, prices, {"trade_version": 0})
+            loaded, t_offline = best(lambda: offline.OfflineDataset(tmp))
+            parquet = os.path.join(tmp, 'trades.parquet')
+            expected.to_parquet(parquet, index=False)
+            parquet_bytes = os.path.getsize(parquet)
+        pd.testing.assert_frame_equal(loaded.trades, expected, check_categorical=False)
+        arrow_bytes = manifest["files"][offline.TRADES]["bytes"]
+        print(f"{n:>8} {len(payload) / 2**20:>9.1f} {arrow_bytes / 2**20:>10.1f} {parquet_bytes / 2**20:>12.1f} "
+              f"{t_json:>11.3f} {t_offline:>11.3f}")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000])
@@ -0,0 +1,128 @@
+"""
+对比 product_trend 期末存续原逐时点扫描与扫描线实现（outstanding_by_counterparty，
+亦为趋势立方体期末存续的参考实现，见 bench_trend_cube）的耗时，并校验结果一致。
+
+    python -m benchmarks.bench_outstanding [规模 ...]
+"""
+import datetime
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_trade_frame
+
+SIZES = [10_000, 100_000, 1_000_000]
+VALUE_COLS = ['名义本金', '保证金']
+
+
+def prepare(df: pd.DataFrame, trend_end: datetime.date) -> pd.DataFrame:
+    """product_trend.render 期末存续分支的预处理"""
+    df = df.copy()
+    df['startDate_dt'] = pd.to_datetime(df['tradeStartDate'], errors='coerce').dt.date
+    df['tradeTerminationDate_dt'] = pd.to_datetime(df['tradeTerminationDate'], errors='coerce').dt.date
+    df_o = df[df['startDate_dt'] <= trend_end].copy()
+    df_o['名义本金'] = df_o['notionalPrincipal'].astype(float).fillna(0)
+    df_o['保证金'] = df_o['名义本金'] * df_o['marginRatio'].astype(float).fillna(0)
+    return df_o
+
+
+def legacy_outstanding(df_o: pd.DataFrame, points: pd.DatetimeIndex) -> pd.DataFrame:
+    """原 product_trend.render 的逐时点实现（保留全部指标列）"""
+    frames = []
+    for t in points:
+        t_date = t.date()
+        sel = df_o[
+            (df_o['startDate_dt'] <= t_date) &
+            ((df_o['tradeTerminationDate_dt'].isna()) | (df_o['tradeTerminationDate_dt'] >= t_date))
+        ]
+        if sel.empty:
+            continue
+        grp = sel.groupby('counterparty', as_index=False)[VALUE_COLS].sum()
+        grp['周期'] = pd.to_datetime(t_date)
+        frames.append(grp)
+    return pd.concat(frames, ignore_index=True)
+
+
+def outstanding_by_counterparty(
+    df: pd.DataFrame,
+    points: pd.DatetimeIndex,
+    value_cols: list[str],
+    start_col: str = 'startDate_dt',
+    end_col: str = 'tradeTerminationDate_dt'
+) -> pd.DataFrame:
+    """
+    期末存续：在每个采样时点 t 上按交易对手方汇总 start <= t 且
+    (终止日为空 或 终止日 >= t) 的交易。
+    每笔交易在起始日记 +金额、终止日次日记 -金额，按采样时点分桶后
+    对每个交易对手方做一次累加，复杂度 O(交易数 × log 时点数 + 对手方数 × 时点数)。
+    返回列 counterparty、value_cols、周期，时点内按交易对手方排序。
+    """
+    columns = ['counterparty', *value_cols, '周期']
+    cp = df['counterparty']
+    valid = cp.notna().to_numpy()
+    if not len(points) or not valid.any():
+        return pd.DataFrame(columns=columns)
+
+    cp_codes, cp_keys = pd.factorize(cp[valid], sort=True)
+    starts = pd.to_datetime(df[start_col][valid]).to_numpy(dtype='datetime64[ns]')
+    ends = pd.to_datetime(df[end_col][valid]).to_numpy(dtype='datetime64[ns]')
+    grid = points.to_numpy(dtype='datetime64[ns]')
+
+    # 生效区间换算为时点下标 [first, stop)
+    n_pt = len(grid)
+    first = np.searchsorted(grid, starts, side='left')
+    first[np.isnat(starts)] = n_pt
+    stop = np.searchsorted(grid, ends, side='right')
+    stop[np.isnat(ends)] = n_pt
+    live = first < stop
+    cp_codes, first, stop = cp_codes[live], first[live], stop[live]
+
+    n_cp = len(cp_keys)
+    width = n_pt + 1
+    opens = cp_codes * width + first
+    closes = cp_codes * width + stop
+
+    def sweep(weights=None) -> np.ndarray:
+        events = np.bincount(opens, weights=weights, minlength=n_cp * width)
+        if weights is None:
+            events = events - np.bincount(closes, minlength=n_cp * width)
+        else:
+            events = events - np.bincount(closes, weights=weights, minlength=n_cp * width)
+        return np.cumsum(events.reshape(n_cp, width), axis=1)[:, :n_pt].T
+
+    active = sweep() > 0
+    pt_idx, cp_idx = np.nonzero(active)
+    out = {'counterparty': np.asarray(cp_keys)[cp_idx]}
+    for col in value_cols:
+        values = df[col][valid].to_numpy(dtype=np.float64)[live]
+        out[col] = sweep(values)[pt_idx, cp_idx]
+    stamps = pd.Series([pd.to_datetime(t.date()) for t in points])
+    out['周期'] = stamps.iloc[pt_idx].to_numpy()
+    return pd.DataFrame(out, columns=columns)
+
+
+def timed(func, *args):
+    t0 = time.perf_counter()
+    out = func(*args)
+    return out, time.perf_counter() - t0
+
+
+def main(sizes: list[int]) -> None:
+    trend_end = datetime.date(2024, 12, 31)
+    trend_start = trend_end - datetime.timedelta(days=365)
+    print(f"{'规模':>10} {'频率':>4} {'逐时点(s)':>10} {'扫描线(s)':>10} {'加速比':>8}")
+    for n in sizes:
+        df_o = prepare(make_trade_frame(n), trend_end)
+        for freq, offset in [('W', pd.offsets.Week(weekday=6)), ('M', pd.offsets.MonthEnd())]:
+            points = pd.date_range(trend_start, trend_end, freq=offset)
+            expected, t_old = timed(legacy_outstanding, df_o, points)
+            actual, t_new = timed(outstanding_by_counterparty, df_o, points, VALUE_COLS)
+            # 差分累加与直接求和的浮点舍入顺序不同，按相对误差比较
+            pd.testing.assert_frame_equal(actual, expected, rtol=1e-9)
+            print(f"{n:>10} {freq:>4} {t_old:>10.3f} {t_new:>10.3f} {t_old / t_new:>8.1f}")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or SIZES)
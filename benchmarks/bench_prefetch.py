@@ -0,0 +1,113 @@
+"""
+后台预取：首个用户在冷启动时的等待时间与读取预取快照的耗时对比；用假时钟验证调度。
+
+    python -m benchmarks.bench_prefetch [交易笔数] [接口延迟秒]
+"""
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import api
+import config
+from benchmarks.bench_trade_frame import write_mapping
+from benchmarks.stub_server import StubAPI, base_url, serve
+from benchmarks.synthetic import make_trades
+from market_cache import MarketCache
+from prefetch import Prefetcher
+from trade_store import TradeStore
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def check_pending_refresh(stub: StubAPI) -> None:
+    """交易库已刷新、新快照尚未构建完成时，页面继续读上一份快照（版本一致），不内联重建交易表与立方体"""
+    config.DATA_DIR = tempfile.mkdtemp()
+    config.CLASSIFICATION_PATH = os.path.join(config.DATA_DIR, 'mapping.csv')
+    write_mapping(config.CLASSIFICATION_PATH)
+    config.PREFETCH_ENABLED, config.PREFETCH_INTERVAL_SECONDS = True, 3600
+    prefetcher = api.get_prefetcher()
+    while prefetcher.snapshot() is None:
+        assert prefetcher.last_error is None, prefetcher.last_error
+        time.sleep(0.05)
+    snap = prefetcher.snapshot()
+
+    # 预取线程刚刷新完交易库、仍在构建新快照
+    trades = stub.trades
+    stub.trades = trades[:-1]
+    api.get_trade_store().refresh(full=True)
+    assert api.get_trade_store().version != snap.data['trade_version']
+    assert api.load_trade_frame() is snap.data['trades'] and api.load_trend_cube() is snap.data['trend_cube']
+    assert api.data_version()[1] == snap.data['trade_version']
+
+    # 新快照完成后切换
+    fresh = prefetcher.refresh_now()
+    assert api.load_trade_frame() is fresh.data['trades'] and len(fresh.data['trades']) == len(trades) - 1
+    assert api.data_version()[1] == api.get_trade_store().version
+    prefetcher.stop()
+    stub.trades = trades
+
+
+def main(n: int, latency: float) -> None:
+    stub = StubAPI(make_trades(n), latency=latency)
+    server = serve(stub)
+    config.API_BASE_URL = base_url(server)
+    check_pending_refresh(stub)
+    end = datetime.date.today()
+    start = end - datetime.timedelta(days=config.HEDGE_DEFAULT_DAYS)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = TradeStore(os.path.join(tmp, 'trades.sqlite3'), api.fetch_trades)
+        cache = MarketCache(os.path.join(tmp, 'market.sqlite3'), api.fetch_price_data, api.fetch_bs_params)
+
+        def refresh() -> dict:
+            store.refresh()
+            return {
+                'trades': store.records(),
+                'prices': cache.prices(config.UNDERLYING_CODES, start, end),
+                'bs_params': {c: cache.bs_params(c, start, end) for c in config.UNDERLYING_CODES},
+            }
+
+        # 冷启动：首个请求内联拉取
+        t0 = time.perf_counter()
+        refresh()
+        t_cold = time.perf_counter() - t0
+
+        clock = FakeClock()
+        prefetcher = Prefetcher(refresh, interval=60, clock=clock)
+        assert prefetcher.tick() is not None and prefetcher.age() == 0
+        clock.advance(30)
+        assert prefetcher.tick() is None and prefetcher.age() == 30
+        clock.advance(30)
+        assert prefetcher.tick() is not None
+
+        # 预取后：页面只读快照
+        t0 = time.perf_counter()
+        snap = prefetcher.snapshot()
+        _ = snap.data['trades'], snap.data['prices'], snap.data['bs_params']
+        t_warm = time.perf_counter() - t0
+
+        # 刷新失败时保留旧快照
+        stub.fail_next = 100
+        clock.advance(60)
+        assert prefetcher.tick() is None and prefetcher.snapshot() is snap
+        stub.fail_next = 0
+        print(prefetcher.describe())
+
+    server.shutdown()
+    print(f"冷启动首个请求 {t_cold:.3f}s，读取预取快照 {t_warm * 1e6:.1f}µs")
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 50_000, float(args[1]) if len(args) > 1 else 0.2)
@@ -0,0 +1,91 @@
+"""
+页面重跑延迟（render() 耗时）：切换只影响展示的控件（绘图指标）时，命中页面计算缓存（compute.py）与
+每次重跑前清空缓存（相当于未记忆化、整页重新计算）的对比。用 AppTest 在桩服务上运行页面。
+
+    python -m benchmarks.bench_rerun [交易笔数] [切换次数]
+"""
+import os
+import statistics
+import sys
+import tempfile
+
+import config
+from benchmarks.bench_trade_frame import write_mapping
+from benchmarks.stub_server import StubAPI, base_url, serve
+from benchmarks.synthetic import make_trades
+
+# 在脚本线程内计时 render()（AppTest.run 本身含轮询等待，不适合直接计时）
+PAGE_SCRIPT = '''
+import importlib
+import streamlit as st
+from instrumentation import finish_run, start_run
+run = start_run(PAGE)
+importlib.import_module("app_pages." + PAGE).render()
+finish_run(run)
+st.session_state["_bench_run"] = run
+'''
+
+
+def toggle_radio(label: str, values: list):
+    def act(at, i):
+        next(w for w in at.radio if w.label == label).set_value(values[i % len(values)])
+    return act
+
+
+def toggle_selectbox(label: str, values: list):
+    def act(at, i):
+        next(w for w in at.selectbox if w.label == label).set_value(values[i % len(values)])
+    return act
+
+
+CASES = [
+    ('trade_data', '名义本金/了结收益', toggle_radio("选择指标", ["了结收益", "名义本金"])),
+    ('product_trend', '名义本金/保证金', toggle_selectbox("选择绘图指标", ["保证金", "名义本金"])),
+]
+
+
+def rerun_times(page: str, act, times: int, memoized: bool) -> tuple[list[float], list[float]]:
+    """每次切换后的 (render() 总耗时, 其中数据阶段耗时)；数据阶段为除图表渲染外的计时阶段（不含嵌套）"""
+    from streamlit.testing.v1 import AppTest
+
+    import memo
+    at = AppTest.from_string(f"PAGE = {page!r}\n" + PAGE_SCRIPT, default_timeout=600)
+    at.run()
+    assert not at.exception, at.exception
+    total, data = [], []
+    for i in range(times):
+        act(at, i)
+        if not memoized:
+            memo.clear_all()
+        at.run()
+        assert not at.exception, at.exception
+        run = at.session_state["_bench_run"]
+        total.append(run.duration)
+        data.append(sum(span.duration for span in run.spans
+                        if span.stage.startswith(('api.load_', 'api.filter_view', 'compute.'))))
+    return total, data
+
+
+def main(n: int, times: int) -> None:
+    config.DATA_DIR = tempfile.mkdtemp()
+    config.PREFETCH_ENABLED = False
+    config.CLASSIFICATION_PATH = os.path.join(config.DATA_DIR, 'mapping.csv')
+    write_mapping(config.CLASSIFICATION_PATH)
+    server = serve(StubAPI(make_trades(n)))
+    config.API_BASE_URL = base_url(server)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    print(f"{n} 笔交易，每项切换 {times} 次，耗时中位数（ms，括号内为其中的数据阶段）")
+    print(f"{'页面':<14} {'切换':<12} {'清空缓存':>16} {'命中缓存':>16}")
+    for page, label, act in CASES:
+        cells = []
+        for memoized in (False, True):
+            total, data = rerun_times(page, act, times, memoized)
+            cells.append(f"{statistics.median(total) * 1e3:.1f} ({statistics.median(data) * 1e3:.1f})")
+        print(f"{page:<14} {label:<12} {cells[0]:>16} {cells[1]:>16}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 200_000, int(args[1]) if len(args) > 1 else 6)
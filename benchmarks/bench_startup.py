@@ -0,0 +1,76 @@
+"""
+导航壳的冷启动导入耗时：原 main.py 启动时导入全部页面模块，
+与 page_registry 只导入注册表、选中页面时再导入的对比（各在独立子进程中测量）。
+
+    python -m benchmarks.bench_startup [重复次数]
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 原 main.py 顶部的导入（不含不存在的 app_pages.test）
+EAGER = """
+import config
+from api import get_prefetcher
+from app_pages.trade_data import render
+from app_pages.hedge_params import render
+from app_pages.product_trend import render
+from app_pages.acknowledgements import render
+"""
+
+LAZY_ACK = """
+import config
+from page_registry import get_registry
+get_registry().load("特别鸣谢")
+"""
+
+LAZY_ACK_PREFETCH = """
+import config
+from page_registry import get_registry
+from api import get_prefetcher
+get_registry().load("特别鸣谢")
+"""
+
+LAZY_TREND = """
+import config
+from page_registry import get_registry
+get_registry().load("客户产品趋势分析")
+"""
+
+TEMPLATE = """
+import time
+import streamlit
+t0 = time.perf_counter()
+{body}
+import sys
+heavy = [m for m in ('pandas', 'plotly.express', 'plotly.subplots', 'requests') if m in sys.modules]
+print(time.perf_counter() - t0, ','.join(heavy))
+"""
+
+
+def measure(body: str, repeat: int) -> tuple[float, str]:
+    times, heavy = [], ''
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, '-c', TEMPLATE.format(body=body)],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.split()
+        times.append(float(out[0]))
+        heavy = out[1] if len(out) > 1 else '-'
+    return min(times), heavy
+
+
+def main(repeat: int) -> None:
+    print(f"{'方式':<28} {'导入(ms)':>9}  已加载的重型模块（streamlit 本身不计）")
+    for name, body in [("原 main.py 全量导入", EAGER),
+                       ("注册表 + 特别鸣谢", LAZY_ACK),
+                       ("注册表 + 特别鸣谢（启用预取）", LAZY_ACK_PREFETCH),
+                       ("注册表 + 客户产品趋势分析", LAZY_TREND)]:
+        t, heavy = measure(body, repeat)
+        print(f"{name:<28} {t * 1e3:>9.0f}  {heavy}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
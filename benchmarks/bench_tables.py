@@ -0,0 +1,63 @@
+"""
+明细表负载对比：整表发送（st.dataframe 的 Arrow 负载）与 tables 分页后只发送当前页，
+以及服务端筛选/排序/分页、CSV/XLSX 导出的耗时。
+
+    python -m benchmarks.bench_tables [规模 ...]
+
+另校验下载按钮的延迟数据：export_file 的返回值可被 Streamlit 的下载数据转换接受，且内容与直接写出一致。
+"""
+import io
+import sys
+import time
+
+from streamlit.dataframe_util import convert_anything_to_arrow_bytes
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+from benchmarks.synthetic import make_trade_frame
+from tables import XLSX_MAX_ROWS, export_file, filter_frame, page_slice, sort_frame, write_csv, write_xlsx
+
+SIZES = [10_000, 100_000, 1_000_000]
+PAGE_SIZE = 50
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def check_downloads() -> None:
+    """paged_table 下载按钮的 data 回调结果经 Streamlit 转换后与直接写出的文件内容一致"""
+    df = make_trade_frame(1_000)
+    for fmt, write in [('csv', write_csv), ('xlsx', write_xlsx)]:
+        expected = io.BytesIO()
+        write(df, expected)
+        data, _ = convert_data_to_bytes_and_infer_mime(export_file(df, fmt), RuntimeError(f"不支持的下载数据（{fmt}）"))
+        if fmt == 'csv':
+            assert data == expected.getvalue(), fmt
+        else:
+            assert data[:2] == b'PK' and len(data) > 0, fmt
+
+
+def main(sizes: list[int]) -> None:
+    check_downloads()
+    print(f"{'行数':>9} {'整表KB':>10} {'单页KB':>8} {'整表ms':>8} {'分页ms':>8} {'CSV ms':>8} {'XLSX ms':>8}")
+    for n in sizes:
+        df = make_trade_frame(n)
+        full, t_full = timed(lambda: convert_anything_to_arrow_bytes(df))
+
+        def one_page():
+            view = sort_frame(filter_frame(df, 'counterparty', 'cp00'), 'notionalPrincipal', ascending=False)
+            return convert_anything_to_arrow_bytes(page_slice(view, 3, PAGE_SIZE))
+
+        page, t_page = timed(one_page)
+        _, t_csv = timed(lambda: write_csv(df, io.BytesIO()))
+        t_xlsx = float('nan')
+        if n <= min(XLSX_MAX_ROWS, 100_000):
+            _, t_xlsx = timed(lambda: write_xlsx(df, io.BytesIO()))
+        print(f"{n:>9} {len(full) / 1e3:>10.0f} {len(page) / 1e3:>8.1f} {t_full * 1e3:>8.0f} "
+              f"{t_page * 1e3:>8.0f} {t_csv * 1e3:>8.0f} {t_xlsx * 1e3:>8.0f}")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or SIZES)
@@ -0,0 +1,81 @@
+"""
+对象列 DataFrame 与 trade_frame.normalize_trades 带类型 DataFrame 的内存、页面重跑耗时对比。
+
+    python -m benchmarks.bench_trade_frame [规模 ...]
+"""
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_trades
+from classification import apply_classification
+from trade_frame import normalize_trades
+
+SIZES = [10_000, 100_000, 1_000_000]
+TREND_END = datetime.date(2024, 12, 31)
+
+
+def write_mapping(path: str, n_counterparties: int = 2000) -> None:
+    """生成分类映射 CSV：每列一个分类，列内为交易对手方名称"""
+    names = [f"客户{i:05d}" for i in range(n_counterparties)]
+    pd.DataFrame({
+        '银行': pd.Series(names[0::3]),
+        '券商': pd.Series(names[1::3]),
+    }).to_csv(path, index=False)
+
+
+def legacy_rerun(data: list[dict], mapping_path: str) -> pd.DataFrame:
+    """原页面每次重跑的预处理"""
+    df = pd.DataFrame(data)
+    df = apply_classification(df, mapping_path=mapping_path)
+    df['startDate_dt'] = pd.to_datetime(df['tradeStartDate'], errors='coerce').dt.date
+    df['tradeTerminationDate_dt'] = pd.to_datetime(df['tradeTerminationDate'], errors='coerce').dt.date
+    df = df[df['startDate_dt'] <= TREND_END].copy()
+    df['名义本金'] = df['notionalPrincipal'].astype(float).fillna(0)
+    df['保证金'] = df['名义本金'] * df['marginRatio'].astype(float).fillna(0)
+    return df
+
+
+def typed_rerun(df: pd.DataFrame) -> pd.DataFrame:
+    """共享带类型交易表后每次重跑的预处理"""
+    df = df.assign(
+        startDate_dt=df['tradeStartDate'].dt.normalize(),
+        tradeTerminationDate_dt=df['tradeTerminationDate'].dt.normalize(),
+    )
+    df = df[df['startDate_dt'] <= pd.Timestamp(TREND_END)].copy()
+    df['名义本金'] = df['notionalPrincipal'].fillna(0)
+    df['保证金'] = df['名义本金'] * df['marginRatio'].fillna(0)
+    return df
+
+
+def timed(func, *args, repeat: int = 3):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = func(*args)
+        best = min(best, time.perf_counter() - t0)
+    return out, best
+
+
+def main(sizes: list[int]) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        mapping_path = os.path.join(tmp, 'mapping.csv')
+        write_mapping(mapping_path)
+        print(f"{'规模':>10} {'对象列(MB)':>12} {'带类型(MB)':>12} {'构建(s)':>9} {'原重跑(s)':>10} {'新重跑(s)':>10}")
+        for n in sizes:
+            data = make_trades(n)
+            raw = apply_classification(pd.DataFrame(data), mapping_path=mapping_path)
+            typed, t_build = timed(normalize_trades, data, mapping_path, repeat=1)
+            _, t_old = timed(legacy_rerun, data, mapping_path)
+            _, t_new = timed(typed_rerun, typed)
+            mb_raw = raw.memory_usage(deep=True).sum() / 2**20
+            mb_typed = typed.memory_usage(deep=True).sum() / 2**20
+            print(f"{n:>10} {mb_raw:>12.1f} {mb_typed:>12.1f} {t_build:>9.3f} {t_old:>10.3f} {t_new:>10.3f}")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or SIZES)
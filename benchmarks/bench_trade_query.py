@@ -0,0 +1,84 @@
+"""
+筛选条件下推：全量拉取后本地筛选与 TradeQuery 生成 expr 交给桩服务筛选的传输量对比，
+并校验两种方式得到的交易完全一致（桩服务按表达式真实过滤）。
+
+    python -m benchmarks.bench_trade_query [交易笔数]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.bench_trade_frame import write_mapping
+from benchmarks.stub_server import StubAPI, base_url, serve
+from benchmarks.synthetic import make_trades
+from http_client import ApiClient
+from trade_frame import normalize_trades
+from trade_query import TradeQuery
+
+
+def views(full: pd.DataFrame) -> dict:
+    # 上季度取合成数据最晚起始日所在季度的前一季度；单一对手方取该季度凤凰交易最多的对手方
+    quarter = full['tradeStartDate'].max().to_period('Q') - 1
+    q_start, q_end = quarter.start_time.date(), quarter.end_time.date()
+    in_quarter = full[(full['productType'] == 'Phoenix')
+                      & full['tradeStartDate'].between(quarter.start_time, quarter.end_time)]
+    phoenix_cpty = in_quarter['counterparty'].value_counts().index[:1].tolist()
+    # 交易最多的对手方排在前面，使窄视图非空
+    cptys = full['counterparty'].value_counts().index.tolist()
+    return {
+        "单一对手方上季度凤凰": TradeQuery()
+            .isin('counterparty', phoenix_cpty).isin('productType', ['Phoenix'])
+            .date_from('tradeStartDate', q_start).date_to('tradeStartDate', q_end),
+        "三个产品当期了结": TradeQuery()
+            .isin('productType', ['Snowball', 'Phoenix', 'Vanilla'])
+            .date_from('tradeTerminationDate', q_start).date_to('tradeTerminationDate', q_end),
+        "期末存续（为空或）": TradeQuery()
+            .isin('counterparty', cptys[:10])
+            .date_to('tradeStartDate', q_end).date_from('tradeTerminationDate', q_start, or_null=True),
+        "分类 + 全部对手方": TradeQuery()
+            .isin('分类', ['银行']).isin('counterparty', cptys).isin('tradeType', ['Buy']),
+    }
+
+
+def fetch(client: ApiClient, stub: StubAPI, expr: str) -> tuple[list, int, float]:
+    stub.reset_stats()
+    t0 = time.perf_counter()
+    records = client.post_json('/api/query-trades', {'repo_name': 'all', 'expr': expr}).get('result', [])
+    return records, stub.bytes_sent, time.perf_counter() - t0
+
+
+def same(a: pd.DataFrame, b: pd.DataFrame) -> None:
+    assert len(a) == len(b), (len(a), len(b))
+    if a.empty:
+        return
+    a = a.sort_values('tradeId').reset_index(drop=True).astype(object)
+    b = b.sort_values('tradeId').reset_index(drop=True).astype(object)
+    pd.testing.assert_frame_equal(a[sorted(a.columns)], b[sorted(b.columns)])
+
+
+def main(n: int) -> None:
+    stub = StubAPI(make_trades(n))
+    server = serve(stub)
+    client = ApiClient(base_url(server))
+    with tempfile.TemporaryDirectory() as tmp:
+        mapping_path = os.path.join(tmp, 'mapping.csv')
+        write_mapping(mapping_path)
+        records, full_bytes, full_t = fetch(client, stub, '')
+        full = normalize_trades(records, mapping_path)
+        print(f"{n} 笔交易，全量拉取 {full_bytes / 1e6:.1f}MB / {full_t:.2f}s")
+        print(f"{'视图':<14} {'结果笔数':>8} {'下推KB':>10} {'耗时(s)':>8}  客户端条件")
+        for name, query in views(full).items():
+            records, pushed_bytes, t = fetch(client, stub, query.expr())
+            pushed = query.apply(normalize_trades(records, mapping_path))
+            same(pushed, query.apply(full))
+            assert len(pushed), name
+            print(f"{name:<14} {len(pushed):>8} {pushed_bytes / 1e3:>10.1f} {t:>8.2f}  {', '.join(query.client_only()) or '-'}")
+    client.close()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
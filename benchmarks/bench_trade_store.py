@@ -0,0 +1,55 @@
+"""
+本地交易库：全量初始化与增量刷新的传输量、耗时对比（基于本地桩服务）。
+
+    python -m benchmarks.bench_trade_store [交易笔数] [变更笔数]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import api
+import config
+from benchmarks.stub_server import StubAPI, base_url, serve
+from benchmarks.synthetic import make_trades
+from trade_store import TradeStore
+
+
+def main(n: int, changed: int) -> None:
+    stub = StubAPI(make_trades(n))
+    server = serve(stub)
+    config.API_BASE_URL = base_url(server)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = TradeStore(os.path.join(tmp, 'trades.sqlite3'), api.fetch_trades)
+
+        t0 = time.perf_counter()
+        store.refresh()
+        t_full = time.perf_counter() - t0
+        full_bytes = stub.bytes_sent
+
+        # 模拟当日变更：修改已有交易并新增交易
+        stamp = '2026-01-01T00:00:00'
+        for t in stub.trades[:changed]:
+            t['tradeStatus'] = 'Terminated'
+            t['updateTime'] = stamp
+        stub.trades.append(dict(stub.trades[0], tradeId='T-NEW', updateTime=stamp))
+
+        stub.reset_stats()
+        t0 = time.perf_counter()
+        written = store.refresh()
+        t_delta = time.perf_counter() - t0
+        delta_bytes = stub.bytes_sent
+
+        records = store.records()
+        assert len(records) == n + 1 and written == changed + 1
+        assert {r['tradeId']: r for r in records} == {t['tradeId']: t for t in stub.trades}
+
+    server.shutdown()
+    print(f"{'':>6} {'传输(KB)':>12} {'耗时(s)':>10}")
+    print(f"{'全量':>6} {full_bytes / 1024:>12.1f} {t_full:>10.3f}")
+    print(f"{'增量':>6} {delta_bytes / 1024:>12.1f} {t_delta:>10.3f}   写入 {written} 笔")
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:]]
+    main(args[0] if args else 100_000, args[1] if len(args) > 1 else 500)
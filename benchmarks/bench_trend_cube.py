@@ -0,0 +1,97 @@
+"""
+客户产品趋势：逐次从交易表计算与预聚合立方体（trend_cube.TrendCube）切片的对比，并校验结果一致。
+
+    python -m benchmarks.bench_trend_cube [规模 ...]
+"""
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.bench_outstanding import outstanding_by_counterparty
+from benchmarks.bench_trade_frame import write_mapping
+from benchmarks.synthetic import make_trades
+from trade_frame import normalize_trades
+from trend_cube import NEW, TERMINATED, TrendCube, period_points
+
+SIZES = [100_000, 1_000_000]
+METRICS = ["当期新增", "累计新增", "当期了结", "累计了结", "期末存续"]
+TREND_START = datetime.date(2023, 11, 15)
+TREND_END = datetime.date(2024, 10, 17)
+
+
+def legacy_metric(df: pd.DataFrame, metric_type: str, freq_str: str, filters: dict) -> pd.DataFrame:
+    """product_trend.render 改用立方体之前的计算"""
+    df_f = df[
+        df['分类'].isin(filters['分类']) &
+        df['tradeType'].isin(filters['tradeType']) &
+        df['counterparty'].isin(filters['counterparty']) &
+        df['productType'].isin(filters['productType'])
+    ].copy()
+    start_ts, end_ts = pd.Timestamp(TREND_START), pd.Timestamp(TREND_END)
+    df_f['startDate_dt'] = df_f['tradeStartDate'].dt.normalize()
+    df_f['tradeTerminationDate_dt'] = df_f['tradeTerminationDate'].dt.normalize()
+    df_f['名义本金'] = df_f['notionalPrincipal'].astype(float).fillna(0)
+    df_f['保证金'] = df_f['名义本金'] * df_f['marginRatio'].astype(float).fillna(0)
+    if metric_type != '期末存续':
+        date_field = 'startDate_dt' if '新增' in metric_type else 'tradeTerminationDate_dt'
+        if '当期' in metric_type:
+            df_sel = df_f[(df_f[date_field] >= start_ts) & (df_f[date_field] <= end_ts)].copy()
+        else:
+            df_sel = df_f[df_f[date_field] <= end_ts].copy()
+        df_sel['周期'] = df_sel[date_field].dt.to_period(freq_str).dt.to_timestamp()
+        return df_sel.groupby(['周期', 'counterparty'], as_index=False, observed=True)[['名义本金', '保证金']].sum()
+    df_o = df_f[df_f['startDate_dt'] <= end_ts]
+    return outstanding_by_counterparty(df_o, period_points(TREND_START, TREND_END, freq_str), ['名义本金', '保证金'])
+
+
+def cube_metric(cube: TrendCube, metric_type: str, freq_str: str, filters: dict) -> pd.DataFrame:
+    if metric_type == '期末存续':
+        return cube.outstanding(freq_str, period_points(TREND_START, TREND_END, freq_str), filters)
+    kind = NEW if '新增' in metric_type else TERMINATED
+    date_from = pd.Timestamp(TREND_START) if '当期' in metric_type else None
+    return cube.period_sums(kind, freq_str, date_from, pd.Timestamp(TREND_END), filters)
+
+
+def compare(actual: pd.DataFrame, expected: pd.DataFrame) -> None:
+    actual = actual.assign(counterparty=actual['counterparty'].astype(str))
+    expected = expected.assign(counterparty=expected['counterparty'].astype(str))
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected.reset_index(drop=True),
+                                  check_dtype=False, check_categorical=False, rtol=1e-9)
+
+
+def main(sizes: list[int]) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        mapping_path = os.path.join(tmp, 'mapping.csv')
+        write_mapping(mapping_path)
+        for n in sizes:
+            df = normalize_trades(make_trades(n), mapping_path)
+            t0 = time.perf_counter()
+            cube = TrendCube(df)
+            t_build = time.perf_counter() - t0
+            cptys = sorted(df['counterparty'].dropna().unique().tolist())
+            filters = {
+                '分类': ['银行', '券商', '其它'],
+                'tradeType': ['Buy', 'Sell'],
+                'counterparty': cptys[: len(cptys) // 2],
+                'productType': ['Snowball', 'Phoenix', 'Vanilla', 'Shark Fin'],
+            }
+            print(f"{n} 笔交易，立方体构建 {t_build:.2f}s")
+            print(f"{'指标':<8} {'频率':>4} {'逐次(ms)':>10} {'立方体(ms)':>10}")
+            for metric in METRICS:
+                for freq in ['W', 'M']:
+                    t0 = time.perf_counter()
+                    expected = legacy_metric(df, metric, freq, filters)
+                    t_old = time.perf_counter() - t0
+                    t0 = time.perf_counter()
+                    actual = cube_metric(cube, metric, freq, filters)
+                    t_new = time.perf_counter() - t0
+                    compare(actual, expected)
+                    print(f"{metric:<8} {freq:>4} {t_old * 1e3:>10.1f} {t_new * 1e3:>10.1f}")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or SIZES)
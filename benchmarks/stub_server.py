@@ -0,0 +1,177 @@
+"""
+本地桩服务：模拟交易、对冲参数、行情三个接口，用于基准测试与联调。
+
+    python -m benchmarks.stub_server [交易笔数] [端口]
+"""
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.synthetic import make_bs_params, make_prices, make_trades
+
+_TOKEN = re.compile(r"\s*(?:(\()|(\))|(and|or)\b|(\w+)\s*(>=|<=|==|>|<)\s*'([^']*)')")
+_OPS = {
+    '>=': lambda a, b: a >= b,
+    '<=': lambda a, b: a <= b,
+    '==': lambda a, b: a == b,
+    '>': lambda a, b: a > b,
+    '<': lambda a, b: a < b,
+}
+
+
+def _tokens(expr: str) -> list:
+    tokens, pos = [], 0
+    expr = expr.strip()
+    while pos < len(expr):
+        m = _TOKEN.match(expr, pos)
+        if not m or m.end() == pos:
+            raise ValueError(f"不支持的表达式: {expr[pos:]}")
+        lpar, rpar, word, field, op, value = m.groups()
+        tokens.append(lpar or rpar or word or (field, op, value))
+        pos = m.end()
+        while pos < len(expr) and expr[pos].isspace():
+            pos += 1
+    return tokens
+
+
+def _parse(tokens: list, pos: int = 0, level: str = 'or'):
+    """递归下降：or 优先级低于 and，括号优先；返回 (谓词, 下一位置)"""
+    if level == 'or':
+        left, pos = _parse(tokens, pos, 'and')
+        while pos < len(tokens) and tokens[pos] == 'or':
+            right, pos = _parse(tokens, pos + 1, 'and')
+            left = (lambda l, r: lambda t: l(t) or r(t))(left, right)
+        return left, pos
+    if level == 'and':
+        left, pos = _parse(tokens, pos, 'atom')
+        while pos < len(tokens) and tokens[pos] == 'and':
+            right, pos = _parse(tokens, pos + 1, 'atom')
+            left = (lambda l, r: lambda t: l(t) and r(t))(left, right)
+        return left, pos
+    if pos >= len(tokens):
+        raise ValueError("表达式不完整")
+    token = tokens[pos]
+    if token == '(':
+        inner, pos = _parse(tokens, pos + 1, 'or')
+        if pos >= len(tokens) or tokens[pos] != ')':
+            raise ValueError("括号不匹配")
+        return inner, pos + 1
+    if not isinstance(token, tuple):
+        raise ValueError(f"不支持的表达式: {token}")
+    field, op, value = token
+    return (lambda t: t.get(field) is not None and _OPS[op](str(t.get(field)), value)), pos + 1
+
+
+def evaluate(expr: str, trades: list[dict]) -> list[dict]:
+    """按 expr 过滤交易；支持 字段 运算符 '值' 条件，以 and / or 与括号组合"""
+    if not expr.strip():
+        return trades
+    tokens = _tokens(expr)
+    predicate, pos = _parse(tokens)
+    if pos != len(tokens):
+        raise ValueError(f"不支持的表达式: {expr}")
+    return [t for t in trades if predicate(t)]
+
+
+class StubAPI:
+    """
+    桩服务状态：交易列表、行情与对冲参数生成、调用计数与响应字节数
+    latency 为每次请求的模拟延迟（秒），fail_next 为接下来返回 503 的请求数
+    """
+
+    def __init__(self, trades: list[dict], latency: float = 0.0):
+        self.trades = trades
+        self.latency = latency
+        self.fail_next = 0
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.bytes_sent = 0
+        self.connections = 0
+
+    def reset_stats(self) -> None:
+        with self.lock:
+            self.calls = {}
+            self.bytes_sent = 0
+            self.connections = 0
+
+    def handle(self, path: str, body: dict):
+        if path.startswith('/api/query-trades'):
+            return {'result': evaluate(body.get('expr', ''), self.trades)}
+        if path.startswith('/api/datahub/query-bs-params'):
+            return {'result': make_bs_params(body['underlyingCode'], body['adjustmentDateStart'], body['adjustmentDateEnd'])}
+        if path.startswith('/api/mkt-accessor-v2/get-price'):
+            return {'result': make_prices(body['codes'], body['startDate'], body['endDate'])}
+        return None
+
+
+def _handler(api: StubAPI):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            super().setup()
+            with api.lock:
+                api.connections += 1
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            route = self.path.split('?')[0]
+            with api.lock:
+                api.calls[route] = api.calls.get(route, 0) + 1
+                failing = api.fail_next > 0
+                api.fail_next -= failing
+            if failing:
+                self.send_error(503)
+                return
+            if api.latency:
+                time.sleep(api.latency)
+            try:
+                result = api.handle(self.path, body)
+            except (KeyError, ValueError) as e:
+                self.send_error(400, str(e))
+                return
+            if result is None:
+                self.send_error(404)
+                return
+            payload = json.dumps(result, ensure_ascii=False).encode('utf-8')
+            with api.lock:
+                api.bytes_sent += len(payload)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class _Server(ThreadingHTTPServer):
+    request_queue_size = 256
+
+
+def serve(api: StubAPI, port: int = 0) -> ThreadingHTTPServer:
+    """在后台线程启动桩服务，返回 server（server.server_address 为实际地址）"""
+    server = _Server(('127.0.0.1', port), _handler(api))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def base_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 60000
+    server = serve(StubAPI(make_trades(n)), port)
+    print(f"stub api on {base_url(server)}  (MAGIC_API_BASE_URL={base_url(server)})")
+    threading.Event().wait()
@@ -0,0 +1,197 @@
+"""
+基准测试套件：不依赖界面与网络，用合成数据按多个规模计时三个页面的数据处理路径，
+记录耗时与内存峰值，结果写为 JSON，便于在不同提交之间对比。
+
+    python -m benchmarks.suite [--sizes 10000 100000] [--days 365 1825] [--repeat 5] [--out 结果.json]
+    python -m benchmarks.suite --compare 基线.json 新结果.json [--threshold 0.2]
+
+    用例名形如 trade_data.aggregate、product_trend.累计新增.W、hedge_params.frame。
+    对比时耗时（最优值）或内存峰值增加超过 threshold 的用例记为退化，存在退化时以状态码 1 退出。
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import config
+from aggregation import aggregate_counterparty
+from benchmarks.bench_trade_frame import write_mapping
+from benchmarks.bench_trend_cube import METRICS, cube_metric
+from benchmarks.synthetic import make_bs_params, make_prices, make_trades
+from charts import line_trace, top_n
+from hedge_frame import hedge_frame
+from trade_frame import normalize_trades
+from trend_cube import TrendCube
+
+SIZES = [10_000, 100_000, 1_000_000]
+HEDGE_DAYS = [365, 1825, 7300]
+HEDGE_CODE = config.UNDERLYING_CODES[3]
+HEDGE_END = datetime.date(2024, 12, 31)
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+
+def measure(func, repeat: int) -> dict:
+    """
+    先在 tracemalloc 下运行一次取内存峰值（同时作为预热），再不开 tracemalloc 计时 repeat 次
+    """
+    tracemalloc.start()
+    try:
+        out = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    try:
+        rows = len(out)
+    except TypeError:
+        rows = None
+    return {
+        'best_ms': round(min(times) * 1e3, 3),
+        'median_ms': round(statistics.median(times) * 1e3, 3),
+        'repeat': repeat,
+        'peak_mb': round(peak / 2 ** 20, 3),
+        'rows': rows,
+    }
+
+
+def trade_data_chart(df_res: pd.DataFrame, metric: str = '名义本金') -> pd.DataFrame:
+    """trade_data 页第 8 步：汇总表转长表并保留前 N 名对手方"""
+    df_plot = df_res.reset_index().rename(columns={'index': '交易对手方'})
+    melted = df_plot.melt(id_vars=['交易对手方'], var_name='产品', value_name='数值')
+    melted = melted[melted['产品'].str.contains(metric)]
+    return top_n(melted, '交易对手方', '数值', by=['产品'])
+
+
+def trade_cases(n: int, mapping_path: str):
+    """交易数据分析与客户产品趋势两页的用例：(用例名, 无参函数)"""
+    records = make_trades(n)
+    df = normalize_trades(records, mapping_path)
+    df_res = aggregate_counterparty(df)
+    cube = TrendCube(df)
+    # 页面默认全选各筛选项
+    filters = {dim: df[dim].dropna().unique().tolist() for dim in ['分类', 'tradeType', 'counterparty', 'productType']}
+    yield 'trade_data.normalize', lambda: normalize_trades(records, mapping_path)
+    yield 'trade_data.aggregate', lambda: aggregate_counterparty(df)
+    yield 'trade_data.chart', lambda: trade_data_chart(df_res)
+    yield 'product_trend.cube_build', lambda: TrendCube(df)
+    for metric in METRICS:
+        for freq in ['W', 'M']:
+            yield f'product_trend.{metric}.{freq}', (
+                lambda metric=metric, freq=freq: cube_metric(cube, metric, freq, filters)
+            )
+
+
+def hedge_cases(days: int):
+    """对冲参数页的用例：参数与行情合并、三条折线（含降采样）"""
+    start = (HEDGE_END - datetime.timedelta(days=days)).isoformat()
+    params = make_bs_params([HEDGE_CODE], start, HEDGE_END.isoformat())
+    price_list = make_prices([HEDGE_CODE], start, HEDGE_END.isoformat())[HEDGE_CODE]
+    merged = hedge_frame(params, price_list)
+
+    def traces():
+        return [line_trace(merged['日期'], merged[col], col) for col in ['标的收盘', '-b值', '波动率']]
+
+    yield 'hedge_params.frame', lambda: hedge_frame(params, price_list)
+    yield 'hedge_params.traces', traces
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run(sizes: list[int], days: list[int], repeat: int) -> dict:
+    results = []
+
+    def record(case: str, scale: int, unit: str, func) -> None:
+        result = {'case': case, 'scale': scale, 'unit': unit, **measure(func, repeat)}
+        results.append(result)
+        print(f"{case:<28} {scale:>9} {unit:<4} {result['best_ms']:>10.2f} ms {result['peak_mb']:>9.1f} MB", flush=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mapping_path = os.path.join(tmp, 'mapping.csv')
+        write_mapping(mapping_path)
+        for n in sizes:
+            for case, func in trade_cases(n, mapping_path):
+                record(case, n, '笔', func)
+    for d in days:
+        for case, func in hedge_cases(d):
+            record(case, d, '天', func)
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'time': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(base_path: str, new_path: str, threshold: float) -> bool:
+    """打印两份结果的对比，返回是否存在退化"""
+    with open(base_path, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)
+    old = {(r['case'], r['scale']): r for r in base['results']}
+    print(f"{base['meta']['commit']} -> {new['meta']['commit']}")
+    print(f"{'用例':<28} {'规模':>9} {'耗时比':>8} {'内存比':>8}")
+    regressed = False
+    for r in new['results']:
+        b = old.get((r['case'], r['scale']))
+        if b is None:
+            continue
+        t_ratio = r['best_ms'] / b['best_ms'] if b['best_ms'] else float('nan')
+        m_ratio = r['peak_mb'] / b['peak_mb'] if b['peak_mb'] else float('nan')
+        flag = t_ratio > 1 + threshold or m_ratio > 1 + threshold
+        regressed |= flag
+        print(f"{r['case']:<28} {r['scale']:>9} {t_ratio:>8.2f} {m_ratio:>8.2f}{'  退化' if flag else ''}")
+    return regressed
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='交易笔数')
+    parser.add_argument('--days', type=int, nargs='+', default=HEDGE_DAYS, help='对冲参数窗口天数')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--out', help=f'结果文件，默认 {RESULTS_DIR}/<提交>.json')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'))
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args(argv)
+    if args.compare:
+        return int(compare(*args.compare, args.threshold))
+
+    result = run(args.sizes, args.days, args.repeat)
+    path = args.out or os.path.join(RESULTS_DIR, f"{result['meta']['commit']}.json")
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=1)
+    print(f"结果已写入 {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
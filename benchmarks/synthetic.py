@@ -0,0 +1,103 @@
+"""
+合成数据生成器：生成与 /api/query-trades、对冲参数、行情接口返回结构一致的数据，供基准测试与桩服务使用
+"""
+import numpy as np
+import pandas as pd
+
+PRODUCT_TYPES = [
+    'Snowball', 'Phoenix', 'Vanilla', 'Shark Fin', 'Binary',
+    'Trinary Snowball', 'Autocallable Airbag', 'Autocall Binary'
+]
+TRADE_TYPES = ['Buy', 'Sell']
+TRADE_STATUSES = ['Live', 'Terminated', 'Matured']
+
+
+def make_trade_frame(n: int, n_counterparties: int = 2000, seed: int = 0) -> pd.DataFrame:
+    """
+    生成 n 笔合成交易（对象列，与 pd.DataFrame(api 返回列表) 的形态一致）
+    """
+    rng = np.random.default_rng(seed)
+    cptys = np.array([f"客户{i:05d}" for i in range(n_counterparties)], dtype=object)
+    products = np.array(PRODUCT_TYPES, dtype=object)[rng.integers(0, len(PRODUCT_TYPES), n)]
+
+    start = pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 365 * 5, n), unit='D')
+    term_days = rng.integers(30, 730, n)
+    live = rng.random(n) < 0.4
+    termination = (start + pd.to_timedelta(term_days, unit='D')).strftime('%Y-%m-%d').to_numpy(dtype=object)
+    termination[live] = None
+
+    is_phoenix = products == 'Phoenix'
+    n_coupons = rng.integers(0, 12, n)
+    coupon_values = np.round(rng.random(int(n_coupons[is_phoenix].sum())) * 1e4, 2)
+    bounds = np.concatenate([[0], np.cumsum(n_coupons[is_phoenix])])
+    coupons = np.empty(n, dtype=object)
+    coupons[:] = [[] for _ in range(n)]
+    coupons[np.flatnonzero(is_phoenix)] = [
+        coupon_values[bounds[i]:bounds[i + 1]].tolist() for i in range(len(bounds) - 1)
+    ]
+
+    updated = pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 86400 * 365, n), unit='s')
+
+    return pd.DataFrame({
+        'tradeId': [f"T{i:08d}" for i in range(n)],
+        'counterparty': cptys[rng.integers(0, n_counterparties, n)],
+        'productType': products,
+        'tradeType': np.array(TRADE_TYPES, dtype=object)[rng.integers(0, len(TRADE_TYPES), n)],
+        'tradeStatus': np.where(live, 'Live', np.array(TRADE_STATUSES[1:], dtype=object)[rng.integers(0, 2, n)]).astype(object),
+        'tradeStartDate': start.strftime('%Y-%m-%d').to_numpy(dtype=object),
+        'tradeTerminationDate': termination,
+        'notionalPrincipal': np.round(rng.random(n) * 1e7, 2),
+        'marginRatio': np.round(rng.random(n) * 0.3, 4),
+        'tradeTerminationPayoff': np.round((rng.random(n) - 0.5) * 1e5, 2),
+        'couponsPaid': coupons,
+        'updateTime': updated.strftime('%Y-%m-%dT%H:%M:%S').to_numpy(dtype=object),
+    })
+
+
+def make_trades(n: int, n_counterparties: int = 2000, seed: int = 0) -> list[dict]:
+    """
+    生成 n 笔合成交易（list[dict]，与接口 result 字段一致）
+    """
+    df = make_trade_frame(n, n_counterparties, seed)
+    records = df.to_dict(orient='records')
+    for r in records:
+        if pd.isna(r['tradeTerminationDate']):
+            r['tradeTerminationDate'] = None
+        if r['productType'] != 'Phoenix':
+            del r['couponsPaid']
+    return records
+
+
+def _dates(start: str, end: str) -> list[str]:
+    return [d.strftime('%Y-%m-%d') for d in pd.bdate_range(start, end)]
+
+
+def make_bs_params(codes: list[str], start: str, end: str) -> list[dict]:
+    """
+    合成对冲参数（与 /api/datahub/query-bs-params 的 result 一致）：每个标的每个交易日一条，
+    取值只由标的代码与日期决定，同一区间重复生成结果相同
+    """
+    out = []
+    for code in codes:
+        seed = sum(map(ord, code))
+        for d in _dates(start, end):
+            k = (seed + int(d.replace('-', ''))) % 997
+            out.append({
+                'underlying_code': code,
+                'adjustment_date': d,
+                'vol': 0.15 + k / 997 * 0.15,
+                'b': -0.05 + (k % 101) / 1000,
+            })
+    return out
+
+
+def make_prices(codes: list[str], start: str, end: str) -> dict:
+    """合成日线行情（与 /api/mkt-accessor-v2/get-price 的 result 一致）：{code: [{'date', 'close'}, ...]}"""
+    out = {}
+    for code in codes:
+        seed = sum(map(ord, code))
+        out[code] = [
+            {'date': d, 'close': 3000 + (seed * 7 + int(d.replace('-', ''))) % 1000}
+            for d in _dates(start, end)
+        ]
+    return out
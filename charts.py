@@ -0,0 +1,105 @@
+"""
+图表公共层：长时间序列按像素预算降采样（LTTB），点数较多时改用 WebGL 渲染，
+分类过多时只保留前 N 名，其余合并为“其它”。
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+import config
+from instrumentation import timed, verbose
+
+OTHER = '其它'
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets 降采样，返回保留点的下标（升序，含首尾两点）。
+    x 须单调递增；y 中的缺失值不会被选为桶代表点。
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    bounds = np.append(edges, n)
+    # 每个桶的均值点（三角形第三个顶点取下一桶的均值点）
+    finite = np.isfinite(y)
+    sizes = np.diff(bounds)
+    mean_x = np.add.reduceat(x, bounds[:-1]) / sizes
+    y_count = np.add.reduceat(finite.astype(float), bounds[:-1])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_y = np.add.reduceat(np.where(finite, y, 0.0), bounds[:-1]) / y_count
+    picked = np.empty(threshold, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        cx, cy = mean_x[i + 1], mean_y[i + 1]
+        if not np.isfinite(cy):
+            cy = y[a]
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        area[~np.isfinite(area)] = -1.0
+        a = lo + int(np.argmax(area))
+        picked[i + 1] = a
+    return picked
+
+
+def _as_number(values) -> np.ndarray:
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(float)
+    return values.to_numpy(dtype=float)
+
+
+def line_trace(x, y, name: str, mode: str = 'lines+markers', max_points: int = None, **kwargs):
+    """
+    折线 trace：超过 max_points（默认 config.CHART_MAX_POINTS）时按 LTTB 降采样，
+    降采样后仍超过 config.CHART_WEBGL_THRESHOLD 点则用 Scattergl。
+    """
+    max_points = config.CHART_MAX_POINTS if max_points is None else max_points
+    x, y = pd.Series(x).reset_index(drop=True), pd.Series(y).reset_index(drop=True)
+    if len(x) > max_points:
+        keep = lttb(_as_number(x), _as_number(y), max_points)
+        x, y = x.iloc[keep], y.iloc[keep]
+    trace = go.Scattergl if len(x) > config.CHART_WEBGL_THRESHOLD else go.Scatter
+    if len(x) > config.CHART_WEBGL_THRESHOLD and mode == 'lines+markers':
+        mode = 'lines'
+    return trace(x=x.to_numpy(), y=y.to_numpy(), mode=mode, name=name, **kwargs)
+
+
+def top_n(df: pd.DataFrame, category: str, value: str, n: int = None, by: list = None) -> pd.DataFrame:
+    """
+    按 value 绝对值合计保留 category 的前 n 个取值（默认 config.CHART_TOP_N），
+    其余合并为“其它”，再按 by + [category] 汇总 value。分类不超过 n 个时原样返回。
+    """
+    n = config.CHART_TOP_N if n is None else n
+    by = by or []
+    totals = df[value].abs().groupby(df[category], observed=True).sum()
+    if len(totals) <= n:
+        return df
+    keep = totals.nlargest(n).index
+    labels = df[category].astype(object).where(df[category].isin(keep), OTHER)
+    out = df.assign(**{category: labels})
+    return out.groupby(by + [category], as_index=False, sort=False)[value].sum()
+
+
+def _points(trace) -> int:
+    for attr in ('x', 'values'):
+        values = getattr(trace, attr, None)
+        if values is not None:
+            return len(values)
+    return 0
+
+
+def show_chart(fig, name: str, **kwargs) -> None:
+    """
+    st.plotly_chart 并计时，行数为各 trace 的点数之和；
+    调试面板开启时另做一次序列化以记录 figure JSON 字节数
+    """
+    with timed(f"chart.{name}", rows=sum(map(_points, fig.data)), traces=len(fig.data)) as span:
+        if verbose():
+            span.bytes = len(fig.to_json().encode('utf-8'))
+        st.plotly_chart(fig, **kwargs)
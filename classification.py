@@ -1,41 +1,114 @@
+import os
+import threading
+from typing import Optional
+
+import numpy as np
 import pandas as pd
-import streamlit as st
 
-@st.cache_data
-def load_classification_map(
-    mapping_path: str = "D:/Github/magic_modular/交易对手类别.csv"
-) -> dict:
+import config
+from instrumentation import instrument
+
+OTHER = '其它'
+
+
+class ClassificationIndex:
     """
-    加载并缓存分类映射：交易对手方名称 -> 分类
+    交易对手方分类索引：对手方名称为 pd.Index，分类为整数编码。
+    映射按取值去重后只查找一次，再按编码展开，适用于 category 列与对象列。
+    同一名称出现在多列时以靠后的列为准（与逐列写入 dict 的结果一致）。
     """
-    df = pd.read_csv(mapping_path)
-    mapping = {}
-    for col in df.columns:
-        for name in df[col].dropna():
-            mapping[name] = col
-    return mapping
 
+    def __init__(self, table: pd.DataFrame, stamp: Optional[int] = None):
+        pairs = table.melt(var_name='分类', value_name='name').dropna(subset=['name'])
+        pairs = pairs.drop_duplicates('name', keep='last')
+        self.stamp = stamp
+        self.classes = sorted(pairs['分类'].unique().tolist())
+        self.options = self.classes if OTHER in self.classes else [OTHER] + self.classes
+        self.categories = sorted(set(self.options))
+        self.names = pd.Index(pairs['name'].to_numpy())
+        self.codes = pd.Categorical(pairs['分类'], categories=self.categories).codes.astype(np.int64)
+        self._other = self.categories.index(OTHER)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "ClassificationIndex":
+        stamp = os.stat(path).st_mtime_ns
+        return cls(pd.read_csv(path), stamp)
+
+    def to_dict(self) -> dict:
+        return dict(zip(self.names, np.asarray(self.categories, dtype=object)[self.codes]))
+
+    def _lookup(self, values) -> np.ndarray:
+        """取值 -> 分类编码，未映射为 '其它'"""
+        pos = self.names.get_indexer(values)
+        return np.where(pos >= 0, self.codes[pos], self._other)
+
+    def classify(self, series: pd.Series) -> pd.Series:
+        """返回与 series 同索引的 '分类' 列（category），不修改 series"""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            values, codes = series.cat.categories, series.cat.codes.to_numpy()
+        else:
+            codes, values = pd.factorize(series, use_na_sentinel=True)
+        # 缺失值（编码 -1）取末位的 '其它'
+        by_code = np.append(self._lookup(values), self._other)
+        return pd.Series(
+            pd.Categorical.from_codes(by_code[codes], categories=self.categories),
+            index=series.index, name='分类'
+        )
+
+    def unmapped(self, series: pd.Series) -> list:
+        """series 中不在映射表内的对手方名称（去重、排序）"""
+        values = pd.Series(series.dropna().unique())
+        return sorted(values[self.names.get_indexer(values) < 0].tolist())
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def get_index(mapping_path: str = None) -> ClassificationIndex:
+    """
+    按路径缓存的分类索引；映射文件修改时间变化后自动重新加载
+    """
+    path = mapping_path or config.CLASSIFICATION_PATH
+    stamp = os.stat(path).st_mtime_ns
+    with _lock:
+        index = _indexes.get(path)
+        if index is None or index.stamp != stamp:
+            index = _indexes[path] = ClassificationIndex.from_csv(path)
+        return index
+
+
+def mapping_stamp(mapping_path: str = None) -> int:
+    """当前映射文件的版本标记（修改时间），用于使依赖分类结果的缓存失效"""
+    return get_index(mapping_path).stamp
+
+
+def load_classification_map(mapping_path: str = None) -> dict:
+    """
+    分类映射：交易对手方名称 -> 分类
+    """
+    return get_index(mapping_path).to_dict()
+
+@instrument("classification.apply")
 def apply_classification(
     df: pd.DataFrame,
     source_col: str = 'counterparty',
-    mapping_path: str = "D:/Github/magic_modular/交易对手类别.csv"
+    mapping_path: str = None
 ) -> pd.DataFrame:
     """
-    在 DataFrame 上添加一列 '分类'，将 source_col 的值映射到分类。
-    未映射项归为 '其它'
+    返回添加了 '分类' 列的新 DataFrame，将 source_col 的值映射到分类。
+    未映射项归为 '其它'，不修改传入的 df
     """
-    mapping = load_classification_map(mapping_path)
-    df['分类'] = df[source_col].map(mapping).fillna('其它')
-    return df
+    return df.assign(分类=get_index(mapping_path).classify(df[source_col]))
+
+def unmapped_counterparties(df: pd.DataFrame, source_col: str = 'counterparty', mapping_path: str = None) -> list:
+    """df 中未出现在映射文件里的交易对手方（归为 '其它'）"""
+    if source_col not in df.columns:
+        return []
+    return get_index(mapping_path).unmapped(df[source_col])
 
-def classification_options(
-    mapping_path: str = "D:/Github/magic_modular/交易对手类别.csv"
-) -> list[str]:
+def classification_options(mapping_path: str = None) -> list[str]:
     """
     返回所有可能的分类选项
     """
-    mapping = load_classification_map(mapping_path)
-    opts = sorted(set(mapping.values()))
-    if '其它' not in opts:
-        opts.insert(0, '其它')
-    return opts
+    return list(get_index(mapping_path).options)
@@ -0,0 +1,114 @@
+"""
+页面计算：与界面无关的纯函数，结果按（数据版本, 筛选条件, 指标参数）记忆化在有界 LRU 中。
+只改变展示方式的控件（绘图指标等）在重跑时只从缓存结果中取列，不重新聚合。
+以 _ 开头的参数（交易视图、立方体、接口返回的列表）不参与缓存键，由数据版本与筛选条件代表；
+返回值在缓存中共享，调用方不得原地修改。
+传入 _shared（api.shared_trades()，池化执行时非 None）的计算交给多进程计算池（见 compute_pool.py）。
+"""
+import pandas as pd
+
+import config
+from aggregation import aggregate_counterparty
+from charts import top_n
+from compute_pool import BrokenProcessPool, get_pool, summary_task, trend_task
+from hedge_analytics import hedge_analytics, log_returns
+from hedge_frame import comparison_frame, hedge_frame, params_frame, price_frame, wide_frame
+from memo import freeze, memoize
+from trend_cube import TrendCube, slice_metric
+
+INDICATORS = ['名义本金', '保证金']
+
+
+@memoize("compute.counterparty_summary", maxsize=config.COMPUTE_CACHE_SIZE)
+def counterparty_summary(_view: pd.DataFrame, version, query_key, _query=None, _shared=None) -> pd.DataFrame:
+    """
+    交易对手方 × 产品汇总（列名已翻译，总计列在前），query_key 为 _view 的筛选条件；
+    池化执行时由计算进程在共享交易表上按 _query 重新筛选并汇总，计算池重建后仍不可用时在本进程汇总 _view
+    """
+    if _shared is not None:
+        try:
+            return get_pool().run(("summary", _shared.path, query_key), summary_task, _shared, _query)
+        except BrokenProcessPool:
+            if _view is None:
+                return summary_task(_shared, _query)
+    return aggregate_counterparty(_view)
+
+
+@memoize("compute.counterparty_chart", maxsize=config.COMPUTE_CACHE_SIZE)
+def counterparty_chart(_view: pd.DataFrame, version, query_key, metric: str, _query=None, _shared=None) -> tuple:
+    """
+    交易数据分析页的绘图数据：(metric 列的长表（前 N 名对手方，其余为“其它”）,
+    堆叠图中对手方由小到大的顺序, 饼图数据)
+    """
+    df_plot = counterparty_summary(_view, version, query_key, _query, _shared).reset_index().rename(columns={"index": "交易对手方"})
+    melted = df_plot.melt(id_vars=["交易对手方"], var_name="产品", value_name="数值")
+    melted = melted[melted["产品"].str.contains(metric)]
+    melted = top_n(melted, "交易对手方", "数值", by=["产品"])
+    totals = melted.groupby("交易对手方", as_index=False)["数值"].sum()
+    order = totals.sort_values("数值")["交易对手方"].tolist()
+    return melted, order, totals
+
+
+@memoize("compute.trend_slice", maxsize=config.COMPUTE_CACHE_SIZE)
+def trend_slice(_cube: TrendCube, version, metric_type: str, freq_str: str,
+                trend_start, trend_end, filters: dict, _shared=None) -> pd.DataFrame:
+    """
+    客户产品趋势的周期 × 对手方汇总，同时含名义本金与保证金两列（切换绘图指标时不重新切片）；
+    池化执行时由计算进程从共享交易表构建的立方体切片，_cube 可为 None；
+    计算池重建后仍不可用时在本进程内存映射共享交易表并切片
+    """
+    if _shared is not None:
+        key = ("trend", _shared.path, metric_type, freq_str, trend_start, trend_end, freeze(filters))
+        try:
+            return get_pool().run(key, trend_task, _shared, metric_type, freq_str, trend_start, trend_end, filters)
+        except BrokenProcessPool:
+            return trend_task(_shared, metric_type, freq_str, trend_start, trend_end, filters)
+    return slice_metric(_cube, metric_type, freq_str, trend_start, trend_end, filters)
+
+
+@memoize("compute.trend_chart", maxsize=config.COMPUTE_CACHE_SIZE)
+def trend_chart(_cube: TrendCube, version, metric_type: str, freq_str: str,
+                trend_start, trend_end, filters: dict, indicator: str, _shared=None) -> tuple:
+    """趋势页的绘图数据：(indicator 的堆叠图数据（前 N 名对手方）, 按周期汇总)"""
+    agg = trend_slice(_cube, version, metric_type, freq_str, trend_start, trend_end, filters, _shared)
+    agg = agg[['周期', 'counterparty', indicator]]
+    return top_n(agg, 'counterparty', indicator, by=['周期']), agg.groupby('周期', as_index=False)[indicator].sum()
+
+
+@memoize("compute.hedge_series", maxsize=config.COMPUTE_CACHE_SIZE)
+def hedge_series(_params: list, _prices: list, version, code: str, start: str, end: str) -> pd.DataFrame:
+    """对冲参数页的合并序列，version 为行情缓存的数据版本"""
+    return hedge_frame(_params, _prices)
+
+
+@memoize("compute.hedge_comparison", maxsize=config.COMPUTE_CACHE_SIZE)
+def hedge_comparison(_params: dict, _prices: dict, version, codes: list, start: str, end: str) -> pd.DataFrame:
+    """多标的对比：按日期对齐的 (指标, 标的) 宽表，version 为行情缓存的数据版本"""
+    return comparison_frame(_params, _prices)
+
+
+@memoize("compute.hedge_inputs", maxsize=config.COMPUTE_CACHE_SIZE)
+def hedge_inputs(_params: dict, _prices: dict, version, codes: list, start: str, end: str) -> tuple:
+    """
+    衍生分析的中间结果 (对数收益率, 参数波动率, b值)，均为 日期 × 标的；
+    更换滚动窗口时复用，不从原始行情重新计算。_params 与 _prices 均应向前多取最大窗口所需的历史
+    """
+    close = wide_frame({code: price_frame(p) for code, p in _prices.items() if p}, ['标的收盘'])
+    params = wide_frame({code: params_frame(p) for code, p in _params.items() if p}, ['波动率', 'b值'])
+    returns = log_returns(close['标的收盘']) if len(close.columns) else pd.DataFrame()
+    if not len(params.columns):
+        return returns, pd.DataFrame(), pd.DataFrame()
+    return returns, params['波动率'], params['b值']
+
+
+@memoize("compute.hedge_derived", maxsize=config.COMPUTE_CACHE_SIZE)
+def hedge_derived(_params: dict, _prices: dict, version, codes: list, start: str, end: str, window: int) -> dict:
+    """
+    按 window 滚动的衍生分析（见 hedge_analytics.hedge_analytics），另含参数波动率 'param_vol'，
+    只保留 [start, end] 内的日期
+    """
+    returns, param_vol, b = hedge_inputs(_params, _prices, version, codes, start, end)
+    if returns.empty or param_vol.empty:
+        return {}
+    result = dict(hedge_analytics(returns, param_vol, b, window), param_vol=param_vol)
+    return {name: frame.loc[pd.Timestamp(start):pd.Timestamp(end)] for name, frame in result.items()}
@@ -0,0 +1,173 @@
+"""
+多进程计算池：交易数据分析页的筛选汇总与趋势页的立方体切片在独立进程中执行，
+并发会话的 pandas/numpy 计算不再争用主进程的 GIL。
+
+共享交易表按数据版本发布一次：写为 Arrow IPC 文件（默认放在 /dev/shm，即共享内存），
+各计算进程内存映射读取并缓存（趋势立方体同样每个进程每个版本只构建一次），
+任务只传文件路径与筛选条件，不逐次序列化交易数据。
+相同任务并发提交时只执行一次，其余调用方共享结果；结果的跨会话缓存由 compute.py 的记忆化负责。
+"""
+import atexit
+import itertools
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Hashable, NamedTuple
+
+import pandas as pd
+
+import config
+from aggregation import aggregate_counterparty
+from instrumentation import timed
+from offline import read_arrow, write_arrow
+from trade_query import TradeQuery
+from trend_cube import TrendCube, slice_metric
+
+
+class SharedTrades(NamedTuple):
+    """已发布到共享内存的交易表：path 为 Arrow 文件路径，rows 为行数"""
+    path: str
+    rows: int
+
+
+def default_shared_dir() -> str:
+    return '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+
+
+# 计算进程内：最近一个共享交易表及由其构建的趋势立方体
+_loaded = {}
+
+
+def _frame(shared: SharedTrades) -> pd.DataFrame:
+    if _loaded.get('path') != shared.path:
+        _loaded.clear()
+        _loaded.update(path=shared.path, frame=read_arrow(shared.path))
+    return _loaded['frame']
+
+
+def _cube(shared: SharedTrades) -> TrendCube:
+    frame = _frame(shared)
+    if 'cube' not in _loaded:
+        _loaded['cube'] = TrendCube(frame)
+    return _loaded['cube']
+
+
+def summary_task(shared: SharedTrades, query: TradeQuery) -> pd.DataFrame:
+    """在共享交易表上按 query 筛选，并按交易对手方 × 产品汇总（见 aggregation.aggregate_counterparty）"""
+    return aggregate_counterparty(query.apply(_frame(shared)))
+
+
+def trend_task(shared: SharedTrades, metric_type: str, freq: str, start, end, filters: dict) -> pd.DataFrame:
+    """由共享交易表的趋势立方体切片（见 trend_cube.slice_metric）"""
+    return slice_metric(_cube(shared), metric_type, freq, start, end, filters)
+
+
+class ComputePool:
+    """
+    进程池及其共享交易表。publish() 发布新版本的交易表（保留最近 keep 个文件，
+    旧版本的在途任务仍可读取），run() 提交任务并等待结果。
+    计算进程以 spawn 方式启动（Streamlit 进程内有多个线程，fork 不安全）。
+    """
+
+    def __init__(self, workers: int, shared_dir: str, keep: int = 2):
+        self.workers = workers
+        self.shared_dir = shared_dir
+        self.keep = keep
+        self._executor = self._new_executor()
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._published = []
+        self._seq = itertools.count()
+        self.tasks = 0
+        self.coalesced = 0
+        self.restarts = 0
+        atexit.register(self.shutdown)
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def _submit(self, fn: Callable, *args):
+        """
+        提交并等待结果。计算进程异常退出（如被 OOM 终止）会使整个进程池不可用：
+        此时重建进程池并重试一次，仍失败则抛出 BrokenProcessPool
+        """
+        executor = self._executor
+        try:
+            return executor.submit(fn, *args).result()
+        except BrokenProcessPool:
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = self._new_executor()
+                    self.restarts += 1
+                    executor.shutdown(wait=False, cancel_futures=True)
+                executor = self._executor
+        return executor.submit(fn, *args).result()
+
+    def publish(self, frame: pd.DataFrame) -> SharedTrades:
+        """把交易表写入共享目录，返回供任务引用的句柄"""
+        path = os.path.join(self.shared_dir, f'magic-trades-{os.getpid()}-{next(self._seq)}.arrow')
+        with timed("compute_pool.publish", rows=len(frame)):
+            write_arrow(path, frame)
+        with self._lock:
+            self._published.append(path)
+            stale, self._published = self._published[:-self.keep], self._published[-self.keep:]
+        for old in stale:
+            _remove(old)
+        return SharedTrades(path, len(frame))
+
+    def run(self, key: Hashable, fn: Callable, *args):
+        """在计算进程中执行 fn(*args)；key 相同的任务并发时只提交一次"""
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self.tasks += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            with timed("compute_pool.task", cache="coalesced"):
+                return future.result()
+        try:
+            with timed("compute_pool.task", cache="miss"):
+                future.set_result(self._submit(fn, *args))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return future.result()
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "tasks": self.tasks, "coalesced": self.coalesced, "restarts": self.restarts}
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            published, self._published = self._published, []
+        for path in published:
+            _remove(path)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_pool() -> ComputePool:
+    """进程内共享的计算池（按 config 构建，首次使用时启动）"""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = ComputePool(config.COMPUTE_POOL_WORKERS, config.COMPUTE_SHARED_DIR or default_shared_dir())
+        return _default
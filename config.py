@@ -0,0 +1,74 @@
+"""
+运行配置，均可通过环境变量覆盖
+"""
+import os
+
+# 数据接口地址
+API_BASE_URL = os.environ.get("MAGIC_API_BASE_URL", "http://192.168.1.103:60000").rstrip("/")
+
+# 接口超时（秒）、重试次数与退避基数（秒）、连接池大小
+API_CONNECT_TIMEOUT = float(os.environ.get("MAGIC_API_CONNECT_TIMEOUT", "3"))
+API_READ_TIMEOUT = float(os.environ.get("MAGIC_API_READ_TIMEOUT", "10"))
+API_RETRIES = int(os.environ.get("MAGIC_API_RETRIES", "2"))
+API_BACKOFF = float(os.environ.get("MAGIC_API_BACKOFF", "0.5"))
+API_POOL_SIZE = int(os.environ.get("MAGIC_API_POOL_SIZE", "16"))
+
+# 本地数据目录（交易库等）
+DATA_DIR = os.environ.get("MAGIC_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+
+# 交易库：主键字段、修改时间字段（增量水位线）、刷新间隔（秒）
+TRADE_ID_FIELD = os.environ.get("MAGIC_TRADE_ID_FIELD", "tradeId")
+TRADE_MODIFIED_FIELD = os.environ.get("MAGIC_TRADE_MODIFIED_FIELD", "updateTime")
+TRADE_REFRESH_SECONDS = float(os.environ.get("MAGIC_TRADE_REFRESH_SECONDS", "60"))
+
+# 行情/对冲参数缓存：当日数据的有效期（秒）
+MARKET_LIVE_TTL_SECONDS = float(os.environ.get("MAGIC_MARKET_LIVE_TTL_SECONDS", "300"))
+# 多个标的的对冲参数是否合并为一次请求（需接口在记录中返回 underlying_code，缺少时自动改为逐个请求；
+# 默认关闭，待确认正式接口返回该字段），以及并发拉取的批次数上限
+BS_PARAMS_BATCH = os.environ.get("MAGIC_BS_PARAMS_BATCH", "0") == "1"
+MARKET_FETCH_WORKERS = int(os.environ.get("MAGIC_MARKET_FETCH_WORKERS", "4"))
+
+# 对冲参数页：标的列表与默认日期窗口（天）
+UNDERLYING_CODES = ['000016.SH', '000300.SH', '000905.SH', '000852.SH']
+HEDGE_DEFAULT_DAYS = 90
+
+# 后台预取：是否启用、刷新间隔（秒）
+PREFETCH_ENABLED = os.environ.get("MAGIC_PREFETCH_ENABLED", "1") == "1"
+PREFETCH_INTERVAL_SECONDS = float(os.environ.get("MAGIC_PREFETCH_INTERVAL_SECONDS", "60"))
+
+# 图表：折线最多保留的点数（约为图宽像素）、改用 WebGL 的点数阈值、分类图保留的前 N 名
+CHART_MAX_POINTS = int(os.environ.get("MAGIC_CHART_MAX_POINTS", "1500"))
+CHART_WEBGL_THRESHOLD = int(os.environ.get("MAGIC_CHART_WEBGL_THRESHOLD", "1000"))
+CHART_TOP_N = int(os.environ.get("MAGIC_CHART_TOP_N", "20"))
+
+# 分页表格：每页行数
+TABLE_PAGE_SIZE = int(os.environ.get("MAGIC_TABLE_PAGE_SIZE", "50"))
+
+# 交易数据来源：store 为本地交易库（增量同步，页面筛选在本地执行）；
+# api 为按页面筛选条件向接口下推 expr 查询，适用于不保留本地副本的部署
+TRADE_SOURCE = os.environ.get("MAGIC_TRADE_SOURCE", "store")
+# 下推查询：单个集合条件最多展开的取值个数（超过则在客户端过滤）、按表达式缓存的结果数、筛选项的刷新间隔（秒）
+TRADE_EXPR_MAX_IN = int(os.environ.get("MAGIC_TRADE_EXPR_MAX_IN", "20"))
+TRADE_QUERY_CACHE_SIZE = int(os.environ.get("MAGIC_TRADE_QUERY_CACHE_SIZE", "32"))
+TRADE_FACETS_TTL_SECONDS = float(os.environ.get("MAGIC_TRADE_FACETS_TTL_SECONDS", "3600"))
+
+# 离线数据集目录（python -m offline export 导出）；非空时交易、行情与对冲参数均从该目录读取，不访问接口
+OFFLINE_DIR = os.environ.get("MAGIC_OFFLINE_DIR", "")
+
+# 交易对手方分类映射文件（CSV，每列一个分类）；文件修改后自动重新加载
+CLASSIFICATION_PATH = os.environ.get("MAGIC_CLASSIFICATION_PATH", "D:/Github/magic_modular/交易对手类别.csv")
+
+# 计时与调试：JSON Lines 计时日志路径（为空不写）、是否在侧边栏提供性能调试面板、cProfile 结果目录
+TIMING_LOG_PATH = os.environ.get("MAGIC_TIMING_LOG", "")
+DEBUG_PANEL = os.environ.get("MAGIC_DEBUG_PANEL", "0") == "1"
+PROFILE_DIR = os.environ.get("MAGIC_PROFILE_DIR", os.path.join(DATA_DIR, "profiles"))
+
+# 页面计算结果的记忆化：每类计算保留的条目数、筛选后交易视图保留的条目数（视图可能接近全表大小）
+COMPUTE_CACHE_SIZE = int(os.environ.get("MAGIC_COMPUTE_CACHE_SIZE", "32"))
+VIEW_CACHE_SIZE = int(os.environ.get("MAGIC_VIEW_CACHE_SIZE", "4"))
+
+# 页面重计算（交易筛选汇总、趋势切片）的执行方式：inline 为在会话线程中执行；
+# pool 为交给多进程计算池，交易表经共享内存（Arrow 文件，默认 /dev/shm）传给计算进程
+COMPUTE_EXECUTOR = os.environ.get("MAGIC_COMPUTE_EXECUTOR", "inline")
+COMPUTE_POOL_WORKERS = int(os.environ.get("MAGIC_COMPUTE_POOL_WORKERS", str(os.cpu_count() or 1)))
+COMPUTE_SHARED_DIR = os.environ.get("MAGIC_COMPUTE_SHARED_DIR", "")
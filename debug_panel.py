@@ -0,0 +1,79 @@
+"""
+侧边栏性能调试面板：展示本次重跑各阶段计时，并可对下一次重跑采集 cProfile。
+仅在 config.DEBUG_PANEL 开启时出现。
+"""
+import cProfile
+import io
+import os
+import pstats
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+import streamlit as st
+
+import config
+from instrumentation import Run
+
+_PROFILE_FLAG = "_debug_profile_next"
+
+
+def enabled() -> bool:
+    """侧边栏开关：是否展示调试面板（并在本次重跑中统计图表字节数）"""
+    if not config.DEBUG_PANEL:
+        return False
+    return st.sidebar.toggle("性能调试", key="_debug_panel")
+
+
+@contextmanager
+def maybe_profile():
+    """上一次重跑中请求了采集时，对本次重跑开启 cProfile；产出 Profile 或 None"""
+    if not st.session_state.pop(_PROFILE_FLAG, False):
+        yield None
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+
+
+def _save_profile(profiler: cProfile.Profile, page: str) -> tuple[str, str]:
+    """写出 .prof 文件，返回 (路径, 按累计耗时排序的前 30 行)"""
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    path = os.path.join(config.PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{page}.prof")
+    profiler.dump_stats(path)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(30)
+    return path, out.getvalue()
+
+
+def render(run: Run, profiler: Optional[cProfile.Profile] = None) -> None:
+    """在侧边栏展示 run 的各阶段计时；profiler 非空时保存并展示其结果"""
+    with st.sidebar.expander("本次重跑计时", expanded=True):
+        total = run.duration or 0.0
+        # 按开始时间排列，嵌套阶段（如接口内的 http）排在外层阶段之后
+        rows = [
+            {
+                "阶段": span.stage,
+                "耗时(ms)": round((span.duration or 0.0) * 1e3, 1),
+                "行数": span.rows,
+                "字节": span.bytes,
+                "缓存": span.cache,
+                "错误": span.error,
+            }
+            for span in sorted(run.spans, key=lambda s: s.started)
+        ]
+        st.caption(f"页面「{run.page}」重跑共 {total * 1e3:.0f} ms，记录 {len(rows)} 个阶段")
+        if rows:
+            st.dataframe(rows, hide_index=True)
+        if config.TIMING_LOG_PATH:
+            st.caption(f"计时日志：{config.TIMING_LOG_PATH}")
+        if st.button("对下一次重跑采集 cProfile", key="_debug_profile_button"):
+            st.session_state[_PROFILE_FLAG] = True
+            st.rerun()
+        if profiler is not None:
+            path, text = _save_profile(profiler, run.page)
+            st.caption(f"cProfile 已保存：{path}")
+            st.code(text)
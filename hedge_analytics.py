@@ -0,0 +1,48 @@
+"""
+对冲参数衍生分析：滚动已实现波动率、已实现波动率与参数波动率之差、b 值变化与收益率的滚动相关系数。
+输入为以日期为索引、标的为列的宽表（见 hedge_frame.wide_frame），各标的按列一次性向量化计算。
+"""
+import numpy as np
+import pandas as pd
+
+# 滚动窗口（交易日）与年化系数
+WINDOWS = [20, 60, 120]
+TRADING_DAYS = 252
+
+
+def lookback_days(window: int) -> int:
+    """为使区间起点即有完整窗口，行情需向前多取的自然日数（按每周 5 个交易日并留出节假日余量）"""
+    return int(window * 7 / 5) + 14
+
+
+def log_returns(close: pd.DataFrame) -> pd.DataFrame:
+    """日对数收益率（首个交易日为 NaN）；收盘价缺失或非正时当日及次日为 NaN"""
+    return np.log(close.where(close > 0)).diff()
+
+
+def realized_vol(returns: pd.DataFrame, window: int) -> pd.DataFrame:
+    """滚动 window 个交易日的已实现波动率（年化）；窗口内收益率不足 window 个时为 NaN"""
+    return returns.rolling(window, min_periods=window).std() * np.sqrt(TRADING_DAYS)
+
+
+def vol_spread(realized: pd.DataFrame, param_vol: pd.DataFrame) -> pd.DataFrame:
+    """已实现波动率减参数波动率，按参数的调整日期对齐"""
+    return realized.reindex(param_vol.index) - param_vol
+
+
+def b_return_corr(b: pd.DataFrame, returns: pd.DataFrame, window: int) -> pd.DataFrame:
+    """参数调整日期上 b 值变化与当日收益率的滚动相关系数（窗口按调整次数计）"""
+    return b.diff().rolling(window, min_periods=window).corr(returns.reindex(b.index))
+
+
+def hedge_analytics(returns: pd.DataFrame, param_vol: pd.DataFrame, b: pd.DataFrame, window: int) -> dict:
+    """
+    returns 为对数收益率，param_vol / b 为参数波动率与 b 值（均为 日期 × 标的）。
+    返回 {'realized': 已实现波动率, 'spread': 波动率价差, 'corr': b 值变化与收益率相关系数}
+    """
+    realized = realized_vol(returns, window)
+    return {
+        'realized': realized,
+        'spread': vol_spread(realized, param_vol),
+        'corr': b_return_corr(b, returns, window),
+    }
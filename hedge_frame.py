@@ -0,0 +1,47 @@
+import pandas as pd
+
+
+def params_frame(params_data: list[dict]) -> pd.DataFrame:
+    """
+    对冲参数列表 -> 按调整日期排序的 DataFrame（日期、波动率、b值、-b值）。
+    不修改传入的列表（可能是缓存中共享的结果）
+    """
+    df = pd.DataFrame({
+        '日期': pd.to_datetime([item['adjustment_date'] for item in params_data]),
+        '波动率': [item.get('vol', 0) for item in params_data],
+        'b值': [item.get('b', 0) for item in params_data],
+    })
+    df['-b值'] = -df['b值']
+    return df.sort_values('日期', kind='stable', ignore_index=True)
+
+
+def price_frame(price_list: list[dict]) -> pd.DataFrame:
+    """日线行情列表 -> DataFrame（日期、标的收盘）"""
+    df = pd.DataFrame(price_list)
+    return pd.DataFrame({'日期': pd.to_datetime(df['date']), '标的收盘': df['close']})
+
+
+def hedge_frame(params_data: list[dict], price_list: list[dict]) -> pd.DataFrame:
+    """按日期内连接对冲参数与标的收盘价，供对冲参数页绘图与明细表使用"""
+    return pd.merge(params_frame(params_data), price_frame(price_list), on='日期', how='inner')
+
+
+def wide_frame(frames: dict, values: list[str]) -> pd.DataFrame:
+    """{标的: 含日期列的 DataFrame} -> 以日期为索引、(指标, 标的) 为列的宽表"""
+    frames = {code: df for code, df in frames.items() if not df.empty}
+    if not frames:
+        return pd.DataFrame(columns=pd.MultiIndex.from_product([values, []], names=[None, '标的']))
+    long = pd.concat(frames, names=['标的']).reset_index(level='标的')
+    long = long.drop_duplicates(['日期', '标的'], keep='last')
+    return long.pivot(index='日期', columns='标的', values=values)
+
+
+def comparison_frame(params_by_code: dict, prices_by_code: dict) -> pd.DataFrame:
+    """
+    多个标的的对冲参数与收盘价按日期对齐：索引为日期，列为 (指标, 标的) 两级，
+    指标为 波动率、b值、-b值、标的收盘；某标的当日缺数据为 NaN。只保留参数与收盘价均有数据的日期
+    """
+    params = wide_frame({code: params_frame(p) for code, p in params_by_code.items() if p},
+                        ['波动率', 'b值', '-b值'])
+    prices = wide_frame({code: price_frame(p) for code, p in prices_by_code.items() if p}, ['标的收盘'])
+    return params.join(prices, how='inner').sort_index()
@@ -0,0 +1,116 @@
+import json
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+from instrumentation import timed
+
+# 可重试的 HTTP 状态码
+RETRY_STATUS = {429, 502, 503, 504}
+
+
+class ApiClient:
+    """
+    数据接口客户端：
+    - 共享 requests.Session，按主机保持长连接池
+    - 连接/读取超时分别可配
+    - 连接失败、超时及 429/5xx 网关类错误按指数退避重试
+    - 相同请求（路径 + 请求体）并发时只向上游发一次，其余调用方共享结果
+    返回的结果可能被多个调用方共享，不得原地修改。
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        connect_timeout: float = 3.0,
+        read_timeout: float = 10.0,
+        retries: int = 2,
+        backoff: float = 0.5,
+        pool_size: int = 16
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.upstream_calls = 0
+        self.coalesced_calls = 0
+
+    def post_json(self, path: str, payload: dict):
+        """POST JSON 并返回解析后的响应体；重试耗尽后抛出最后一次的异常"""
+        key = (path, json.dumps(payload, sort_keys=True, ensure_ascii=False))
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.coalesced_calls += 1
+        if not leader:
+            with timed("http", path=path, cache="coalesced"):
+                return future.result()
+        try:
+            future.set_result(self._post_with_retry(path, payload))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return future.result()
+
+    def _post_with_retry(self, path: str, payload: dict):
+        url = f"{self.base_url}{path}"
+        with timed("http", path=path) as span:
+            for attempt in range(self.retries + 1):
+                span.extra["attempts"] = attempt + 1
+                try:
+                    with self._lock:
+                        self.upstream_calls += 1
+                    resp = self.session.post(url, json=payload, timeout=self.timeout)
+                    if resp.status_code in RETRY_STATUS and attempt < self.retries:
+                        raise _Transient(f"HTTP {resp.status_code}")
+                    resp.raise_for_status()
+                    span.bytes = len(resp.content)
+                    return resp.json()
+                except (requests.ConnectionError, requests.Timeout, _Transient):
+                    if attempt >= self.retries:
+                        raise
+                    time.sleep(self.backoff * 2 ** attempt)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class _Transient(Exception):
+    pass
+
+
+_default: Optional[ApiClient] = None
+_default_lock = threading.Lock()
+
+
+def get_client() -> ApiClient:
+    """进程内共享的默认客户端（按 config 构建）"""
+    global _default
+    with _default_lock:
+        if _default is None or _default.base_url != config.API_BASE_URL:
+            _default = ApiClient(
+                config.API_BASE_URL,
+                connect_timeout=config.API_CONNECT_TIMEOUT,
+                read_timeout=config.API_READ_TIMEOUT,
+                retries=config.API_RETRIES,
+                backoff=config.API_BACKOFF,
+                pool_size=config.API_POOL_SIZE
+            )
+        return _default
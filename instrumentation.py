@@ -0,0 +1,159 @@
+"""
+分阶段计时：记录接口调用、数据转换与图表渲染各阶段的耗时、行数、负载字节数与缓存命中情况。
+记录挂在当前线程的“本次重跑”上供调试面板展示，并可追加写入 JSON Lines 日志离线分析。
+不依赖 streamlit，数据层模块（http_client、classification 等）可直接使用。
+"""
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+import config
+
+_local = threading.local()
+_log_lock = threading.Lock()
+
+
+class Span:
+    """一个阶段的计时记录；rows / bytes / cache 可在 with 块内补充"""
+
+    __slots__ = ('stage', 'started', 'duration', 'rows', 'bytes', 'cache', 'error', 'extra')
+
+    def __init__(self, stage: str, rows: Optional[int] = None, nbytes: Optional[int] = None,
+                 cache: Optional[str] = None, **extra):
+        self.stage = stage
+        self.started = time.time()
+        self.duration: Optional[float] = None
+        self.rows = rows
+        self.bytes = nbytes
+        self.cache = cache
+        self.error: Optional[str] = None
+        self.extra = extra
+
+    def to_dict(self) -> dict:
+        record = {
+            "stage": self.stage,
+            "ts": self.started,
+            "duration_ms": None if self.duration is None else round(self.duration * 1e3, 3),
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "cache": self.cache,
+            "error": self.error,
+        }
+        record.update(self.extra)
+        return record
+
+
+class Run:
+    """一次页面重跑内的全部计时记录"""
+
+    def __init__(self, page: str, verbose: bool = False):
+        self.id = uuid.uuid4().hex[:12]
+        self.page = page
+        self.verbose = verbose
+        self.started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.spans: list[Span] = []
+
+
+def current_run() -> Optional[Run]:
+    return getattr(_local, 'run', None)
+
+
+def verbose() -> bool:
+    """当前重跑是否需要额外统计（如图表序列化字节数，需要多做一次序列化）"""
+    run = current_run()
+    return run is not None and run.verbose
+
+
+def start_run(page: str, verbose: bool = False) -> Run:
+    """在当前线程开始一次重跑的记录（覆盖上一次）"""
+    run = Run(page, verbose)
+    _local.run = run
+    return run
+
+
+def finish_run(run: Run) -> None:
+    run.duration = time.perf_counter() - run.started
+    if current_run() is run:
+        _local.run = None
+
+
+def _write(record: dict) -> None:
+    path = config.TIMING_LOG_PATH
+    if not path:
+        return
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    with _log_lock:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+@contextmanager
+def timed(stage: str, rows: Optional[int] = None, nbytes: Optional[int] = None,
+          cache: Optional[str] = None, **extra):
+    """
+    计时上下文：with timed("阶段名") as span: ...; span.rows = ...
+    结束时挂到当前重跑（后台线程中没有重跑则只写日志），异常照常抛出并记录类型。
+    """
+    span = Span(stage, rows, nbytes, cache, **extra)
+    started = time.perf_counter()
+    try:
+        yield span
+    except BaseException as e:
+        span.error = type(e).__name__
+        raise
+    finally:
+        span.duration = time.perf_counter() - started
+        run = current_run()
+        record = span.to_dict()
+        record["thread"] = threading.current_thread().name
+        if run is not None:
+            run.spans.append(span)
+            record["run"] = run.id
+            record["page"] = run.page
+        _write(record)
+
+
+def instrument(stage: str, rows: Callable = len):
+    """
+    计时装饰器：记录被装饰函数的耗时，rows(返回值) 作为行数（默认 len，不适用时忽略）
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(stage) as span:
+                result = func(*args, **kwargs)
+                try:
+                    span.rows = rows(result)
+                except TypeError:
+                    pass
+                return result
+        return wrapper
+    return decorate
+
+
+def mark_built() -> None:
+    """在带缓存函数的函数体内调用，表示本次调用未命中缓存、实际执行了构建"""
+    _local.built = getattr(_local, 'built', 0) + 1
+
+
+def cached_call(stage: str, func: Callable, *args):
+    """
+    调用带缓存的 func 并计时；func 体内调用过 mark_built() 记为 miss，否则为 hit
+    """
+    with timed(stage) as span:
+        before = getattr(_local, 'built', 0)
+        result = func(*args)
+        span.cache = "miss" if getattr(_local, 'built', 0) != before else "hit"
+        try:
+            span.rows = len(result)
+        except TypeError:
+            pass
+        return result
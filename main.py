@@ -1,21 +1,48 @@
+import argparse
+
 import streamlit as st
-from app_pages.trade_data import render as render_trade_data
-from app_pages.hedge_params import render as render_hedge_params
-from app_pages.product_trend import render as render_product_trend
-from app_pages.acknowledgements import render as render_acknowledgements
-from app_pages.test import render as render_test
+import config
+import debug_panel
+from instrumentation import finish_run, start_run
+from page_registry import get_registry
+
+
+def main():
+    # streamlit run main.py -- --offline 目录：从离线数据集加载（等同 MAGIC_OFFLINE_DIR）
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--offline', default=None)
+    args, _ = parser.parse_known_args()
+    if args.offline:
+        config.OFFLINE_DIR = args.offline
+
+    st.set_page_config(page_title="交易分析仪表板",layout="wide")
+    st.sidebar.title("功能导航")
+    registry = get_registry()
+    page=st.sidebar.radio("选择页面：",registry.titles())
+    if registry.missing:
+        st.sidebar.caption(f"未找到页面模块，已跳过：{'、'.join(registry.missing)}")
+    if config.OFFLINE_DIR:
+        from api import get_offline
+        st.sidebar.caption(get_offline().describe())
+    elif config.PREFETCH_ENABLED:
+        # 按需导入：数据层（pandas、requests 等）只在启用预取时随导航加载
+        from api import get_prefetcher
+        st.sidebar.caption(get_prefetcher().describe())
+
+    debug = debug_panel.enabled()
+    run = start_run(page, verbose=debug)
+    with debug_panel.maybe_profile() as profiler:
+        ok = registry.render(page)
+    finish_run(run)
+    if not ok:
+        st.error(f"页面「{page}」出错，其它页面不受影响。")
+        st.code(registry.error(page))
+    st.sidebar.caption(registry.describe(page))
+    if debug:
+        debug_panel.render(run, profiler)
 
-st.set_page_config(page_title="交易分析仪表板",layout="wide")
-st.sidebar.title("功能导航")
-page=st.sidebar.radio("选择页面：",["交易数据分析","对冲参数分析","客户产品趋势分析","特别鸣谢","测试专用"])
 
-if page=="交易数据分析":
-    render_trade_data()
-elif page=="对冲参数分析":
-    render_hedge_params()
-elif page=="客户产品趋势分析":
-    render_product_trend()
-elif page == '测试专用':
-    render_test()
-else:
-    render_acknowledgements()
\ No newline at end of file
+# Streamlit 以 __main__ 身份执行本脚本；计算池（compute_pool.py）以 spawn 启动的进程
+# 会以 __mp_main__ 身份重新导入本脚本，此时不应渲染页面
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    kind    TEXT NOT NULL,
+    code    TEXT NOT NULL,
+    date    TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (kind, code, date)
+);
+CREATE TABLE IF NOT EXISTS coverage (
+    kind  TEXT NOT NULL,
+    code  TEXT NOT NULL,
+    first_day  TEXT NOT NULL,
+    last_day   TEXT NOT NULL,
+    fetched_at REAL
+);
+"""
+
+PRICE = "price"
+BS_PARAMS = "bs"
+# 对冲参数记录中的标的代码字段（多标的合并请求时按此拆分结果）
+BS_CODE_FIELD = "underlying_code"
+
+_ONE_DAY = datetime.timedelta(days=1)
+# 同一标的两个缺口之间已缓存的天数不超过该值时合并为一次请求（重复拉取少量已缓存日期换一次往返）
+MERGE_GAP_DAYS = 3
+
+
+def _day(value) -> datetime.date:
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+def merge_intervals(intervals: list[tuple]) -> list[tuple]:
+    """合并重叠或相邻的闭区间 [start, end]"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + _ONE_DAY:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def missing_intervals(covered: list[tuple], start: datetime.date, end: datetime.date) -> list[tuple]:
+    """[start, end] 中未被 covered 覆盖的闭区间"""
+    gaps = []
+    cursor = start
+    for c_start, c_end in merge_intervals(covered):
+        if c_end < cursor:
+            continue
+        if c_start > end:
+            break
+        if c_start > cursor:
+            gaps.append((cursor, c_start - _ONE_DAY))
+        cursor = max(cursor, c_end + _ONE_DAY)
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+class MarketCache:
+    """
+    行情与对冲参数的本地缓存（SQLite），按 (标的, 日期) 存储。
+    每次请求只拉取未覆盖的日期区间：同一标的的各缺口分别请求（间隔不超过 MERGE_GAP_DAYS 天的相邻缺口合并），
+    行情接口再把缺口相同的标的合并为一次请求。
+    当日及以后的数据可能仍在变化，只在 live_ttl 秒内视为已覆盖。
+    对冲参数接口同样接受标的列表：batch_bs_params 为真时缺口相同的标的合并为一次请求，
+    结果按 BS_CODE_FIELD 拆分（有记录缺少该字段时该批改为逐个标的请求）；否则每个标的一次请求。不同批次最多 max_workers 个并发拉取。
+    fetch_prices(codes, start, end) 返回 {code: [bar, ...]}，
+    fetch_bs_params(codes, start, end) 返回 [param, ...]，日期参数为 ISO 字符串。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fetch_prices: Callable[[list, str, str], dict],
+        fetch_bs_params: Callable[[list, str, str], list],
+        today: Callable[[], datetime.date] = datetime.date.today,
+        clock: Callable[[], float] = time.time,
+        live_ttl: float = 300.0,
+        batch_bs_params: bool = False,
+        max_workers: int = 4
+    ):
+        self.path = path
+        self.fetch_prices = fetch_prices
+        self.fetch_bs_params = fetch_bs_params
+        self.today = today
+        self.clock = clock
+        self.live_ttl = live_ttl
+        self.batch_bs_params = batch_bs_params
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hits = 0
+        self.fetches = 0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @property
+    def hit_rate(self) -> float:
+        """完全由本地数据满足的请求占比"""
+        return self.hits / self.requests if self.requests else 0.0
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "hits": self.hits, "fetches": self.fetches, "hit_rate": self.hit_rate}
+
+    def _gaps(self, conn, kind: str, code: str, start: datetime.date, end: datetime.date) -> list[tuple]:
+        rows = conn.execute(
+            "SELECT first_day, last_day, fetched_at FROM coverage WHERE kind = ? AND code = ?", (kind, code)
+        ).fetchall()
+        today, now = self.today(), self.clock()
+        covered = [
+            (_day(s), _day(e)) for s, e, fetched_at in rows
+            if fetched_at is None or (_day(s) >= today and now - fetched_at < self.live_ttl)
+        ]
+        return missing_intervals(covered, start, end)
+
+    def _store(self, kind: str, code: str, records: list, date_key: str, start: datetime.date, end: datetime.date) -> None:
+        by_date = {}
+        for rec in records:
+            by_date.setdefault(str(rec[date_key])[:10], []).append(rec)
+        # 当日及以后的数据单独记为带拉取时间的临时覆盖区间
+        today = self.today()
+        settled_end = min(end, today - _ONE_DAY)
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?)",
+                [(kind, code, d, json.dumps(recs, ensure_ascii=False)) for d, recs in by_date.items()]
+            )
+            if start <= settled_end:
+                rows = conn.execute(
+                    "SELECT first_day, last_day FROM coverage "
+                    "WHERE kind = ? AND code = ? AND fetched_at IS NULL", (kind, code)
+                ).fetchall()
+                merged = merge_intervals([(_day(s), _day(e)) for s, e in rows] + [(start, settled_end)])
+                conn.execute(
+                    "DELETE FROM coverage WHERE kind = ? AND code = ? AND fetched_at IS NULL", (kind, code)
+                )
+                conn.executemany(
+                    "INSERT INTO coverage VALUES (?, ?, ?, ?, NULL)",
+                    [(kind, code, s.isoformat(), e.isoformat()) for s, e in merged]
+                )
+            if end >= today:
+                conn.execute(
+                    "DELETE FROM coverage WHERE kind = ? AND code = ? AND fetched_at IS NOT NULL", (kind, code)
+                )
+                conn.execute(
+                    "INSERT INTO coverage VALUES (?, ?, ?, ?, ?)",
+                    (kind, code, max(start, today).isoformat(), end.isoformat(), self.clock())
+                )
+
+    def _load(self, kind: str, code: str, start: datetime.date, end: datetime.date) -> list:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT payload FROM bars WHERE kind = ? AND code = ? AND date BETWEEN ? AND ? ORDER BY date",
+                (kind, code, start.isoformat(), end.isoformat())
+            ).fetchall()
+        return [rec for (payload,) in rows for rec in json.loads(payload)]
+
+    def _plan(self, kind: str, codes: list, start: datetime.date, end: datetime.date) -> dict:
+        """每个需拉取的标的 -> 拉取区间列表（各缺口，间隔很近的相邻缺口合并）"""
+        plan = {}
+        with self._connect() as conn:
+            for code in codes:
+                spans = []
+                for s, e in self._gaps(conn, kind, code, start, end):
+                    if spans and (s - spans[-1][1]).days - 1 <= MERGE_GAP_DAYS:
+                        spans[-1] = (spans[-1][0], e)
+                    else:
+                        spans.append((s, e))
+                if spans:
+                    plan[code] = spans
+        with self._lock:
+            self.requests += 1
+            self.hits += not plan
+        return plan
+
+    def _count_fetch(self) -> None:
+        with self._lock:
+            self.fetches += 1
+
+    @staticmethod
+    def _batches(plan: dict, batched: bool = True) -> list[tuple]:
+        """按拉取区间分组：batched 时区间相同的标的合并为一批，否则每个标的每个区间一批"""
+        if not batched:
+            return [(span, [code]) for code, spans in plan.items() for span in spans]
+        groups = {}
+        for code, spans in plan.items():
+            for span in spans:
+                groups.setdefault(span, []).append(code)
+        return list(groups.items())
+
+    def _fetch_batches(self, fetch: Callable, batches: list[tuple]) -> list:
+        """拉取各批次（多于一批时并发），返回与 batches 对应的结果；任一批失败则抛出"""
+        def run(batch):
+            (s, e), codes = batch
+            self._count_fetch()
+            return fetch(codes, s.isoformat(), e.isoformat())
+
+        if len(batches) <= 1:
+            return [run(batch) for batch in batches]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+            return list(pool.map(run, batches))
+
+    def prices(self, codes: list, start, end) -> dict:
+        """标的日线行情 {code: [bar, ...]}，结构与行情接口一致"""
+        start, end = _day(start), _day(end)
+        batches = self._batches(self._plan(PRICE, codes, start, end))
+        for ((s, e), batch), result in zip(batches, self._fetch_batches(self.fetch_prices, batches)):
+            for code in batch:
+                self._store(PRICE, code, result.get(code, []), "date", s, e)
+        return {code: self._load(PRICE, code, start, end) for code in codes}
+
+    def bs_params_many(self, codes: list, start, end) -> dict:
+        """多个标的的对冲参数 {code: [param, ...]}，结构与对冲参数接口一致"""
+        start, end = _day(start), _day(end)
+        batches = self._batches(self._plan(BS_PARAMS, codes, start, end), self.batch_bs_params)
+        retry = []
+        for ((s, e), batch), result in zip(batches, self._fetch_batches(self.fetch_bs_params, batches)):
+            by_code = self._split_by_code(batch, result)
+            if by_code is None:
+                # 接口未按标的标注记录，无法拆分：改为逐个标的请求，不记录覆盖区间
+                retry.extend(((s, e), [code]) for code in batch)
+                continue
+            for code in batch:
+                self._store(BS_PARAMS, code, by_code[code], "adjustment_date", s, e)
+        for ((s, e), batch), result in zip(retry, self._fetch_batches(self.fetch_bs_params, retry)):
+            self._store(BS_PARAMS, batch[0], result, "adjustment_date", s, e)
+        return {code: self._load(BS_PARAMS, code, start, end) for code in codes}
+
+    @staticmethod
+    def _split_by_code(batch: list, result: list):
+        """合并请求的结果按 BS_CODE_FIELD 拆分到各标的；有记录缺少该字段或不属于本批时返回 None"""
+        if len(batch) == 1:
+            return {batch[0]: result}
+        by_code = {code: [] for code in batch}
+        for rec in result:
+            code = rec.get(BS_CODE_FIELD)
+            if code not in by_code:
+                return None
+            by_code[code].append(rec)
+        return by_code
+
+    def bs_params(self, code: str, start, end) -> list:
+        """单个标的的对冲参数列表，结构与对冲参数接口一致"""
+        return self.bs_params_many([code], start, end)[code]
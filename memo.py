@@ -0,0 +1,137 @@
+"""
+有界 LRU 缓存与记忆化装饰器，用于页面计算结果（compute.py）。
+与 st.cache_resource 的约定一致：以 _ 开头的参数不参与缓存键（通常是由数据版本代表的大对象）。
+不依赖 streamlit，可在基准测试中直接使用。
+"""
+import datetime
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from instrumentation import timed
+
+_MISSING = object()
+
+
+class LRUCache:
+    """线程安全的有界 LRU：超过 maxsize 时淘汰最久未使用的条目"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def evict(self, key: Hashable) -> bool:
+        """显式淘汰一个条目，返回是否存在"""
+        with self._lock:
+            return self._data.pop(key, _MISSING) is not _MISSING
+
+    def evict_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """淘汰键满足 predicate 的条目，返回淘汰个数"""
+        with self._lock:
+            stale = [key for key in self._data if predicate(key)]
+            for key in stale:
+                del self._data[key]
+            self.evictions += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "size": len(self._data), "maxsize": self.maxsize,
+            "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            "hit_rate": self.hits / requests if requests else 0.0,
+        }
+
+
+def freeze(value) -> Hashable:
+    """把参数转为可哈希的缓存键：dict 按键排序，list/tuple 逐项转换，set 排序"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(freeze(v) for v in value))
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    hash(value)
+    return value
+
+
+_caches: dict[str, LRUCache] = {}
+
+
+def memoize(stage: str, maxsize: int, rows: Callable = None):
+    """
+    按参数记忆化纯函数，结果存入容量为 maxsize 的 LRU（调用方不得原地修改返回值）。
+    第一个参与缓存键的参数为数据版本：出现新版本时淘汰其它版本的条目，
+    旧版本的结果不会再被命中，不必等 LRU 挤出。
+    每次调用记一个计时阶段 stage，缓存命中情况见其 cache 字段，rows(返回值) 作为行数。
+    """
+    def decorate(func):
+        signature = inspect.signature(func)
+        keyed = [name for name in signature.parameters if not name.startswith('_')]
+        cache = _caches[stage] = LRUCache(maxsize)
+        latest = {}
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(freeze(bound.arguments[name]) for name in keyed)
+            with timed(stage) as span:
+                if key and latest.get('version', key[0]) != key[0]:
+                    cache.evict_where(lambda k: k[0] != key[0])
+                latest['version'] = key[0] if key else None
+                result = cache.get(key, _MISSING)
+                span.cache = "miss" if result is _MISSING else "hit"
+                if result is _MISSING:
+                    result = func(*args, **kwargs)
+                    cache.put(key, result)
+                if rows is not None:
+                    span.rows = rows(result)
+                return result
+
+        wrapper.cache = cache
+        return wrapper
+    return decorate
+
+
+def cache_stats() -> dict:
+    """各记忆化函数的缓存统计：{stage: stats}"""
+    return {stage: cache.stats() for stage, cache in _caches.items()}
+
+
+def clear_all() -> None:
+    for cache in _caches.values():
+        cache.clear()
@@ -0,0 +1,234 @@
+"""
+离线数据集：把规范化交易表、对冲参数与行情导出为列式文件，接口不可用或需要快速启动时
+由 MAGIC_OFFLINE_DIR / `streamlit run main.py -- --offline 目录` 加载，页面不再访问接口。
+
+目录内容：
+    manifest.json      格式版本、导出时间、数据版本（交易库版本、分类映射版本）、各文件行数与大小
+    trades.arrow       规范化交易表（Arrow IPC 文件，不压缩，加载时内存映射）
+    bs_params.parquet  对冲参数（长表，_code 列为标的）
+    prices.parquet     日线行情（长表，_code 列为标的）
+
+    python -m offline export 目录 [--days 天数]    从当前数据源导出
+    python -m offline info 目录                    查看清单
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+FORMAT = 1
+MANIFEST = 'manifest.json'
+TRADES = 'trades.arrow'
+BS_PARAMS = 'bs_params.parquet'
+PRICES = 'prices.parquet'
+CODE = '_code'
+
+
+def _json_cell(value):
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _arrow_table(df: pd.DataFrame) -> pa.Table:
+    """DataFrame -> Arrow 表；Arrow 无法推断类型的对象列（混合类型等）转为 JSON 字符串"""
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        fixed = df.copy()
+        for col in df.columns[df.dtypes == object]:
+            try:
+                pa.array(df[col], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                fixed[col] = df[col].map(_json_cell)
+        return pa.Table.from_pandas(fixed, preserve_index=False)
+
+
+def write_arrow(file: str, df: pd.DataFrame) -> None:
+    """DataFrame 写为不压缩的 Arrow IPC 文件（可内存映射读取）"""
+    table = _arrow_table(df)
+    with pa.OSFile(file, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def read_arrow(file: str) -> pd.DataFrame:
+    """
+    内存映射读取 Arrow IPC 文件：Arrow 列直接引用映射的文件页，转换为 pandas 时
+    无缺失值的数值列不复制（split_blocks），类别列、日期列按列转换
+    """
+    source = pa.memory_map(file, 'r')
+    return pa.ipc.open_file(source).read_all().to_pandas(split_blocks=True)
+
+
+def _long(by_code: dict) -> pd.DataFrame:
+    """{标的: [记录, ...]} -> 带 _code 列的长表"""
+    frames = [pd.DataFrame(records).assign(**{CODE: code}) for code, records in by_code.items() if records]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame({CODE: pd.Series([], dtype=object)})
+
+
+def write_dataset(path: str, trades: pd.DataFrame, bs_params: dict, prices: dict, versions: dict) -> dict:
+    """
+    写出离线数据集并返回清单。bs_params / prices 为 {标的: [记录, ...]}（与接口结构一致），
+    versions 写入清单（交易库版本、分类映射版本、数据区间等）。清单最后写出，导出中断的目录不会被加载
+    """
+    os.makedirs(path, exist_ok=True)
+    manifest_path = os.path.join(path, MANIFEST)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    write_arrow(os.path.join(path, TRADES), trades)
+    bs, px = _long(bs_params), _long(prices)
+    bs.to_parquet(os.path.join(path, BS_PARAMS), index=False)
+    px.to_parquet(os.path.join(path, PRICES), index=False)
+
+    rows = {TRADES: len(trades), BS_PARAMS: len(bs), PRICES: len(px)}
+    manifest = {
+        "format": FORMAT,
+        "created": datetime.datetime.now().isoformat(timespec='seconds'),
+        **versions,
+        "codes": sorted(set(bs_params) | set(prices)),
+        "files": {name: {"rows": n, "bytes": os.path.getsize(os.path.join(path, name))} for name, n in rows.items()},
+    }
+    tmp = manifest_path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, manifest_path)
+    return manifest
+
+
+def read_manifest(path: str) -> dict:
+    with open(os.path.join(path, MANIFEST), encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT:
+        raise ValueError(f"不支持的离线数据集格式：{manifest.get('format')}（当前为 {FORMAT}）")
+    return manifest
+
+
+def read_trades(path: str) -> pd.DataFrame:
+    """内存映射读取交易表（见 read_arrow）"""
+    return read_arrow(os.path.join(path, TRADES))
+
+
+class OfflineMarket:
+    """
+    与 MarketCache 接口一致的只读行情与对冲参数来源：数据来自离线数据集，不访问接口；
+    超出数据集区间的日期没有数据
+    """
+
+    def __init__(self, bs_params: pd.DataFrame, prices: pd.DataFrame):
+        self._bs = self._index(bs_params, 'adjustment_date')
+        self._prices = self._index(prices, 'date')
+        self.requests = 0
+        self.hits = 0
+        self.fetches = 0
+
+    @staticmethod
+    def _index(df: pd.DataFrame, date_key: str) -> dict:
+        """标的 -> (按日期排序的 YYYY-MM-DD 数组, 去掉 _code 列的记录表)"""
+        out = {}
+        if df.empty:
+            return out
+        for code, group in df.groupby(CODE, sort=False):
+            days = group[date_key].astype(str).str[:10]
+            order = np.argsort(days.to_numpy(), kind='stable')
+            out[code] = (days.to_numpy()[order], group.drop(columns=CODE).iloc[order].reset_index(drop=True))
+        return out
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.requests if self.requests else 0.0
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "hits": self.hits, "fetches": self.fetches, "hit_rate": self.hit_rate}
+
+    def _slice(self, index: dict, code: str, start, end) -> list:
+        if code not in index:
+            return []
+        days, records = index[code]
+        lo = days.searchsorted(str(start)[:10], 'left')
+        hi = days.searchsorted(str(end)[:10], 'right')
+        return records.iloc[lo:hi].to_dict(orient='records')
+
+    def _count(self) -> None:
+        self.requests += 1
+        self.hits += 1
+
+    def prices(self, codes: list, start, end) -> dict:
+        self._count()
+        return {code: self._slice(self._prices, code, start, end) for code in codes}
+
+    def bs_params_many(self, codes: list, start, end) -> dict:
+        self._count()
+        return {code: self._slice(self._bs, code, start, end) for code in codes}
+
+    def bs_params(self, code: str, start, end) -> list:
+        return self.bs_params_many([code], start, end)[code]
+
+
+class OfflineDataset:
+    """加载后的离线数据集：manifest、trades（规范化交易表，只读）、market（OfflineMarket）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.manifest = read_manifest(path)
+        self.trades = read_trades(path)
+        self.market = OfflineMarket(
+            pd.read_parquet(os.path.join(path, BS_PARAMS)),
+            pd.read_parquet(os.path.join(path, PRICES))
+        )
+
+    def describe(self) -> str:
+        m = self.manifest
+        return f"离线数据集（{m['created']} 导出，{m['files'][TRADES]['rows']} 笔交易）"
+
+
+def export_current(path: str, days: int) -> dict:
+    """从当前数据源（本地交易库 + 行情缓存，缺失部分访问接口）导出最近 days 天的行情与对冲参数"""
+    import api
+    import config
+    from classification import mapping_stamp
+    from trade_frame import normalize_trades
+
+    store = api.get_trade_store()
+    store.refresh()
+    end = datetime.date.today()
+    start = end - datetime.timedelta(days=days)
+    cache = api.get_market_cache()
+    return write_dataset(
+        path,
+        normalize_trades(store.records()),
+        cache.bs_params_many(config.UNDERLYING_CODES, start, end),
+        cache.prices(config.UNDERLYING_CODES, start, end),
+        {
+            "trade_version": store.version,
+            "classification": mapping_stamp(),
+            "source": config.API_BASE_URL,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+        }
+    )
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="离线数据集导出与查看")
+    sub = parser.add_subparsers(dest='command', required=True)
+    export = sub.add_parser('export', help='从当前数据源导出')
+    export.add_argument('path')
+    export.add_argument('--days', type=int, default=3650, help='行情与对冲参数的天数，默认 3650')
+    info = sub.add_parser('info', help='查看清单')
+    info.add_argument('path')
+    args = parser.parse_args(argv)
+    if args.command == 'export':
+        manifest = export_current(args.path, args.days)
+    else:
+        manifest = read_manifest(args.path)
+    print(json.dumps(manifest, ensure_ascii=False, indent=1))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
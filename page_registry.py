@@ -0,0 +1,127 @@
+"""
+页面注册表：导航只列出页面标题，页面模块在首次被选中时才导入，
+并记录各页面的导入与渲染耗时。不存在、导入或渲染出错的页面不会影响导航与其它页面。
+"""
+import importlib
+import pkgutil
+import threading
+import time
+import traceback
+from typing import Optional
+
+# 导航顺序：(标题, app_pages 下的模块名)
+PAGES = [
+    ("交易数据分析", "trade_data"),
+    ("对冲参数分析", "hedge_params"),
+    ("客户产品趋势分析", "product_trend"),
+    ("特别鸣谢", "acknowledgements"),
+    ("测试专用", "test"),
+]
+
+
+class PageStats:
+    """单个页面的导入耗时、渲染次数与耗时（秒）"""
+
+    def __init__(self):
+        self.import_seconds: Optional[float] = None
+        self.renders = 0
+        self.last_render_seconds: Optional[float] = None
+        self.total_render_seconds = 0.0
+
+
+class PageRegistry:
+    """
+    package 下的页面模块须提供 render()。
+    注册顺序中的页面若模块文件不存在则不出现在导航中（见 missing），
+    package 中未注册的模块以模块名为标题排在最后。
+    """
+
+    def __init__(self, package: str, pages: list[tuple]):
+        self.package = package
+        self._lock = threading.Lock()
+        self._modules = {}
+        self._errors = {}
+        self.stats = {}
+        found = self._discover()
+        self.pages = {title: name for title, name in pages if name in found}
+        self.missing = [title for title, name in pages if name not in found]
+        registered = {name for _, name in pages}
+        for name in sorted(found - registered):
+            self.pages[name] = name
+
+    def _discover(self) -> set:
+        """列出 package 下的模块名（不导入模块本身）"""
+        package = importlib.import_module(self.package)
+        return {m.name for m in pkgutil.iter_modules(package.__path__) if not m.name.startswith('_')}
+
+    def titles(self) -> list[str]:
+        return list(self.pages)
+
+    def _stats(self, title: str) -> PageStats:
+        return self.stats.setdefault(title, PageStats())
+
+    def load(self, title: str):
+        """导入页面模块；失败时返回 None，错误信息见 error(title)"""
+        with self._lock:
+            if title in self._modules:
+                return self._modules[title]
+            started = time.perf_counter()
+            try:
+                module = importlib.import_module(f"{self.package}.{self.pages[title]}")
+                if not callable(getattr(module, 'render', None)):
+                    raise AttributeError(f"{module.__name__} 缺少 render()")
+            except Exception:
+                self._errors[title] = traceback.format_exc()
+                return None
+            self._stats(title).import_seconds = time.perf_counter() - started
+            self._modules[title] = module
+            self._errors.pop(title, None)
+            return module
+
+    def error(self, title: str) -> Optional[str]:
+        return self._errors.get(title)
+
+    def render(self, title: str) -> bool:
+        """导入并渲染页面；导入或渲染出错时返回 False（不抛出），错误信息见 error(title)"""
+        module = self.load(title)
+        if module is None:
+            return False
+        started = time.perf_counter()
+        try:
+            module.render()
+        except Exception:
+            # streamlit 的 st.stop()/st.rerun() 为 BaseException，不在此拦截
+            self._errors[title] = traceback.format_exc()
+            return False
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                stats = self._stats(title)
+                stats.renders += 1
+                stats.last_render_seconds = elapsed
+                stats.total_render_seconds += elapsed
+        self._errors.pop(title, None)
+        return True
+
+    def describe(self, title: str) -> str:
+        """侧边栏展示用的耗时说明"""
+        stats = self.stats.get(title)
+        if stats is None or stats.import_seconds is None:
+            return ""
+        text = f"页面导入 {stats.import_seconds * 1e3:.0f} ms"
+        if stats.last_render_seconds is not None:
+            text += f"，上次渲染 {stats.last_render_seconds * 1e3:.0f} ms（共 {stats.renders} 次）"
+        return text
+
+
+_registry: Optional[PageRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> PageRegistry:
+    """进程内共享的页面注册表（app_pages）"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = PageRegistry("app_pages", PAGES)
+        return _registry
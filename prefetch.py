@@ -0,0 +1,97 @@
+import threading
+import time
+from typing import Callable, NamedTuple, Optional
+
+
+class Snapshot(NamedTuple):
+    """一次预取的结果：data 为预取内容，taken_at 为完成时刻，duration 为耗时（秒）"""
+    data: dict
+    taken_at: float
+    duration: float
+
+
+class Prefetcher:
+    """
+    后台定时预取。refresh() 返回新数据 dict，成功后整体替换快照引用，
+    读方拿到的始终是某一次完整的快照；失败时保留旧快照并记录 last_error。
+    clock 可替换为假时钟，配合 tick() 在测试中手动驱动调度。
+    """
+
+    def __init__(
+        self,
+        refresh: Callable[[], dict],
+        interval: float,
+        clock: Callable[[], float] = time.time,
+        poll: float = 1.0
+    ):
+        self.refresh = refresh
+        self.interval = interval
+        self.clock = clock
+        self.poll = poll
+        self.last_error: Optional[Exception] = None
+        self._snapshot: Optional[Snapshot] = None
+        self._last_attempt: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def snapshot(self) -> Optional[Snapshot]:
+        return self._snapshot
+
+    def age(self) -> Optional[float]:
+        """快照距今秒数；尚无快照时为 None"""
+        snap = self._snapshot
+        return None if snap is None else self.clock() - snap.taken_at
+
+    @property
+    def last_duration(self) -> Optional[float]:
+        snap = self._snapshot
+        return None if snap is None else snap.duration
+
+    def due(self) -> bool:
+        return self._last_attempt is None or self.clock() - self._last_attempt >= self.interval
+
+    def refresh_now(self) -> Optional[Snapshot]:
+        """立即预取一次，返回新快照（失败返回 None）"""
+        with self._lock:
+            started = self.clock()
+            self._last_attempt = started
+            try:
+                data = self.refresh()
+            except Exception as e:
+                self.last_error = e
+                return None
+            finished = self.clock()
+            self._snapshot = Snapshot(data, finished, finished - started)
+            self.last_error = None
+            return self._snapshot
+
+    def tick(self) -> Optional[Snapshot]:
+        """到期则预取一次"""
+        return self.refresh_now() if self.due() else None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.tick()
+            self._stop.wait(self.poll)
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def describe(self) -> str:
+        """侧边栏展示用的状态说明"""
+        snap = self._snapshot
+        if snap is None:
+            return "数据预取中…" if self.last_error is None else f"数据预取失败: {self.last_error}"
+        text = f"数据快照 {self.age():.0f} 秒前更新，耗时 {snap.duration:.1f} 秒"
+        if self.last_error is not None:
+            text += f"（最近一次刷新失败: {self.last_error}）"
+        return text
@@ -0,0 +1,139 @@
+"""
+服务端分页表格：数据留在服务端，每次只把当前页发送到浏览器；
+排序、筛选在服务端完成，导出文件在点击下载时分块生成。
+"""
+import csv
+import io
+import json
+import math
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import streamlit as st
+
+import config
+
+# Excel 单个工作表的最大行数（不含表头）
+XLSX_MAX_ROWS = 1_048_575
+
+
+def filter_frame(df: pd.DataFrame, column: str, text: str) -> pd.DataFrame:
+    """保留 column 的文本形式包含 text（不区分大小写）的行；text 为空时原样返回"""
+    if not text or column not in df.columns:
+        return df
+    text = text.lower()
+    col = df[column]
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        # 只对类别取值做一次字符串匹配，再按编码展开
+        hit = np.append(col.cat.categories.astype(str).str.lower().str.contains(text, regex=False), False)
+        mask = hit[col.cat.codes.to_numpy()]
+    else:
+        mask = col.astype(str).str.lower().str.contains(text, regex=False).to_numpy(dtype=bool)
+    return df[mask]
+
+
+def sort_frame(df: pd.DataFrame, column, ascending: bool = True) -> pd.DataFrame:
+    """按单列稳定排序，缺失值置后；column 为 None 时保持原顺序"""
+    if column is None or column not in df.columns:
+        return df
+    values = df[column].reset_index(drop=True)
+    order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index
+    return df.iloc[order.to_numpy()]
+
+
+def page_count(n_rows: int, page_size: int) -> int:
+    return max(1, math.ceil(n_rows / page_size))
+
+
+def page_slice(df: pd.DataFrame, page: int, page_size: int) -> pd.DataFrame:
+    """第 page 页（从 1 开始，超出范围时取最后一页）"""
+    page = min(max(page, 1), page_count(len(df), page_size))
+    return df.iloc[(page - 1) * page_size: page * page_size]
+
+
+def _cell(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+
+def _cells(chunk: pd.DataFrame) -> list[list]:
+    """单元格取 Python 原生值，缺失值为 None，列表/字典转为 JSON 文本"""
+    nested = [i for i, dtype in enumerate(chunk.dtypes) if dtype == object]
+    chunk = chunk.astype(object).where(chunk.notna(), None)
+    for i in nested:
+        chunk.iloc[:, i] = chunk.iloc[:, i].map(_cell)
+    return chunk.values.tolist()
+
+
+def write_csv(df: pd.DataFrame, out, chunk_rows: int = 50_000) -> None:
+    """按块写出 CSV（UTF-8 带 BOM，便于 Excel 直接打开中文）"""
+    out.write('\ufeff'.encode('utf-8'))
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        out.write(chunk.to_csv(index=False, header=start == 0, quoting=csv.QUOTE_MINIMAL).encode('utf-8'))
+
+
+def write_xlsx(df: pd.DataFrame, out, chunk_rows: int = 50_000) -> None:
+    """以 openpyxl 只写模式按块写出 XLSX，内存占用与总行数无关"""
+    if len(df) > XLSX_MAX_ROWS:
+        raise ValueError(f"XLSX 最多 {XLSX_MAX_ROWS} 行，当前 {len(df)} 行，请改用 CSV")
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append([str(c) for c in df.columns])
+    for start in range(0, len(df), chunk_rows):
+        for row in _cells(df.iloc[start:start + chunk_rows]):
+            ws.append(row)
+    wb.save(out)
+
+
+def export_file(df: pd.DataFrame, fmt: str) -> bytes:
+    """生成导出文件内容（st.download_button 的延迟 data 只接受 str/bytes/BytesIO 等类型）"""
+    out = io.BytesIO()
+    (write_csv if fmt == 'csv' else write_xlsx)(df, out)
+    return out.getvalue()
+
+
+def paged_table(df: pd.DataFrame, key: str, file_name: str = "data", page_size: int = None) -> None:
+    """
+    分页表格组件：筛选列 + 关键字、排序列 + 方向、页码，只渲染当前页；
+    下方提供 CSV/XLSX 下载，文件在点击时才生成。
+    """
+    page_size = config.TABLE_PAGE_SIZE if page_size is None else page_size
+    columns = [str(c) for c in df.columns]
+    col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
+    with col1:
+        filter_col = st.selectbox("筛选列", options=columns, key=f"{key}_filter_col")
+    with col2:
+        text = st.text_input("包含", key=f"{key}_filter_text")
+    with col3:
+        sort_col = st.selectbox("排序列", options=["（不排序）"] + columns, key=f"{key}_sort_col")
+    with col4:
+        descending = st.checkbox("降序", key=f"{key}_desc")
+
+    view = filter_frame(df, filter_col, text)
+    if sort_col != "（不排序）":
+        view = sort_frame(view, sort_col, ascending=not descending)
+
+    n_pages = page_count(len(view), page_size)
+    # 筛选后页数变少时回到末页
+    if st.session_state.get(f"{key}_page", 1) > n_pages:
+        st.session_state[f"{key}_page"] = n_pages
+    page = st.number_input("页码", min_value=1, max_value=n_pages, step=1, key=f"{key}_page")
+    st.dataframe(page_slice(view, int(page), page_size), hide_index=True)
+    st.caption(f"第 {int(page)}/{n_pages} 页，每页 {page_size} 行，共 {len(view)} 行")
+
+    dl1, dl2 = st.columns(2)
+    with dl1:
+        st.download_button(
+            "下载 CSV", data=lambda: export_file(view, 'csv'),
+            file_name=f"{file_name}.csv", mime="text/csv", key=f"{key}_csv", on_click="ignore"
+        )
+    with dl2:
+        st.download_button(
+            "下载 XLSX", data=lambda: export_file(view, 'xlsx'),
+            file_name=f"{file_name}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            key=f"{key}_xlsx", on_click="ignore", disabled=len(view) > XLSX_MAX_ROWS
+        )
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+from aggregation import COUPON_TOTAL, coupon_sums
+from classification import apply_classification
+
+CATEGORY_COLUMNS = ['counterparty', 'productType', 'tradeType', 'tradeStatus', '分类']
+DATE_COLUMNS = ['tradeStartDate', 'startDate', 'tradeTerminationDate']
+NUMERIC_COLUMNS = ['notionalPrincipal', 'marginRatio', 'tradeTerminationPayoff']
+
+
+def normalize_trades(records: list[dict], mapping_path: str = None) -> pd.DataFrame:
+    """
+    将 /api/query-trades 返回的交易列表整理为带类型的 DataFrame：
+    维度列为 category，日期列为 datetime64，数值列为 float64，
+    couponsPaid 预先求和为 couponsPaidTotal，并附加 '分类' 列。
+    结果在同一数据版本内共享，调用方不得原地修改。
+    """
+    df = pd.DataFrame(records)
+    if df.empty:
+        return df
+    if 'counterparty' in df.columns:
+        df = apply_classification(df, mapping_path=mapping_path)
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(np.float64)
+    if 'couponsPaid' in df.columns:
+        df[COUPON_TOTAL] = coupon_sums(df['couponsPaid'])[0].astype(np.float64)
+        df = df.drop(columns='couponsPaid')
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
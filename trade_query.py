@@ -0,0 +1,122 @@
+"""
+交易查询：把页面上的筛选条件整理为 /api/query-trades 的 expr（服务端过滤）
+与客户端补充过滤两部分。
+
+服务端表达式语法：字段 运算符 '值'，运算符为 == >= <= > <，可用 and、or 与括号组合。
+无法下推的条件（派生列如 '分类'、取值过多的集合、"为空或" 条件）只在客户端执行；
+客户端会对全部条件再过滤一次，因此服务端只需返回结果的超集。
+"""
+import datetime
+
+import numpy as np
+import pandas as pd
+
+# 接口上可过滤的字段
+SERVER_FIELDS = {'tradeId', 'counterparty', 'productType', 'tradeType', 'tradeStatus',
+                 'tradeStartDate', 'tradeTerminationDate', 'updateTime'}
+
+# 页面筛选项所用的维度列
+FACET_COLUMNS = ['分类', 'counterparty', 'productType', 'tradeType', 'tradeStatus']
+
+IN = 'in'
+GE = '>='
+LT = '<'
+
+
+def _quote(value) -> str:
+    text = str(value)
+    if "'" in text:
+        raise ValueError(f"取值含单引号，无法下推: {text}")
+    return f"'{text}'"
+
+
+def _day(value) -> datetime.date:
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+def facets(df: pd.DataFrame) -> pd.DataFrame:
+    """维度列的去重组合，用于生成筛选项与判断筛选结果是否为空"""
+    return df[[c for c in FACET_COLUMNS if c in df.columns]].drop_duplicates().reset_index(drop=True)
+
+
+class TradeQuery:
+    """
+    交易筛选条件的规范化表示。条件之间为“且”关系；
+    日期条件按天比较，结束日期为包含关系（内部转为 < 次日）。
+    """
+
+    def __init__(self, max_in: int = 20):
+        self.max_in = max_in
+        self._conditions = {}
+
+    def isin(self, field: str, values) -> "TradeQuery":
+        """field 取值属于 values（与 Series.isin 一致，缺失值不入选）"""
+        self._conditions[(field, IN)] = tuple(sorted({str(v) for v in values}))
+        return self
+
+    def date_from(self, field: str, day, or_null: bool = False) -> "TradeQuery":
+        """field 不早于 day；or_null 为真时日期为空的交易也保留"""
+        self._conditions[(field, GE)] = (_day(day).isoformat(), or_null)
+        return self
+
+    def date_to(self, field: str, day) -> "TradeQuery":
+        """field 不晚于 day（含当天）"""
+        self._conditions[(field, LT)] = ((_day(day) + datetime.timedelta(days=1)).isoformat(), False)
+        return self
+
+    def key(self) -> tuple:
+        """规范化键：条件顺序、集合内取值顺序无关"""
+        return tuple(sorted(self._conditions.items()))
+
+    def _pushable(self, field: str, op: str, arg) -> bool:
+        if field not in SERVER_FIELDS:
+            return False
+        if op == IN:
+            # 含单引号的取值无法写入表达式，整个条件留在客户端执行
+            return 0 < len(arg) <= self.max_in and not any("'" in v for v in arg)
+        return not arg[1]
+
+    def expr(self) -> str:
+        """可下推部分的服务端表达式；没有可下推条件时为空串（全量）"""
+        parts = []
+        for (field, op), arg in self.key():
+            if not self._pushable(field, op, arg):
+                continue
+            if op == IN:
+                terms = [f"{field} == {_quote(v)}" for v in arg]
+                parts.append(terms[0] if len(terms) == 1 else "(" + " or ".join(terms) + ")")
+            else:
+                parts.append(f"{field} {op} {_quote(arg[0])}")
+        return " and ".join(parts)
+
+    def client_only(self) -> list[str]:
+        """只能在客户端执行的条件（说明用）"""
+        return [f"{field} {op}" for (field, op), arg in self.key() if not self._pushable(field, op, arg)]
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        在带类型的交易表上执行全部条件，返回筛选后的视图（不修改 df）。
+        表中缺少的字段视为全部为空。
+        """
+        if df.empty:
+            return df
+        mask = pd.Series(True, index=df.index)
+        for (field, op), arg in self.key():
+            col = df[field] if field in df.columns else pd.Series(pd.NA, index=df.index, dtype=object)
+            if op == IN:
+                if isinstance(col.dtype, pd.CategoricalDtype):
+                    # 按类别判定一次，再按编码展开（编码 -1 即缺失，对应末位 False）
+                    allowed = np.append(col.cat.categories.astype(str).isin(arg), False)
+                    mask &= allowed[col.cat.codes.to_numpy()]
+                else:
+                    mask &= col.astype(str).where(col.notna()).isin(arg)
+                continue
+            bound, or_null = arg
+            days = pd.to_datetime(col, errors='coerce').dt.normalize()
+            hit = days >= pd.Timestamp(bound) if op == GE else days < pd.Timestamp(bound)
+            mask &= hit | days.isna() if or_null else hit
+        return df if mask.all() else df[mask.to_numpy()]
@@ -0,0 +1,153 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    trade_id TEXT PRIMARY KEY,
+    modified TEXT,
+    payload  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def watermark_expr(field: str, watermark: str) -> str:
+    """
+    生成 /api/query-trades 的增量过滤表达式：修改时间不早于水位线
+    """
+    return f"{field} >= '{watermark}'"
+
+
+class TradeStore:
+    """
+    本地交易库（SQLite）。首次全量拉取，之后只按水位线拉取修改过的交易并按主键合并。
+    fetch(expr) 为交易接口调用，返回交易列表，失败时抛出异常。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fetch: Callable[[str], list],
+        id_field: str = "tradeId",
+        modified_field: str = "updateTime",
+        clock: Callable[[], float] = time.time
+    ):
+        self.path = path
+        self.fetch = fetch
+        self.id_field = id_field
+        self.modified_field = modified_field
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._records = None
+        self._records_version = None
+        self._checked_at = None
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _meta(self, conn: sqlite3.Connection, key: str) -> Optional[str]:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @property
+    def watermark(self) -> Optional[str]:
+        """已入库交易的最大修改时间；为空表示尚未全量初始化"""
+        with self._connect() as conn:
+            return self._meta(conn, "watermark")
+
+    @property
+    def version(self) -> int:
+        """数据版本号，每次入库内容变化时加一"""
+        with self._connect() as conn:
+            return int(self._meta(conn, "version") or 0)
+
+    def _key(self, trade: dict) -> str:
+        key = trade.get(self.id_field)
+        return str(key) if key is not None else json.dumps(trade, sort_keys=True, ensure_ascii=False)
+
+    def _unchanged(self, conn: sqlite3.Connection, rows: list[tuple]) -> set:
+        """返回与库中内容完全相同的交易主键（水位线边界上的交易会被重复拉取）"""
+        stored = {}
+        keys = [r[0] for r in rows]
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            stored.update(conn.execute(
+                f"SELECT trade_id, payload FROM trades WHERE trade_id IN ({marks})", chunk
+            ).fetchall())
+        return {key for key, _, payload in rows if stored.get(key) == payload}
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        拉取并合并交易，返回本次新增或变更的交易笔数。
+        full=True 或尚无水位线时全量重建（可清除上游已删除的交易）。
+        """
+        with self._lock:
+            watermark = None if full else self.watermark
+            expr = "" if watermark is None else watermark_expr(self.modified_field, watermark)
+            trades = self.fetch(expr)
+            self._checked_at = self.clock()
+
+            modified = [t.get(self.modified_field) for t in trades]
+            stamps = [str(m) for m in modified if m is not None]
+            if watermark:
+                stamps.append(watermark)
+            new_watermark = max(stamps, default="")
+            rows = [
+                (self._key(t), None if m is None else str(m), json.dumps(t, ensure_ascii=False))
+                for t, m in zip(trades, modified)
+            ]
+            with self._connect() as conn:
+                if watermark is None:
+                    conn.execute("DELETE FROM trades")
+                else:
+                    unchanged = self._unchanged(conn, rows)
+                    rows = [r for r in rows if r[0] not in unchanged]
+                conn.executemany(
+                    "INSERT INTO trades (trade_id, modified, payload) VALUES (?, ?, ?) "
+                    "ON CONFLICT(trade_id) DO UPDATE SET modified = excluded.modified, payload = excluded.payload",
+                    rows
+                )
+                if rows or watermark is None:
+                    version = int(self._meta(conn, "version") or 0) + 1
+                    conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(version),))
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('watermark', ?)", (new_watermark,))
+            return len(rows)
+
+    def refresh_if_stale(self, max_age: float) -> Optional[int]:
+        """距上次刷新超过 max_age 秒时刷新，否则返回 None"""
+        with self._lock:
+            if self._checked_at is not None and self.clock() - self._checked_at < max_age:
+                return None
+            return self.refresh()
+
+    def records(self) -> list[dict]:
+        """
+        按入库顺序返回全部交易（同一数据版本内复用同一列表，调用方不得修改）
+        """
+        with self._lock:
+            version = self.version
+            if self._records_version != version:
+                with self._connect() as conn:
+                    rows = conn.execute("SELECT payload FROM trades ORDER BY rowid").fetchall()
+                self._records = [json.loads(r[0]) for r in rows]
+                self._records_version = version
+            return self._records
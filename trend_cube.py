@@ -0,0 +1,300 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ['counterparty', 'productType', 'tradeType', '分类']
+VALUE_COLS = ['名义本金', '保证金']
+
+# 周期与期末采样点：W 为周日结束的自然周，M 为自然月
+FREQS = {'W': pd.offsets.Week(weekday=6), 'M': pd.offsets.MonthEnd()}
+
+NEW = 'new'                # 按起始日记入的新增
+TERMINATED = 'terminated'  # 按终止日记入的了结
+CLOSED = 'closed'          # 期末存续中移出的周期（终止日次日所在周期）
+
+# 汇总时 周期 × 交易对手方 的格数不超过该值则用稠密 bincount（不排序）
+DENSE_CELLS = 4_000_000
+
+
+def period_points(start, end, freq: str) -> pd.DatetimeIndex:
+    """期末存续的采样时点：区间内各周期的最后一天"""
+    return pd.date_range(start, end, freq=FREQS[freq])
+
+
+def _codes(series: Optional[pd.Series], n: int) -> tuple[np.ndarray, list]:
+    """维度列 -> (整数编码, 取值列表)，缺失为 -1；编码顺序即 category 的排序"""
+    if series is None:
+        return np.full(n, -1, dtype=np.int32), []
+    cat = series.astype('category')
+    return cat.cat.codes.to_numpy().astype(np.int32), list(cat.cat.categories)
+
+
+def _period_ordinals(days: np.ndarray, freq: str) -> np.ndarray:
+    """日期（datetime64[D]）-> 周期序号：M 为 1970-01 起的月数，W 为周一至周日的自然周序号（与 FREQS 一致）"""
+    if freq == 'M':
+        return days.astype('datetime64[M]').astype(np.int64)
+    # 1970-01-01 为周四，平移 3 天后每 7 天一周
+    return (days.astype(np.int64) + 3) // 7
+
+
+def _group(key: np.ndarray, values: np.ndarray, size: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    按 key（0 <= key < size）汇总 values，返回 (出现过的 key 升序, 各列合计)。
+    size 不大时用稠密 bincount，不排序；否则排序去重
+    """
+    if size <= DENSE_CELLS:
+        present = np.flatnonzero(np.bincount(key, minlength=size))
+        return present, np.column_stack([
+            np.bincount(key, weights=values[:, j], minlength=size)[present] for j in range(values.shape[1])
+        ])
+    cells, inverse = np.unique(key, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    return cells, np.column_stack([
+        np.bincount(inverse, weights=values[:, j], minlength=len(cells)) for j in range(values.shape[1])
+    ])
+
+
+class _Events:
+    """
+    某一频率、某类事件的明细与汇总：
+    明细按日期排序，用于不足一个周期的边界区间；
+    汇总为 周期 × 维度组合 的单元格（按周期排序），用于整周期区间。
+    day、combo、values 为已按日期排序的明细，两种频率共用同一组数组。
+    """
+
+    def __init__(self, day: np.ndarray, period: np.ndarray, combo: np.ndarray, cp: np.ndarray,
+                 values: np.ndarray, n_periods: int, n_combos: int, combo_cp: np.ndarray):
+        self.day, self.period, self.combo, self.cp, self.values = day, period, combo, cp, values
+
+        cells, inverse = np.unique(period * n_combos + combo, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        self.cell_values = np.column_stack([
+            np.bincount(inverse, weights=values[:, j], minlength=len(cells))
+            for j in range(values.shape[1])
+        ]) if len(cells) else np.zeros((0, values.shape[1]))
+        self.cell_count = np.bincount(inverse, minlength=len(cells))
+        self.cell_combo = cells % n_combos
+        self.cell_cp = combo_cp[self.cell_combo]
+        self.cell_period = cells // n_combos
+        self.bounds = np.searchsorted(self.cell_period, np.arange(n_periods + 1))
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+
+class TrendCube:
+    """
+    客户产品趋势的预聚合立方体：周期 × 交易对手方 × 产品类型 × 交易类型 × 分类，
+    度量为名义本金、保证金与笔数，分别按周、月两种粒度物化。
+    各维度的取值组合编为一个组合编码，筛选条件只在组合表上求值一次，再按编码取用。
+    由带类型的交易表（trade_frame.normalize_trades）构建，数据版本不变时复用。
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        n = len(df)
+        self.labels = {}
+        codes = []
+        for dim in DIMENSIONS:
+            dim_codes, self.labels[dim] = _codes(df[dim] if dim in df.columns else None, n)
+            codes.append(dim_codes)
+
+        # 维度组合编码（缺失编码 -1 平移为 0 后按位混合）
+        radix = [len(self.labels[d]) + 1 for d in DIMENSIONS]
+        key = np.zeros(n, dtype=np.int64)
+        for dim_codes, r in zip(codes, radix):
+            key = key * r + (dim_codes + 1)
+        uniq, combo = np.unique(key, return_inverse=True)
+        combo = combo.reshape(-1).astype(np.int64)
+        self.combo_codes = {}
+        for dim, r in zip(reversed(DIMENSIONS), reversed(radix)):
+            self.combo_codes[dim] = (uniq % r - 1).astype(np.int32)
+            uniq = uniq // r
+        self.n_combos = len(self.combo_codes[DIMENSIONS[0]])
+
+        start_col = df.get('tradeStartDate', df.get('startDate'))
+        start = (start_col.dt.normalize() if start_col is not None else pd.Series(pd.NaT, index=df.index))
+        end = df['tradeTerminationDate'].dt.normalize() if 'tradeTerminationDate' in df.columns \
+            else pd.Series(pd.NaT, index=df.index)
+        notional = df['notionalPrincipal'].astype(float).fillna(0).to_numpy() if 'notionalPrincipal' in df.columns \
+            else np.zeros(n)
+        ratio = df['marginRatio'].astype(float).fillna(0).to_numpy() if 'marginRatio' in df.columns \
+            else np.zeros(n)
+        values = np.column_stack([notional, notional * ratio])
+
+        start = start.to_numpy(dtype='datetime64[D]')
+        end = end.to_numpy(dtype='datetime64[D]')
+        has_start, has_end = ~np.isnat(start), ~np.isnat(end)
+        removal = end + np.timedelta64(1, 'D')
+        known = np.concatenate([start[has_start], end[has_end], removal[has_end]])
+        if not len(known):
+            known = np.array(['1970-01-01'], dtype='datetime64[D]')
+
+        # 各类事件按日期排序一次，两种频率共用；移出事件另带起始日（用于确定移出周期）
+        combo_cp = self.combo_codes['counterparty']
+        both = has_start & has_end
+
+        def sorted_events(days: np.ndarray, mask: np.ndarray) -> tuple:
+            order = np.flatnonzero(mask)[np.argsort(days[mask], kind='stable')]
+            return days[order], combo[order], combo_cp[combo[order]], values[order], order
+
+        events = {NEW: sorted_events(start, has_start), TERMINATED: sorted_events(end, has_end),
+                  CLOSED: sorted_events(removal, both)}
+        closed_start = start[events[CLOSED][4]]
+
+        self.grains = {}
+        for freq in FREQS:
+            self.grains[freq] = self._build(freq, known, events, closed_start)
+
+    def _build(self, freq, known, events, closed_start) -> dict:
+        periods = pd.period_range(known.min(), known.max(), freq=freq)
+        base = _period_ordinals(np.array([periods[0].start_time], dtype='datetime64[D]'), freq)[0]
+        grain = {'periods': periods, 'starts': periods.to_timestamp()}
+        combo_cp = self.combo_codes['counterparty']
+        for kind, (day, combo, cp, values, _) in events.items():
+            period = _period_ordinals(day, freq) - base
+            if kind == CLOSED:
+                # 起始日晚于终止日的交易从不存续：移出周期不早于新增周期，两者在期末抵消
+                period = np.maximum(period, _period_ordinals(closed_start, freq) - base)
+            grain[kind] = _Events(day, period, combo, cp, values, len(periods), self.n_combos, combo_cp)
+        return grain
+
+    def _allowed(self, filters: dict) -> np.ndarray:
+        """满足 filters 且交易对手方不缺失的维度组合（布尔数组，按组合编码索引）"""
+        allowed = self.combo_codes['counterparty'] >= 0
+        for dim in DIMENSIONS:
+            selected = filters.get(dim)
+            if selected is None:
+                continue
+            # 末位对应缺失编码 -1，isin 语义下缺失值从不入选
+            ok = np.append(pd.Index(self.labels[dim], dtype=object).isin(list(selected)), False)
+            allowed &= ok[self.combo_codes[dim]]
+        return allowed
+
+    def _period_index(self, grain: dict, ts: pd.Timestamp) -> int:
+        return pd.Period(ts, freq=grain['periods'].freq).ordinal - grain['periods'][0].ordinal
+
+    def period_sums(self, kind: str, freq: str, date_from: Optional[pd.Timestamp],
+                    date_to: pd.Timestamp, filters: dict) -> pd.DataFrame:
+        """
+        日期落在 [date_from, date_to] 内的新增/了结事件按 周期 × 交易对手方 汇总
+        （date_from 为 None 表示不设下限）。整周期取自立方体单元格，
+        首尾不足一个周期的部分取自明细。返回列 周期、counterparty、名义本金、保证金。
+        """
+        grain = self.grains[freq]
+        ev = grain[kind]
+        periods = grain['periods']
+        n_periods = len(periods)
+
+        # 完整落在区间内的周期 [lo, hi]
+        lo = 0
+        if date_from is not None:
+            first = pd.Period(date_from, freq=periods.freq)
+            lo = first.ordinal - periods[0].ordinal + (first.start_time != date_from)
+        last = pd.Period(date_to, freq=periods.freq)
+        hi = last.ordinal - periods[0].ordinal - (last.end_time.normalize() != date_to)
+        lo, hi = max(lo, 0), min(hi, n_periods - 1)
+
+        day_from = np.datetime64('NaT') if date_from is None else np.datetime64(date_from.date())
+        day_to = np.datetime64(date_to.date())
+        parts = []
+        if lo <= hi:
+            a, b = ev.bounds[lo], ev.bounds[hi + 1]
+            parts.append((ev.cell_period[a:b], ev.cell_combo[a:b], ev.cell_cp[a:b], ev.cell_values[a:b]))
+            edges = [
+                (day_from, np.datetime64(periods[lo].start_time.date()) - np.timedelta64(1, 'D')),
+                (np.datetime64(periods[hi].end_time.date()) + np.timedelta64(1, 'D'), day_to),
+            ]
+        else:
+            edges = [(day_from, day_to)]
+        for first, last in edges:
+            a = 0 if np.isnat(first) else np.searchsorted(ev.day, first, side='left')
+            b = np.searchsorted(ev.day, last, side='right')
+            if a < b:
+                parts.append((ev.period[a:b], ev.combo[a:b], ev.cp[a:b], ev.values[a:b]))
+
+        columns = ['周期', 'counterparty', *VALUE_COLS]
+        n_cp = len(self.labels['counterparty'])
+        allowed = self._allowed(filters)
+        keys, kept = [], []
+        for period, combo, cp, values in parts:
+            keep = allowed[combo]
+            keys.append(period[keep] * n_cp + cp[keep])
+            kept.append(values[keep])
+        if not keys:
+            return self._frame(columns, np.array([], dtype=np.int64), np.array([], dtype=np.int32),
+                               np.zeros((0, len(VALUE_COLS))), grain['starts'])
+        cells, totals = _group(np.concatenate(keys), np.concatenate(kept), n_periods * n_cp)
+        return self._frame(columns, cells // n_cp, (cells % n_cp).astype(np.int32), totals, grain['starts'])
+
+    def _frame(self, columns, period, cp, totals, starts) -> pd.DataFrame:
+        out = pd.DataFrame({
+            '周期': starts[period],
+            'counterparty': pd.Categorical.from_codes(cp, categories=self.labels['counterparty']),
+        })
+        for j, col in enumerate(VALUE_COLS):
+            out[col] = totals[:, j]
+        return out[columns]
+
+    def outstanding(self, freq: str, points: pd.DatetimeIndex, filters: dict) -> pd.DataFrame:
+        """
+        期末存续：每个采样时点（周期最后一天）按交易对手方汇总起始日 <= t 且
+        终止日为空或 >= t 的交易。由新增与移出单元格按周期累加得到。
+        返回列 counterparty、名义本金、保证金、周期，时点内按交易对手方排序。
+        """
+        grain = self.grains[freq]
+        columns = ['counterparty', *VALUE_COLS, '周期']
+        if not len(points):
+            return pd.DataFrame(columns=columns)
+        n_periods = len(grain['periods'])
+        n_cp = len(self.labels['counterparty'])
+        idx = np.array([self._period_index(grain, t) for t in points])
+        rows = min(int(idx.max()), n_periods - 1) + 1
+        if rows <= 0 or n_cp == 0:
+            return pd.DataFrame(columns=columns)
+
+        # 各周期的流量归入其后第一个采样时点（按周期查表），再按时点累加
+        order = np.argsort(idx, kind='stable')
+        n_pts = len(idx)
+        bucket_of = np.searchsorted(idx[order], np.arange(rows), side='left')
+        allowed = self._allowed(filters)
+        flow = np.zeros((n_pts * n_cp, len(VALUE_COLS)))
+        active = np.zeros(n_pts * n_cp, dtype=np.int64)
+        for kind, sign in [(NEW, 1), (CLOSED, -1)]:
+            ev = grain[kind]
+            b = ev.bounds[rows]
+            keep = allowed[ev.cell_combo[:b]]
+            key = bucket_of[ev.cell_period[:b][keep]] * n_cp + ev.cell_cp[:b][keep]
+            for j in range(len(VALUE_COLS)):
+                flow[:, j] += sign * np.bincount(key, weights=ev.cell_values[:b][keep, j], minlength=n_pts * n_cp)
+            active += sign * np.bincount(key, weights=ev.cell_count[:b][keep],
+                                         minlength=n_pts * n_cp).astype(np.int64)
+        flow = np.cumsum(flow.reshape(n_pts, n_cp, -1), axis=0)[np.argsort(order)]
+        active = np.cumsum(active.reshape(n_pts, n_cp), axis=0)[np.argsort(order)]
+
+        pt_pos = np.flatnonzero(idx >= 0)
+        live = active[pt_pos] > 0
+        p_i, c_i = np.nonzero(live)
+        stamps = pd.DatetimeIndex(points).normalize()
+        out = pd.DataFrame({
+            'counterparty': np.asarray(self.labels['counterparty'], dtype=object)[c_i],
+        })
+        for j, col in enumerate(VALUE_COLS):
+            out[col] = flow[pt_pos[p_i], c_i, j]
+        out['周期'] = stamps[pt_pos[p_i]]
+        return out[columns]
+
+
+def slice_metric(cube: TrendCube, metric_type: str, freq: str, start, end, filters: dict) -> pd.DataFrame:
+    """
+    按趋势页的指标类型（当期/累计新增、当期/累计了结、期末存续）切片，
+    返回 周期 × 对手方 的名义本金与保证金
+    """
+    start_ts, end_ts = pd.Timestamp(start), pd.Timestamp(end)
+    if metric_type == '期末存续':
+        agg = cube.outstanding(freq, period_points(start, end, freq), filters)
+    else:
+        kind = NEW if '新增' in metric_type else TERMINATED
+        date_from = start_ts if '当期' in metric_type else None
+        agg = cube.period_sums(kind, freq, date_from, end_ts, filters)
+    return agg[['周期', 'counterparty'] + VALUE_COLS]